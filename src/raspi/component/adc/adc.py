@@ -1,5 +1,9 @@
+from __future__ import annotations
+
 import logging
-from dataclasses import dataclass
+import sys
+from array import array
+from dataclasses import dataclass, field
 
 from component.smbus import smbus_actions
 from smbus2 import i2c_msg
@@ -7,9 +11,12 @@ from state_management import (
     create_context,
     device,
     device_action,
+    device_compiler,
     device_parser,
     identifier,
+    instrumented,
     register_device,
+    run_blocking,
 )
 
 
@@ -71,7 +78,10 @@ class ADC:
     power_down: int
     _identifier: str
     i2c: smbus_actions.SMBus = identifier(smbus_actions.ctx)
+    # {name of the input device: register}, filled in by the parser
+    registers: dict[str, int] = field(default_factory=dict)
 
+    @instrumented("adc")
     def read_data(self, register: list):
         """
         Get the degrees from the adc device.
@@ -84,10 +94,79 @@ class ADC:
         read = i2c_msg.read(self.address, 2)
         return smbus_actions.i2c_rdwr(self.i2c, write, read)  # [[write data], [0,0]]
 
+    def read_raw(self, registers: list[int] = None) -> bytes:
+        """
+        Read multiple channels in one i2c transaction.
+
+        :param registers: list[int] = registers to read from (default: every configured input device)
+        :return: bytes = 2 bytes per register in the same order (high byte first)
+        """
+        if registers is None:
+            registers = list(self.registers.values())
+        messages = []
+        for register in registers:
+            messages.append(i2c_msg.write(self.address, [register]))
+            messages.append(i2c_msg.read(self.address, 2))
+        # [write data], [fbyte, sbyte], [write data], [fbyte, sbyte], ...
+        smbus_actions.i2c_rdwr(self.i2c, *messages)
+        return b"".join(bytes(read) for read in messages[1::2])
+
+    def scan(self, registers: list[int] = None) -> array:
+        """
+        Read multiple channels in one i2c transaction.
+
+        :param registers: list[int] = registers to read from (default: every configured input device)
+        :return: array[int] = 12 bit value of each register in the same order
+        """
+        values = array("H", self.read_raw(registers))
+        if sys.byteorder == "little":
+            values.byteswap()  # the adc sends the high byte first
+        return values
+
+    async def scan_async(self, registers: list[int] = None) -> array:
+        """
+        Same as scan but awaitable, the i2c transaction runs on the shared blocking pool.
+
+        :param registers: list[int] = registers to read from (default: every configured input device)
+        :return: array[int] = 12 bit value of each register in the same order
+        """
+        return await run_blocking(self.scan, registers)
+
 
 ctx = create_context("adc", ADC)
 
 
+@device_compiler(ctx)
+def compile_adc(config: dict) -> dict:
+    """
+    Validate the adc config and resolve the address, the power down bits and the register of every input device.
+
+    Returns:
+        dict: the config with address and power_down as integers and the registers filled in
+    """
+    config = dict(config)
+    if isinstance(config["power_down"], str):
+        config["power_down"] = int(config["power_down"], 2)
+    if config["power_down"] not in [0, 1, 2, 3]:
+        raise ValueError(
+            "Power down must be 00, 01, 10, or 11. Got "
+            + "{0:02b}".format(config["power_down"])
+        )
+    if isinstance(config["address"], str):
+        config["address"] = int(config["address"], 16)
+
+    power_down = config["power_down"]
+    registers = {}
+    for name, addr in config["input_devices"].items():
+        # 1 bit for Single-Ended/Differential Inputs and 3 channel bits
+        register: int = 1 << 3 | channel_to_adc_addr(addr)
+        register = (register << 2) | power_down  # 2 power down bits
+        register = register << 2  # 2 unused bits
+        registers[name] = register
+    config["registers"] = registers
+    return config
+
+
 @device_parser(ctx)
 def parse_adc(config: dict):
     """
@@ -102,26 +181,16 @@ def parse_adc(config: dict):
             "name_of_device": int = channel of the device on the adc (0 ~ 7)
             ...
         }
-    }
+    } or the config returned by compile_adc
 
     NOTE: Documentation for the logic explained here
     https://drive.google.com/open?id=1gvnOic5LwNqlCqx-z4vHShFm0rJplFgQ&disco=AAABJ0xEwNY
     """
-    config["power_down"] = int(config["power_down"], 2)
-    if config["power_down"] not in [0, 1, 2, 3]:
-        raise ValueError(
-            "Power down must be 00, 01, 10, or 11. Got "
-            + "{0:02b}".format(config["power_down"])
-        )
-    config["address"] = int(config["address"], 16)
+    if "registers" not in config:
+        config = compile_adc(config)
     adc = ADC(**config)
 
-    power_down = config["power_down"]
-    for name, addr in adc.input_devices.items():
-        # 1 bit for Single-Ended/Differential Inputs and 3 channel bits
-        register: int = 1 << 3 | channel_to_adc_addr(addr)
-        register = (register << 2) | power_down  # 2 power down bits
-        register = register << 2  # 2 unused bits
+    for name, register in adc.registers.items():
         analogDevice = ADCAnalogInputDevice(adc, register)
         register_device(
             analog_input_device_ctx, f"{adc._identifier}.{name}", analogDevice
@@ -132,6 +201,38 @@ def parse_adc(config: dict):
     return adc
 
 
+@device_action(ctx)
+def scan(adc: ADC, channels: list[str] = None) -> array:
+    """Read the 12 bit value of multiple input devices in one i2c transaction.
+
+    Args:
+        adc (ADC): adc object
+        channels (list[str], optional): names of the input devices to read. Defaults to every input device.
+
+    Returns:
+        array[int] = value of each input device in the same order as channels
+    """
+    if channels is None:
+        return adc.scan()
+    return adc.scan([adc.registers[name] for name in channels])
+
+
+@device_action(ctx)
+async def scan_async(adc: ADC, channels: list[str] = None) -> array:
+    """Awaitable scan, reads multiple input devices in one i2c transaction without blocking the event loop.
+
+    Args:
+        adc (ADC): adc object
+        channels (list[str], optional): names of the input devices to read. Defaults to every input device.
+
+    Returns:
+        array[int] = value of each input device in the same order as channels
+    """
+    if channels is None:
+        return await adc.scan_async()
+    return await adc.scan_async([adc.registers[name] for name in channels])
+
+
 def channel_to_adc_addr(channel: int) -> int:
     """
     NOTE: channel will be mapped to the following due to the hardware:
@@ -1,6 +1,12 @@
-from gpiozero import DigitalOutputDevice
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from state_management import create_masked_context, device_action, output_device_ctx
 
+if TYPE_CHECKING:
+    from gpiozero import DigitalOutputDevice
+
 compressor_ctx = create_masked_context(output_device_ctx, "compressor")
 __all__ = [
     "compressor_attr",
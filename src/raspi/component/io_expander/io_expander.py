@@ -1,24 +1,48 @@
+from __future__ import annotations
+
 import logging
+import struct
+import threading
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-import board
-import busio
 from . import interrupt_pin_action
-from adafruit_mcp230xx.mcp23017 import MCP23017, DigitalInOut
-from digitalio import Direction, Pull
-from gpiozero import DigitalInputDevice
 from state_management import (
+    allow_device_class,
     create_context,
     device,
     device_parser,
+    get_device,
     identifier,
     input_device_ctx,
+    is_tracing,
     register_device,
 )
+from state_management.utils import FakeMCP23017, debounce_input, is_dev
+from state_management.utils.interval import scheduler
+
+if TYPE_CHECKING:
+    from adafruit_mcp230xx.mcp23017 import MCP23017, DigitalInOut
+    from gpiozero import DigitalInputDevice
+    from state_management.utils.interval import TimerHandle
 
 # Plugin for IOExpander. Set this to True in the sample script file if you use a component that uses the IOExpander
 USE = False
 
+# INTF, INTCAP and GPIO of port A and B are consecutive registers (IOCON.BANK = 0) and are read
+# in one sequential read (IOCON.SEQOP = 0) starting at INTFA
+INTFA = 0x0E
+INTCAPA = 0x10
+INTERRUPT_BLOCK_SIZE = 6
+# reads of every expander on a shared interrupt line while it stays active after an edge
+MAX_SERVICE_PASSES = 4
+
+# polling mode: seconds between reads of the inputs right after a change and when idle,
+# the period grows by POLL_BACKOFF with every read that finds no change
+POLL_FAST = 0.002
+POLL_SLOW = 0.05
+POLL_BACKOFF = 1.5
+
 
 @dataclass
 class IOExpanderInputDevice:
@@ -55,25 +79,199 @@ class IOExpander:
     config schema:
     {
         address: str = i2c address of the device i.e. "0x20",
-        interrupt_pin: DigitalInputDevice = identifier(input_device_ctx),
+        interrupt_pin: DigitalInputDevice = identifier(input_device_ctx) (optional),
         input_channels = {
             [name: str]: int = pin identifier and pin number
+            or [name: str]: {pin: int, debounce: float} = with the debounce time of the channel
         }
         total_channels: int = max amount of channels allowed on each ioexpander (default 8)
+        debounce: float = seconds a channel has to be stable for before its callbacks are called (default none)
+        polling: bool = poll the inputs even if there is an interrupt pin, i.e. when it is noisy (default false)
+        poll_fast: float = seconds between polls after a change (default POLL_FAST)
+        poll_slow: float = seconds between polls when idle (default POLL_SLOW)
     }
 
+    Without an interrupt pin (or with polling) the inputs are polled: the GPIO register of both ports is read
+    every poll_fast seconds after a change, slowing down to poll_slow while nothing changes, and the same
+    when_activated / when_deactivated callbacks are called.
+    Expanders with the same interrupt pin share it through an InterruptLine.
     """
 
     mcp: MCP23017
     _identifier: str
 
     address: int  # hex address type is string in pinconfig.json
-    input_channels: dict[str, int]  # {name: pin number}
+    input_channels: dict[str, int | dict]  # {name: pin number or {pin, debounce}}
     interrupt_pin: DigitalInputDevice = identifier(interrupt_pin_action.ctx)
     input_devices: list[IOExpanderInputDevice] = field(default_factory=list)
 
     # max amount of channels allowed on each ioexpander
     total_channels: int = 8
+    # debounce time of the channels that do not set their own
+    debounce: float = None
+    # bits of the input channels and their levels after the last interrupt
+    channel_mask: int = 0
+    port_state: int = 0
+
+    polling: bool = False
+    poll_fast: float = POLL_FAST
+    poll_slow: float = POLL_SLOW
+    poll_period: float = None  # None while not polling
+    _poll_timer: TimerHandle = None
+
+    def read_interrupt(self) -> tuple[int, int, int]:
+        """
+        Read the interrupt flags, the captured levels and the current levels of both ports in one i2c transaction.
+        Reading INTCAP and GPIO clears the interrupt.
+
+        :return: (int, int, int) = INTF, INTCAP and GPIO as 16 bit masks (bit n is pin n)
+        """
+        return struct.unpack("<HHH", self._read_block(INTFA, INTERRUPT_BLOCK_SIZE))
+
+    def read_flags(self) -> int:
+        """
+        Read the interrupt flags of both ports in one i2c transaction without clearing the interrupt.
+
+        :return: int = INTF as a 16 bit mask
+        """
+        return int.from_bytes(self._read_block(INTFA, 2), "little")
+
+    def _read_block(self, register: int, size: int) -> bytearray:
+        buffer = bytearray(size)
+        # the driver has no public block read, its i2c device is used like the driver uses it
+        with self.mcp._device as i2c:
+            i2c.write_then_readinto(bytes((register,)), buffer)
+        return buffer
+
+    def on_interrupt(self, flags: int = None):
+        """
+        Dispatch the when_activated / when_deactivated callbacks of every input that changed since the last interrupt.
+        The captured levels are dispatched first so that a pulse shorter than the interrupt latency is not lost.
+
+        :param flags: int = INTF if it was already read (see InterruptLine), only INTCAP and GPIO are read then
+        """
+        if flags is None:
+            flags, captured, state = self.read_interrupt()
+        else:
+            captured, state = struct.unpack("<HH", self._read_block(INTCAPA, 4))
+        previous = self.port_state
+        captured = (previous & ~flags) | (captured & flags)
+        self.port_state = state
+        if is_tracing():
+            logging.debug(
+                "%s interrupt: flags %04x captured %04x state %04x",
+                self._identifier,
+                flags,
+                captured,
+                state,
+            )
+        self._dispatch(previous, captured)
+        self._dispatch(captured, state)
+
+    def poll(self) -> bool:
+        """
+        Read the inputs of both ports in one i2c transaction and dispatch the callbacks of the ones that changed.
+
+        :return: bool = an input changed since the last poll or interrupt
+        """
+        previous = self.port_state
+        state = self.port_state = self.mcp.gpio
+        self._dispatch(previous, state)
+        return (previous ^ state) & self.channel_mask != 0
+
+    def start_polling(self):
+        """
+        Poll the inputs on the shared scheduler until stop_polling is called.
+        The polls are not timeouts, so clear_timeouts / clear_all do not stop them.
+        """
+        self.stop_polling()
+        self.poll_period = self.poll_slow
+        self._poll_timer = scheduler.schedule(self._poll_tick, self.poll_period)
+
+    def stop_polling(self):
+        if self._poll_timer is not None:
+            self._poll_timer.cancel()
+            self._poll_timer = None
+        self.poll_period = None
+
+    def _poll_tick(self):
+        period = self.poll_period
+        if period is None:
+            return
+        try:
+            changed = self.poll()
+        except Exception:
+            logging.exception("%s: poll failed", self._identifier)
+            changed = False
+        if changed:
+            period = self.poll_fast
+        else:
+            period = min(period * POLL_BACKOFF, self.poll_slow)
+        if self.poll_period is None:
+            # stopped during the poll
+            return
+        self.poll_period = period
+        self._poll_timer = scheduler.schedule(self._poll_tick, period)
+
+    def _dispatch(self, previous: int, state: int):
+        changed = (previous ^ state) & self.channel_mask
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            device = self.input_devices[bit.bit_length() - 1]
+            if state & bit:
+                if device.when_activated:
+                    device.when_activated()
+            elif device.when_deactivated:
+                device.when_deactivated()
+
+
+@dataclass
+class InterruptLine:
+    """
+    Interrupt pin shared by the io expanders whose open drain, mirrored interrupt outputs are wired together.
+    On an edge the interrupt flags of every expander are read in one pass and only the flagged expanders are serviced.
+    The line stays active while any expander still has a flag (i.e. one that changed during the pass) without
+    another edge, so the pass is repeated while the pin is active.
+    """
+
+    pin: DigitalInputDevice
+    expanders: list[IOExpander] = field(default_factory=list)
+
+    def service(self):
+        expanders = self.expanders
+        if len(expanders) == 1:
+            expanders[0].on_interrupt()
+            return
+        for _ in range(MAX_SERVICE_PASSES):
+            flagged = [
+                (expander, flags)
+                for expander in expanders
+                if (flags := expander.read_flags())
+            ]
+            for expander, flags in flagged:
+                expander.on_interrupt(flags)
+            if not flagged or not self.pin.is_active:
+                return
+        logging.warning("Interrupt line %s is stuck active", self.pin)
+
+
+# {identifier of the interrupt pin: line}
+interrupt_lines: dict[str, InterruptLine] = {}
+_interrupt_lines_lock = threading.Lock()
+
+
+def add_to_interrupt_line(expander: IOExpander) -> InterruptLine:
+    """Service the interrupts of the expander from its interrupt pin, together with the expanders sharing the pin."""
+    with _interrupt_lines_lock:
+        line = interrupt_lines.get(expander.interrupt_pin)
+        if line is None:
+            pin = get_device(interrupt_pin_action.ctx, expander.interrupt_pin)
+            line = interrupt_lines[expander.interrupt_pin] = InterruptLine(pin)
+            interrupt_pin_action.on_expander_activated(pin, line.service)
+        # a new list so a service running on the interrupt thread keeps iterating the previous one
+        line.expanders = line.expanders + [expander]
+    return line
 
 
 ctx = create_context("io_expander", IOExpander)
@@ -85,11 +283,26 @@ def parse_io_expander(config: dict) -> IOExpander:
         raise ValueError("Missing address in config (io_expander.address)")
 
     hex_addr = int(config["address"], 16)
-    mcp = MCP23017(busio.I2C(board.SCL, board.SDA), address=hex_addr)
+    if is_dev():
+        logging.info("dev environment detected. Mocking io expander %s", hex_addr)
+        mcp = FakeMCP23017(hex_addr)
+        input_direction = pull_up = None
+    else:
+        # the blinka libraries probe the board when they are imported, so they are only imported
+        # once an io expander is in the pinconfig
+        import board
+        import busio
+        from adafruit_mcp230xx.mcp23017 import MCP23017
+        from digitalio import Direction, Pull
+
+        mcp = MCP23017(busio.I2C(board.SCL, board.SDA), address=hex_addr)
+        input_direction, pull_up = Direction.INPUT, Pull.UP
 
     # https://docs.circuitpython.org/projects/mcp230xx/en/latest/examples.html#mcp230xx-event-detect-interrupt
     # Set up to check all the port B pins (pins 8-15) w/interrupts!
-    mcp.interrupt_enable = 0xFFFF  # Enable Interrupts in all pins
+    polling = config.get("polling", False) or "interrupt_pin" not in config
+    # Enable Interrupts in all pins, unless the inputs are polled
+    mcp.interrupt_enable = 0x0000 if polling else 0xFFFF
     # If intcon is set to 0's we will get interrupts on
     # both button presses and button releases
     mcp.interrupt_configuration = 0x0000  # interrupt on any change
@@ -100,34 +313,36 @@ def parse_io_expander(config: dict) -> IOExpander:
     expander = IOExpander(**config)
     expander.input_devices = [None] * expander.total_channels
 
-    if not IOExpanderInputDevice in input_device_ctx.allowed_classes:
-        input_device_ctx.allowed_classes = (
-            IOExpanderInputDevice,
-            *input_device_ctx.allowed_classes,
-        )
+    allow_device_class(input_device_ctx, IOExpanderInputDevice)
 
-    for name, num in expander.input_channels.items():
+    debounced = []  # [(device, debounce time)]
+    for name, channel in expander.input_channels.items():
+        if isinstance(channel, dict):
+            num = channel["pin"]
+            debounce_time = channel.get("debounce", expander.debounce)
+        else:
+            num, debounce_time = channel, expander.debounce
         pin = mcp.get_pin(num)
-        pin.direction = Direction.INPUT
-        pin.pull = Pull.UP
+        pin.direction = input_direction
+        pin.pull = pull_up
         device = IOExpanderInputDevice(pin, num, name)
         expander.input_devices[num] = device
+        expander.channel_mask |= 1 << num
         register_device(input_device_ctx, f"{expander._identifier}.{name}", device)
+        if debounce_time:
+            debounced.append((device, debounce_time))
 
-    def on_interrupt():
-        logging.info("Interrupt triggered")
-        for pin_flag in expander.mcp.int_flag:
-            logging.info(f"pin_flag: {pin_flag}")
-            if (
-                (device := expander.input_devices[pin_flag])
-                and device.value
-                and device.when_activated
-            ):
-                device.when_activated()
-            elif device and not device.value and device.when_deactivated:
-                device.when_deactivated()
-        expander.mcp.clear_ints()
-
-    interrupt_pin_action.on_expander_activated(expander.interrupt_pin, on_interrupt)
+    expander.port_state = mcp.gpio
+    for device, debounce_time in debounced:
+        active = bool(expander.port_state & (1 << device.pin_num))
+        debounce_input(device, debounce_time, active)
+    if polling:
+        expander.polling = True
+        if "interrupt_pin" not in config:
+            expander.interrupt_pin = None
+        logging.info("%s: no interrupt, polling the inputs", expander._identifier)
+        expander.start_polling()
+    else:
+        add_to_interrupt_line(expander)
 
     return expander
@@ -1,7 +1,13 @@
-from gpiozero import DigitalInputDevice
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from state_management import create_masked_context, device_action
 from state_management.generic_devices.generic_devices import input_device_ctx
 
+if TYPE_CHECKING:
+    from gpiozero import DigitalInputDevice
+
 ctx = create_masked_context(input_device_ctx, "expander_interrupt")
 
 
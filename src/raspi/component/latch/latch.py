@@ -1,20 +1,35 @@
+from __future__ import annotations
+
+import asyncio
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from time import sleep
+from typing import TYPE_CHECKING
 
-from gpiozero import DigitalOutputDevice
 from state_management import (
+    allow_device_class,
     create_generic_context,
     device,
+    device_action,
+    device_exit,
     device_parser,
     identifier,
+    instrumented,
+    is_tracing,
     output_device_ctx,
     register_device,
+    run_blocking,
 )
 from state_management.utils.deviceMock import value_change
 
 from .pin import latch_pin_actions
 
+if TYPE_CHECKING:
+    from gpiozero import DigitalOutputDevice
+
 USE = False
 ENABLE_DURATION = 0.1
 
@@ -36,6 +51,10 @@ class VirtualDigitalOutputDevice:
         self.addr = addr
         self._value = 0
         self.pin = addr  # debugging purposes
+        self.pending: Future = None  # last write sent to the latch
+        # held while reading and queuing the value so the order of the queued writes
+        # matches the order _value changes in when several threads set this device
+        self.lock = threading.RLock()
 
     @value_change
     def on(self):
@@ -47,16 +66,25 @@ class VirtualDigitalOutputDevice:
 
     @value_change
     def toggle(self):
-        new_val = 1 - self._value
-        self.value = new_val
+        with self.lock:
+            new_val = 1 - self._value
+            self.value = new_val
 
-    def set_value(self, value):
-        logging.info("setting VirtualDigitalOutputDevice value")
-        if self._value == value:
-            return
-        self.latch.set(self.addr, value)
-        # this might need to change in the future as it might need to be check if the latch has actually switched state
-        self._value = value
+    def set_value(self, value) -> Future:
+        if is_tracing():
+            logging.debug("Setting address %s of the latch to %s", self.addr, value)
+        with self.lock:
+            if self._value == value:
+                return self.pending
+            # the latch writes the value in the background, use wait_until_set to block until it is written
+            self.pending = self.latch.set(self.addr, value)
+            self._value = value
+            return self.pending
+
+    def wait_until_set(self, timeout: float = None) -> None:
+        """Block until the last value set on this device is written to the latch."""
+        if self.pending is not None:
+            self.pending.result(timeout)
 
     @property
     def value(self):
@@ -75,30 +103,89 @@ class VirtualDigitalOutputDevice:
 @device
 @dataclass
 class Latch:
+    """
+    Addressable latch. Writes are queued and done one at a time by a worker thread
+    since every write holds the enable pin for ENABLE_DURATION.
+    Writing to an address that is still waiting in the queue replaces the queued value (last write wins).
+
+    The worker is the only thread that drives the address, data and enable pins. Callers only touch the queue
+    while holding the condition, so any number of threads can call set at the same time.
+    """
+
     pins: dict[str, int]
-    queue: list[tuple[str, int]] = field(default_factory=list)
-    lock: bool = False
     data: DigitalOutputDevice = identifier(latch_pin_actions.data_pin_ctx)
     enab: DigitalOutputDevice = identifier(latch_pin_actions.enab_pin_ctx)
     addr_1: DigitalOutputDevice = identifier(latch_pin_actions.addr_pin_ctx)
     addr_2: DigitalOutputDevice = identifier(latch_pin_actions.addr_pin_ctx)
     addr_3: DigitalOutputDevice = identifier(latch_pin_actions.addr_pin_ctx)
     _identifier: str = field(default="latch")
+    # addresses in the order they were queued
+    queue: deque[int] = field(default_factory=deque, repr=False)
+    # {addr: (state, future)} of the queued writes
+    pending: dict[int, tuple[int, Future]] = field(default_factory=dict, repr=False)
+    busy: bool = field(default=False, repr=False)
+    condition: threading.Condition = field(
+        default_factory=threading.Condition, repr=False
+    )
+    worker: threading.Thread = field(default=None, repr=False)
 
-    def set(self, addr: str, state: int) -> None:
-        self.queue.append((addr, state))
-        if not self.lock:
-            self.process_queue()
+    def set(self, addr: int, state: int) -> Future:
+        """
+        Queue a write to the latch without waiting for it.
 
-    def process_queue(self):
-        logging.info("Processing Queue on the latch")
-        self.lock = True
-        while len(self.queue) > 0:
-            addr, newState = self.queue.pop(0)
-            self._set_one_device(addr, newState)
-            # not using asyncio.sleep because real output devices are not async
-        self.lock = False
+        Returns:
+            Future: resolves with the state once it is written to the latch
+        """
+        with self.condition:
+            if addr in self.pending:
+                _, future = self.pending[addr]
+            else:
+                future = Future()
+                self.queue.append(addr)
+            self.pending[addr] = (state, future)
+            if self.worker is None:
+                self.worker = threading.Thread(
+                    target=self._process_queue,
+                    name=f"{self._identifier}_worker",
+                    daemon=True,
+                )
+                self.worker.start()
+            self.condition.notify_all()
+        return future
 
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued write is written to the latch.
+
+        Returns:
+            bool: False if the timeout ran out first
+        """
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: not self.queue and not self.busy, timeout
+            )
+
+    def _process_queue(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.queue)
+                addr = self.queue.popleft()
+                newState, future = self.pending.pop(addr)
+                self.busy = True
+            if is_tracing():
+                logging.debug("Writing %s to address %s of the latch", newState, addr)
+            try:
+                self._set_one_device(addr, newState)
+            except Exception as e:
+                logging.exception("Failed to write to the latch")
+                future.set_exception(e)
+            else:
+                future.set_result(newState)
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    @instrumented("latch")
     def _set_one_device(self, addr, newState):
         b0, b1, b2 = bitfield(addr)
         latch_pin_actions.set_addr(self.addr_1, b0)
@@ -130,14 +217,45 @@ def parse_latch(data: dict) -> Latch:
         raise ValueError(
             "No output device parser found. Makesure to define output device before the latch"
         )
-    if not VirtualDigitalOutputDevice in output_device_ctx.allowed_classes:
-        output_device_ctx.allowed_classes = (
-            VirtualDigitalOutputDevice,
-            *output_device_ctx.allowed_classes,
-        )
+    allow_device_class(output_device_ctx, VirtualDigitalOutputDevice)
     for identifier, addr in latch.pins.items():
         dev_identifier = f"{latch._identifier}.{identifier}"
         virtualDevice = VirtualDigitalOutputDevice(latch, addr)
         register_device(output_device_ctx, dev_identifier, virtualDevice)
 
     return latch
+
+
+@device_action(ctx)
+async def set_output_async(latch: Latch, name: str, state: int) -> None:
+    """
+    Set an output of the latch and wait until it is written without blocking the event loop.
+
+    Args:
+        latch (Latch): the latch
+        name (str): name of the output in the latch pins (i.e. "latch_1")
+        state (int): 0 or 1
+    """
+    output = output_device_ctx.store[f"{latch._identifier}.{name}"]
+    output.value = state
+    if output.pending is not None:
+        await asyncio.wrap_future(output.pending)
+
+
+@device_action(ctx)
+async def flush_async(latch: Latch) -> None:
+    """
+    Wait until every queued write of the latch is written.
+
+    Args:
+        latch (Latch): the latch
+    """
+    await run_blocking(latch.flush)
+
+
+@device_exit(ctx)
+def flush_latches() -> None:
+    """Wait for the queued writes of every latch before exiting."""
+    # only the created latches can have writes queued, the latches not created yet (configured lazily) are left alone
+    for latch in ctx.store.values():
+        latch.flush(ENABLE_DURATION * len(latch.pins) * 2)
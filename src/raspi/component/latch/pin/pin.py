@@ -1,7 +1,17 @@
+from __future__ import annotations
+
 import logging
+from typing import TYPE_CHECKING
+
+from state_management import (
+    create_masked_context,
+    device_action,
+    is_tracing,
+    output_device_ctx,
+)
 
-from gpiozero import DigitalOutputDevice
-from state_management import create_masked_context, device_action, output_device_ctx
+if TYPE_CHECKING:
+    from gpiozero import DigitalOutputDevice
 
 enab_pin_ctx = create_masked_context(output_device_ctx, "enab_pin")
 data_pin_ctx = create_masked_context(output_device_ctx, "data_pin")
@@ -57,7 +67,8 @@ def set_data(dev: DigitalOutputDevice, state: int) -> None:
         dev (DigitalOutputDevice): the data pin
         state (int): 1 to turn the pin on, 0 to turn it off
     """
-    logging.debug("Setting data pin to %s", state)
+    if is_tracing():
+        logging.debug("Setting data pin to %s", state)
     dev.on() if state > 0 else dev.off()
 
 
@@ -72,7 +83,8 @@ def get_data(dev: DigitalOutputDevice) -> int:
     Returns:
         int: 1 if the pin is on, 0 if the pin is off
     """
-    logging.debug("Getting data pin value")
+    if is_tracing():
+        logging.debug("Getting data pin value")
     return dev.value
 
 
@@ -87,7 +99,8 @@ def toggle_data(dev: DigitalOutputDevice) -> int:
     Returns:
         int: 1 if the pin is on, 0 if the pin is off
     """
-    logging.debug("Toggling data pin")
+    if is_tracing():
+        logging.debug("Toggling data pin")
     return dev.toggle()
 
 
@@ -1,2 +1 @@
 from . import switch as limit_switch_actions
-from .io_expander import *
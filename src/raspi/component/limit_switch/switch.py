@@ -1,5 +1,12 @@
-from gpiozero import DigitalInputDevice
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from state_management import create_masked_context, device_action, input_device_ctx
+from state_management.utils import dispatched, input_events
+
+if TYPE_CHECKING:
+    from gpiozero import DigitalInputDevice
 
 ctx = create_masked_context(input_device_ctx, "limit_switch")
 
@@ -16,9 +23,9 @@ def is_limit_switch_active(device: DigitalInputDevice) -> bool:
 
 @device_action(ctx)
 def on_limit_switch_activated(device: DigitalInputDevice, action: callable) -> None:
-    device.when_activated = action
+    input_events(device).when_activated = dispatched(device, action)
 
 
 @device_action(ctx)
 def on_limit_switch_deactivated(device: DigitalInputDevice, action: callable) -> None:
-    device.when_deactivated = action
+    input_events(device).when_deactivated = dispatched(device, action)
@@ -8,8 +8,11 @@ from state_management import (
     create_context,
     device_parser,
     device_action,
+    get_device,
 )
 from . import raw_motor_action
+from .pin import step_pin_action
+from .pulse import create_backend, interleave_pulses
 
 # from component.limit_switch import limit_switch_actions
 
@@ -42,3 +45,70 @@ def parse_motor(config):
 @device_action(ctx)
 def step_n(motor: Motor, n: int):
     raw_motor_action.step_n(motor.raw_motor, n)
+
+
+@device_action(ctx)
+async def step_n_async(motor: Motor, n: int):
+    await raw_motor_action.step_n_async(motor.raw_motor, n)
+
+
+def plan_move(targets: dict) -> tuple[list, list, tuple, object]:
+    """
+    Prepare a coordinated move: set the directions and interleave the steps of every motor
+    into one pulse train timed by the motor with the most steps. Every motor in targets must have steps.
+
+    Returns:
+        (motors, step_pins, pulses, backend)
+    """
+    motors = [get_device(raw_motor_action.ctx, name) for name in targets]
+    steps = [abs(n) for n in targets.values()]
+    for motor, n in zip(motors, targets.values()):
+        raw_motor_action.set_dir(motor, int(n > 0))
+    lead = motors[steps.index(max(steps))]
+    step_pins = [
+        get_device(step_pin_action.step_ctx, motor.step_pin) for motor in motors
+    ]
+    pulses = interleave_pulses(raw_motor_action.pulses(lead, max(steps)), steps)
+    # the pins can only be played together by one backend
+    backend = motors[0].backend
+    if any(motor.backend is not backend for motor in motors):
+        backend = create_backend("software", step_pins)
+    return motors, step_pins, pulses, backend
+
+
+def move(targets: dict) -> None:
+    """
+    Step several raw motors at the same time. The steps of every motor are spread over the
+    pulse train of the motor with the most steps, so every motor starts and finishes together
+    and the move takes as long as the longest single move instead of the sum of them.
+
+    Args:
+        targets (dict[str | RawMotor, int]): steps of each raw motor, negative to step backwards
+
+    example:
+    ```python
+    move({"motor_1": 100, "motor_2": -50})
+    ```
+    """
+    logging.info("Moving motors %s", targets)
+    # motors without steps keep their direction and are not waited for
+    targets = {motor: n for motor, n in targets.items() if n}
+    if not targets:
+        return
+    motors, step_pins, pulses, backend = plan_move(targets)
+    for motor in motors:
+        step_pin_action.wait_for_direction(motor.direction_pin)
+    backend.send(step_pins, pulses)
+
+
+async def move_async(targets: dict) -> None:
+    """Same as move without blocking the event loop."""
+    logging.info("Moving motors %s", targets)
+    # motors without steps keep their direction and are not waited for
+    targets = {motor: n for motor, n in targets.items() if n}
+    if not targets:
+        return
+    motors, step_pins, pulses, backend = plan_move(targets)
+    for motor in motors:
+        await step_pin_action.wait_for_direction_async(motor.direction_pin)
+    await backend.send_async(step_pins, pulses)
@@ -1,7 +1,13 @@
+from __future__ import annotations
+
 import logging
-from gpiozero import PWMOutputDevice
+from typing import TYPE_CHECKING
+
 from state_management import create_masked_context, device_action, pwm_output_device_ctx
 
+if TYPE_CHECKING:
+    from gpiozero import PWMOutputDevice
+
 ctx = create_masked_context(pwm_output_device_ctx, "speedPin")
 
 
@@ -1,6 +1,13 @@
-from gpiozero import DigitalOutputDevice
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
 from state_management import create_masked_context, device_action, output_device_ctx
 
+if TYPE_CHECKING:
+    from gpiozero import DigitalOutputDevice
+
 step_ctx = create_masked_context(output_device_ctx, "stepPin")
 direction_ctx = create_masked_context(output_device_ctx, "directionPin")
 
@@ -116,6 +123,35 @@ def set_direction(directionPin: DigitalOutputDevice, direction: int) -> None:
     directionPin.value = direction
 
 
+@device_action(direction_ctx)
+def wait_for_direction(
+    directionPin: DigitalOutputDevice, timeout: float = None
+) -> None:
+    """
+    Block until the direction set last is applied. Direction pins on a latch are written in the background,
+    GPIO pins are set immediately.
+
+    Args:
+        directionPin (DigitalOutputDevice): the direction pin to wait for
+        timeout (float): max seconds to wait
+    """
+    if hasattr(directionPin, "wait_until_set"):
+        directionPin.wait_until_set(timeout)
+
+
+@device_action(direction_ctx)
+async def wait_for_direction_async(directionPin: DigitalOutputDevice) -> None:
+    """
+    Wait until the direction set last is applied without blocking the event loop.
+
+    Args:
+        directionPin (DigitalOutputDevice): the direction pin to wait for
+    """
+    pending = getattr(directionPin, "pending", None)
+    if pending is not None:
+        await asyncio.wrap_future(pending)
+
+
 @device_action(direction_ctx)
 def check_direction_high(directionPin: DigitalOutputDevice) -> bool:
     """
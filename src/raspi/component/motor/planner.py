@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from .pulse import Pulse
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PROFILES = ("trapezoid", "s_curve")
+# samples of the acceleration ramp used to look up when each step happens
+RAMP_SAMPLES = 1024
+
+
+def ramp(profile: str) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Shape of the acceleration ramp from standstill to the peak velocity.
+
+    Args:
+        profile (str): "trapezoid" (constant acceleration) or "s_curve" (smoothstep velocity, no jump in acceleration)
+
+    Returns:
+        (u, position, time_factor): position(u) of the ramp as a fraction of peak_velocity * ramp_time
+        for u = t / ramp_time in [0, 1], and ramp_time * acceleration / peak_velocity
+    """
+    import numpy as np
+
+    u = np.linspace(0, 1, RAMP_SAMPLES)
+    if profile == "trapezoid":
+        return u, u**2 / 2, 1
+    if profile == "s_curve":
+        # velocity 3u^2 - 2u^3 peaks its acceleration at 1.5 * peak_velocity / ramp_time
+        return u, u**3 - u**4 / 2, 1.5
+    raise ValueError(f"Profile must be one of {PROFILES}. Got {profile}")
+
+
+@lru_cache(maxsize=256)
+def plan_periods(
+    steps: int, max_velocity: float, acceleration: float, profile: str = "trapezoid"
+) -> tuple[float, ...]:
+    """
+    Time between consecutive steps of a move that starts and ends at standstill.
+    The motor accelerates to max_velocity, cruises and decelerates symmetrically. Short moves that can not
+    reach max_velocity turn around at the highest velocity they can reach.
+    Cached since the same moves are repeated.
+
+    Args:
+        steps (int): number of steps
+        max_velocity (float): steps per second
+        acceleration (float): max steps per second^2
+        profile (str): "trapezoid" or "s_curve"
+
+    Returns:
+        tuple[float]: seconds from each step to the next (steps - 1 values)
+    """
+    import numpy as np
+
+    if max_velocity <= 0 or acceleration <= 0:
+        raise ValueError("max_velocity and acceleration must be positive")
+    u, shape, time_factor = ramp(profile)
+    distance = steps - 1
+    if distance <= 0:
+        return ()
+    # distance covered by a ramp to velocity v is shape[-1] * time_factor * v^2 / acceleration
+    ramp_distance = shape[-1] * time_factor / acceleration
+    peak_velocity = min(max_velocity, np.sqrt(distance / 2 / ramp_distance))
+    ramp_time = time_factor * peak_velocity / acceleration
+    ramp_distance *= peak_velocity**2
+    cruise_time = (distance - 2 * ramp_distance) / peak_velocity
+
+    position = np.arange(steps, dtype=np.float64)
+    # time of each step measured from the start and, for the deceleration, from the end of the move
+    from_start = np.interp(position, shape * peak_velocity * ramp_time, u * ramp_time)
+    from_end = np.interp(
+        distance - position, shape * peak_velocity * ramp_time, u * ramp_time
+    )
+    total = 2 * ramp_time + cruise_time
+    times = np.where(
+        position <= ramp_distance,
+        from_start,
+        np.where(
+            distance - position <= ramp_distance,
+            total - from_end,
+            ramp_time + (position - ramp_distance) / peak_velocity,
+        ),
+    )
+    return tuple(np.diff(times).tolist())
+
+
+@lru_cache(maxsize=256)
+def plan_pulses(
+    steps: int,
+    high_duration: float,
+    max_velocity: float,
+    acceleration: float,
+    profile: str = "trapezoid",
+    channel: int = 0,
+) -> tuple[Pulse, ...]:
+    """
+    Pulse train of a move following the acceleration profile.
+
+    Args:
+        steps (int): number of steps
+        high_duration (float): seconds the step pin stays high
+        max_velocity (float): steps per second
+        acceleration (float): max steps per second^2
+        profile (str): "trapezoid" or "s_curve"
+        channel (int): channel of the step pin
+
+    Returns:
+        tuple[Pulse]: the pulse train (no low time after the last step)
+    """
+    if steps <= 0:
+        return ()
+    bit = 1 << channel
+    high = Pulse(bit, 0, high_duration)
+    pulses = []
+    for period in plan_periods(steps, max_velocity, acceleration, profile):
+        pulses += (high, Pulse(0, bit, max(period - high_duration, 0)))
+    pulses += (high, Pulse(0, bit, 0))
+    return tuple(pulses)
@@ -0,0 +1,280 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from time import perf_counter, sleep
+
+from state_management.utils import FakeDigitalOutputDevice, is_dev
+
+# pigpio can not hold an unlimited amount of pulses in one wave
+MAX_WAVE_PULSES = 5000
+
+
+@dataclass(frozen=True, slots=True)
+class Pulse:
+    """
+    One edge of a pulse train.
+
+    on: int = bitmask of the channels(index of the pin passed to the backend) set high
+    off: int = bitmask of the channels set low
+    delay: float = seconds until the next pulse
+    """
+
+    on: int
+    off: int
+    delay: float
+
+
+@lru_cache(maxsize=128)
+def step_pulses(
+    steps: int, high_duration: float, low_duration: float, channel: int = 0
+) -> tuple[Pulse, ...]:
+    """
+    Pulse train of a motor stepping at a constant rate. Cached since the same moves are repeated.
+
+    Args:
+        steps (int): number of steps
+        high_duration (float): seconds the step pin stays high
+        low_duration (float): seconds the step pin stays low between steps
+        channel (int): channel of the step pin
+
+    Returns:
+        tuple[Pulse]: the pulse train (no low time after the last step)
+    """
+    if steps <= 0:
+        return ()
+    bit = 1 << channel
+    high, low = Pulse(bit, 0, high_duration), Pulse(0, bit, low_duration)
+    return (high, low) * (steps - 1) + (high, Pulse(0, bit, 0))
+
+
+def interleave_pulses(lead: tuple[Pulse, ...], steps: list[int]) -> tuple[Pulse, ...]:
+    """
+    Spread the steps of several channels over the ticks of a lead train (Bresenham), so every channel
+    finishes together with the lead channel.
+
+    Args:
+        lead (tuple[Pulse]): single channel train of max(steps) steps, e.g. from step_pulses
+        steps (list[int]): number of steps of each channel, the index is the channel
+
+    Returns:
+        tuple[Pulse]: the pulse train with the timing of the lead train
+    """
+    ticks = len(lead) // 2
+    errors = [ticks // 2] * len(steps)
+    pulses = []
+    for tick in range(ticks):
+        mask = 0
+        for channel, count in enumerate(steps):
+            errors[channel] += count
+            if errors[channel] >= ticks:
+                errors[channel] -= ticks
+                mask |= 1 << channel
+        pulses += (
+            Pulse(mask, 0, lead[2 * tick].delay),
+            Pulse(0, mask, lead[2 * tick + 1].delay),
+        )
+    return tuple(pulses)
+
+
+async def play_async(pins: list, pulses: tuple[Pulse, ...]) -> None:
+    """
+    Play a pulse train on the running event loop against timestamps computed from the start of the train.
+    The loop wakes up with about a millisecond of resolution, edges that are due by then are played together.
+    """
+    at = perf_counter()
+    for pulse in pulses:
+        remaining = at - perf_counter()
+        # yield even when late so other trains on the loop keep running
+        await asyncio.sleep(max(remaining, 0))
+        set_pins(pins, pulse)
+        at += pulse.delay
+
+
+async def acquire_async(lock: threading.Lock) -> None:
+    """acquire a lock from the event loop without blocking it"""
+    while not lock.acquire(blocking=False):
+        await asyncio.sleep(0.001)
+
+
+def wait_until(deadline: float) -> None:
+    """sleep until the deadline on the perf_counter clock, spinning for the last millisecond"""
+    remaining = deadline - perf_counter()
+    if remaining > 0.002:
+        sleep(remaining - 0.001)
+    while perf_counter() < deadline:
+        pass
+
+
+class SoftwareBackend:
+    """
+    Toggles the pins from the calling thread with sleep() between pulses.
+    Used for pins that can not be driven by a wave, e.g. pins on the latch.
+    """
+
+    def send(self, pins: list, pulses: tuple[Pulse, ...]) -> None:
+        for pulse in pulses:
+            set_pins(pins, pulse)
+            if pulse.delay:
+                sleep(pulse.delay)
+
+    async def send_async(self, pins: list, pulses: tuple[Pulse, ...]) -> None:
+        await play_async(pins, pulses)
+
+
+class MockWaveBackend:
+    """
+    Stands in for the DMA wave engine in the dev environment.
+    Every edge is played at a time computed from the start of the train instead of after the previous edge,
+    so late edges do not push back the rest of the train. Only one train plays at a time like on the real engine.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def send(self, pins: list, pulses: tuple[Pulse, ...]) -> None:
+        with self.lock:
+            at = perf_counter()
+            for pulse in pulses:
+                wait_until(at)
+                set_pins(pins, pulse)
+                at += pulse.delay
+
+    async def send_async(self, pins: list, pulses: tuple[Pulse, ...]) -> None:
+        await acquire_async(self.lock)
+        try:
+            await play_async(pins, pulses)
+        finally:
+            self.lock.release()
+
+
+class PigpioWaveBackend:
+    """
+    Sends the pulse train to the pigpio daemon which plays it with DMA, so the step timing does not depend on python.
+    Trains longer than MAX_WAVE_PULSES are split into waves that are queued back to back.
+    Only one train plays at a time, use a coordinated move to step multiple motors together.
+    """
+
+    def __init__(self, pigpio, pi):
+        self.pigpio = pigpio
+        self.pi = pi
+        self.lock = threading.Lock()
+
+    def send(self, pins: list, pulses: tuple[Pulse, ...]) -> None:
+        with self.lock:
+            for _ in self._transmit(pins, pulses):
+                sleep(0.001)
+
+    async def send_async(self, pins: list, pulses: tuple[Pulse, ...]) -> None:
+        """Same as send but polls the engine from the event loop instead of blocking a thread."""
+        await acquire_async(self.lock)
+        try:
+            for _ in self._transmit(pins, pulses):
+                await asyncio.sleep(0.001)
+        finally:
+            self.lock.release()
+
+    def _transmit(self, pins: list, pulses: tuple[Pulse, ...]):
+        """Queue the waves of the train, yields whenever it has to wait for the engine. Call with the lock held."""
+        gpios = [gpio_number(pin) for pin in pins]
+        for gpio in gpios:
+            self.pi.set_mode(gpio, self.pigpio.OUTPUT)
+        wave = [
+            self.pigpio.pulse(
+                to_gpio_mask(pulse.on, gpios),
+                to_gpio_mask(pulse.off, gpios),
+                max(1, round(pulse.delay * 1e6)),
+            )
+            for pulse in pulses
+        ]
+        previous = None
+        for start in range(0, len(wave), MAX_WAVE_PULSES):
+            self.pi.wave_add_generic(wave[start : start + MAX_WAVE_PULSES])
+            wid = self.pi.wave_create()
+            # starts once the previous wave is done
+            self.pi.wave_send_using_mode(wid, self.pigpio.WAVE_MODE_ONE_SHOT_SYNC)
+            if previous is not None:
+                while self.pi.wave_tx_at() == previous:
+                    yield
+                self.pi.wave_delete(previous)
+            previous = wid
+        while self.pi.wave_tx_busy():
+            yield
+        if previous is not None:
+            self.pi.wave_delete(previous)
+
+
+def set_pins(pins: list, pulse: Pulse) -> None:
+    for channel, pin in enumerate(pins):
+        bit = 1 << channel
+        if pulse.on & bit:
+            pin.on()
+        elif pulse.off & bit:
+            pin.off()
+
+
+def gpio_number(pin) -> int | None:
+    """
+    gpio number of a gpiozero device or a mocked device, None for pins that are not a gpio.
+    The pin attribute of other devices is not a gpio, i.e. a latched pin keeps its address on the latch there.
+    """
+    if isinstance(pin, FakeDigitalOutputDevice):
+        number = pin.pin
+    else:
+        number = getattr(getattr(pin, "pin", None), "number", None)
+    return number if isinstance(number, int) else None
+
+
+def to_gpio_mask(channel_mask: int, gpios: list[int]) -> int:
+    mask = 0
+    for channel, gpio in enumerate(gpios):
+        if channel_mask & (1 << channel):
+            mask |= 1 << gpio
+    return mask
+
+
+_software_backend = SoftwareBackend()
+_wave_backend = None
+
+
+def get_wave_backend():
+    """The wave engine of this process, None if it is not available."""
+    global _wave_backend
+    if _wave_backend is not None:
+        return _wave_backend
+    if is_dev():
+        _wave_backend = MockWaveBackend()
+        return _wave_backend
+    try:
+        import pigpio
+    except ImportError:
+        logging.warning("pigpio is not installed. Stepping motors in software.")
+        return None
+    pi = pigpio.pi()
+    if not pi.connected:
+        logging.warning("pigpio daemon is not running. Stepping motors in software.")
+        return None
+    _wave_backend = PigpioWaveBackend(pigpio, pi)
+    return _wave_backend
+
+
+def create_backend(name: str, pins: list):
+    """
+    Get the backend used to send pulse trains to the pins.
+
+    Args:
+        name (str): "wave" for the wave engine (falls back to software when it can not drive the pins) or "software"
+        pins (list): pins the pulse trains are sent to
+
+    Returns:
+        SoftwareBackend | MockWaveBackend | PigpioWaveBackend
+    """
+    if name == "software":
+        return _software_backend
+    if name != "wave":
+        raise ValueError(f'Pulse backend must be "wave" or "software". Got {name}')
+    if any(gpio_number(pin) is None for pin in pins):
+        logging.warning("%s can not be driven by a wave. Using software.", pins)
+        return _software_backend
+    return get_wave_backend() or _software_backend
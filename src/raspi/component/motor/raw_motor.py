@@ -1,28 +1,45 @@
+from __future__ import annotations
+
 import logging
 from dataclasses import dataclass, field
 from time import sleep
+from typing import TYPE_CHECKING
 
-from gpiozero import DigitalOutputDevice
 from state_management import (
     create_context,
     device,
     device_action,
     device_parser,
+    get_device,
     identifier,
 )
 
 from .pin import step_pin_action
+from .planner import PROFILES, plan_pulses
+from .pulse import create_backend, step_pulses
+
+if TYPE_CHECKING:
+    from gpiozero import DigitalOutputDevice
 
 
 @device
 @dataclass
 class RawMotor:
-    """A data class for a raw motor."""
+    """
+    A data class for a raw motor.
+    Steps at a constant rate of high_duration + low_duration unless max_velocity and acceleration are set,
+    then moves follow the acceleration profile.
+    """
 
     high_duration: float = 0  # seconds but can basically be zero.
     low_duration: float = 0  # seconds but can basically be zero.
+    max_velocity: float = 0  # steps per second, 0 to step at a constant rate
+    acceleration: float = 0  # steps per second^2
+    profile: str = "trapezoid"  # "trapezoid" or "s_curve"
     step_pin: DigitalOutputDevice = identifier(step_pin_action.step_ctx)
     direction_pin: DigitalOutputDevice = identifier(step_pin_action.direction_ctx)
+    pulse_backend: str = "wave"  # "wave" or "software"
+    backend: object = field(default=None, repr=False)
 
 
 ctx = create_context("raw_motor", (RawMotor,))
@@ -31,7 +48,13 @@ ctx = create_context("raw_motor", (RawMotor,))
 @device_parser(ctx)
 def parse_raw_motor(data: dict) -> RawMotor:
     """Parse a raw motor from a dictionary."""
-    return RawMotor(**data)
+    motor = RawMotor(**data)
+    if motor.profile not in PROFILES:
+        raise ValueError(f"Profile must be one of {PROFILES}. Got {motor.profile}")
+    motor.backend = create_backend(
+        motor.pulse_backend, [get_device(step_pin_action.step_ctx, motor.step_pin)]
+    )
+    return motor
 
 
 @device_action(ctx)
@@ -48,11 +71,37 @@ def step_n(motor: RawMotor, n: int) -> None:
     logging.info("Stepping motor %d times", n)
     direction = n > 0
     set_dir(motor, int(direction))
+    # a latched direction pin is written in the background, it has to be set before the first step
+    step_pin_action.wait_for_direction(motor.direction_pin)
     logging.info("successfully switched direction")
-    for i in range(abs(n)):
-        step_1(motor)
-        if i != n - 1:
-            sleep(motor.low_duration)
+    # the whole pulse train is computed up front and timed by the backend instead of sleeping between steps
+    motor.backend.send(
+        [get_device(step_pin_action.step_ctx, motor.step_pin)], pulses(motor, abs(n))
+    )
+
+
+@device_action(ctx)
+async def step_n_async(motor: RawMotor, n: int) -> None:
+    """Step the motor n times without blocking the event loop."""
+    logging.info("Stepping motor %d times", n)
+    set_dir(motor, int(n > 0))
+    await step_pin_action.wait_for_direction_async(motor.direction_pin)
+    await motor.backend.send_async(
+        [get_device(step_pin_action.step_ctx, motor.step_pin)], pulses(motor, abs(n))
+    )
+
+
+def pulses(motor: RawMotor, steps: int) -> tuple:
+    """Pulse train of a move, planned with the acceleration profile when the motor has one."""
+    if motor.max_velocity > 0 and motor.acceleration > 0:
+        return plan_pulses(
+            steps,
+            motor.high_duration,
+            motor.max_velocity,
+            motor.acceleration,
+            motor.profile,
+        )
+    return step_pulses(steps, motor.high_duration, motor.low_duration)
 
 
 @device_action(ctx)
@@ -1,7 +1,9 @@
+from __future__ import annotations
+
 import logging
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from gpiozero import DigitalInputDevice, DigitalOutputDevice
 from state_management import (
     create_generic_context,
     device,
@@ -12,6 +14,9 @@ from state_management import (
 
 from .pneumatics import pressure_actions, valve_actions
 
+if TYPE_CHECKING:
+    from gpiozero import DigitalInputDevice, DigitalOutputDevice
+
 
 @device
 @dataclass
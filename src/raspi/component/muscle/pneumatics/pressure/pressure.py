@@ -1,5 +1,12 @@
-from gpiozero import DigitalInputDevice
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from state_management import create_masked_context, device_action, input_device_ctx
+from state_management.utils import dispatched, input_events
+
+if TYPE_CHECKING:
+    from gpiozero import DigitalInputDevice
 
 ctx = create_masked_context(input_device_ctx, "pressure")
 
@@ -27,7 +34,7 @@ def on_pressure_active(device: DigitalInputDevice, action: callable) -> None:
         name (str): the name of the pressure sensor
         action (callable): the action to perform when the pressure sensor changes
     """
-    device.when_activated = action
+    input_events(device).when_activated = dispatched(device, action)
 
 
 @device_action(ctx)
@@ -39,4 +46,4 @@ def on_pressure_deactive(device: DigitalInputDevice, action: callable) -> None:
         name (str): the name of the pressure sensor
         action (callable): the action to perform when the pressure sensor changes
     """
-    device.when_deactivated = action
+    input_events(device).when_deactivated = dispatched(device, action)
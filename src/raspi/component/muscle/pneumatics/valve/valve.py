@@ -1,7 +1,14 @@
+from __future__ import annotations
+
+import asyncio
 import logging
-from gpiozero import DigitalOutputDevice
+from typing import TYPE_CHECKING
+
 from state_management import create_masked_context, device_action, output_device_ctx
 
+if TYPE_CHECKING:
+    from gpiozero import DigitalOutputDevice
+
 ctx = create_masked_context(output_device_ctx, "valve")
 
 
@@ -25,7 +32,7 @@ def turn_valve_off(valve: DigitalOutputDevice) -> None:
     Args:
         valve (DigitalOutputDevice): the valve to turn off
     """
-    logging.info("turning valve on %s", valve)
+    logging.info("turning valve off %s", valve)
     valve.off()
 
 
@@ -41,6 +48,22 @@ def turn_valve(valve: DigitalOutputDevice, state: bool) -> None:
     turn_valve_on(valve) if state else turn_valve_off(valve)
 
 
+@device_action(ctx)
+async def turn_valve_async(valve: DigitalOutputDevice, state: bool) -> None:
+    """
+    Turn a valve on or off and wait until it is switched without blocking the event loop.
+    Valves on a latch are written in the background, GPIO valves are switched immediately.
+
+    Args:
+        valve (DigitalOutputDevice): the valve to turn on or off
+        state (bool): `True` to turn the valve on, `False` to turn it off
+    """
+    turn_valve(valve, state)
+    pending = getattr(valve, "pending", None)
+    if pending is not None:
+        await asyncio.wrap_future(pending)
+
+
 @device_action(ctx)
 def toggle_valve(valve: DigitalOutputDevice) -> None:
     """
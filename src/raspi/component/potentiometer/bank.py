@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class PotentiometerBank:
+    """
+    Constants of every parsed potentiometer stored as numpy arrays so readings of many potentiometers
+    can be converted to degrees in one vectorized operation.
+
+    Each potentiometer gets a slot when it is parsed. The arrays are rebuilt the first time they are used
+    after a potentiometer is added, which happens once after configuration. numpy is imported with the arrays
+    so configuring the potentiometers does not wait for it.
+    """
+
+    def __init__(self):
+        self.slot_of = {}  # {id(potentiometer): slot}
+        self._min_data = []
+        self._min_degree = []
+        self._scale = []
+        self._arrays = None
+
+    def add(self, pot) -> int:
+        """
+        Add a potentiometer to the bank.
+
+        :param pot: Potentiometer = potentiometer with cached_data already computed
+        :return: int = slot of the potentiometer
+        """
+        slot = len(self._scale)
+        self.slot_of[id(pot)] = slot
+        self._min_data.append(pot.min_data)
+        self._min_degree.append(pot.min_degree)
+        self._scale.append(pot.cached_data)
+        self._arrays = None
+        return slot
+
+    @property
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(min_data, min_degree, scale) of every slot"""
+        if self._arrays is None:
+            import numpy as np
+
+            self._arrays = (
+                np.array(self._min_data, dtype=np.float64),
+                np.array(self._min_degree, dtype=np.float64),
+                np.array(self._scale, dtype=np.float64),
+            )
+        return self._arrays
+
+    def slots(self, pots: list) -> np.ndarray:
+        """
+        Slots of the potentiometers. Compute this once and reuse it when converting the same potentiometers repeatedly.
+
+        :param pots: list[Potentiometer]
+        :return: np.ndarray[intp] = slot of each potentiometer
+        """
+        import numpy as np
+
+        return np.fromiter((self.slot_of[id(pot)] for pot in pots), np.intp, len(pots))
+
+    def data_to_degrees(self, data, slots: np.ndarray = None) -> np.ndarray:
+        """
+        Convert 12 bit adc values to degrees.
+        formula used: ((data - MIN_DATA) * ((MAX_DEGREE - MIN_DEGREE) / (MAX_DATA - MIN_DATA))) + MIN_DEGREE
+
+        :param data: array-like[int] = adc value of each potentiometer
+        :param slots: np.ndarray[intp] = slot of each value (default: the values are in slot order)
+        :return: np.ndarray[float64] = degree of each potentiometer
+        """
+        import numpy as np
+
+        min_data, min_degree, scale = self.arrays
+        if slots is not None:
+            min_data, min_degree, scale = (
+                min_data[slots],
+                min_degree[slots],
+                scale[slots],
+            )
+        return (np.asarray(data, dtype=np.float64) - min_data) * scale + min_degree
+
+    def bytes_to_degrees(self, buffer, slots: np.ndarray = None) -> np.ndarray:
+        """
+        Convert raw adc bytes to degrees.
+
+        :param buffer: bytes-like = 2 bytes per channel, first byte is the high byte (same as fbyte << 8 | sbyte)
+        :param slots: np.ndarray[intp] = slot of each channel (default: the channels are in slot order)
+        :return: np.ndarray[float64] = degree of each potentiometer
+        """
+        import numpy as np
+
+        return self.data_to_degrees(np.frombuffer(buffer, dtype=">u2"), slots)
@@ -1,14 +1,21 @@
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, fields
 
 from component.adc import ADC_action
 from state_management import (
     create_context,
     device,
     device_action,
+    device_compiler,
+    device_exit,
     device_parser,
+    get_device,
     identifier,
 )
 
+from .bank import PotentiometerBank
+from .sampler import PotentiometerSampler
+
 
 @device
 @dataclass
@@ -25,6 +32,29 @@ class Potentiometer:
 
 
 ctx = create_context("potentiometer", Potentiometer)
+bank = PotentiometerBank()
+
+
+@device_compiler(ctx)
+def compile_potentiometer(config: dict | str) -> dict:
+    """
+    Validate the potentiometer config and precompute cached_data.
+
+    Returns:
+        dict: the config with cached_data filled in
+    """
+    config = {"input_device": config} if isinstance(config, str) else dict(config)
+    defaults = {f.name: f.default for f in fields(Potentiometer)}
+    max_data = config.get("max_data", defaults["max_data"])
+    min_data = config.get("min_data", defaults["min_data"])
+    if max_data == min_data:
+        raise ValueError(f"max_data and min_data must be different. Got {max_data}")
+    if config.get("cached_data") is None:
+        config["cached_data"] = (
+            config.get("max_degree", defaults["max_degree"])
+            - config.get("min_degree", defaults["min_degree"])
+        ) / (max_data - min_data)
+    return config
 
 
 @device_parser(ctx)
@@ -40,6 +70,7 @@ def parse_potentiometer(config: dict):
         max_data: int = max data of the potentiometer
         min_data: int = min data of the potentiometer
     } | str = analog input device object
+    or the config returned by compile_potentiometer
     """
     if isinstance(config, str):
         config = {"input_device": config}
@@ -48,6 +79,7 @@ def parse_potentiometer(config: dict):
     pot.cached_data = (
         pot.cached_data if pot.cached_data is not None else create_cached_data(pot)
     )
+    bank.add(pot)
     return pot
 
 
@@ -68,17 +100,22 @@ def get_data(potentiometer: Potentiometer):
 
 
 @device_action(ctx)
-def get_degree(potentiometer: Potentiometer):
+def get_degree(potentiometer: Potentiometer, max_age: float = None):
     """
     Get the degree of the potentiometer. Map function for converting data to degree.
     formula used: ((data - MIN_DATA) * ((MAX_DEGREE - MIN_DEGREE) / (MAX_DATA - MIN_DATA))) + MIN_DEGREE
 
     Args:
     potentiometer: Potentiometer = potentiometer object
+    max_age: float = if the sampler is running and has a reading newer than max_age seconds, return it without reading the adc
 
     Returns:
     degree: int = degree of the potentiometer
     """
+    if max_age is not None and sampler is not None:
+        degree = sampler.get(potentiometer, max_age)
+        if degree is not None:
+            return degree
     min_data, min_degree, cached_data = (
         potentiometer.min_data,
         potentiometer.min_degree,
@@ -88,6 +125,82 @@ def get_degree(potentiometer: Potentiometer):
     return (data - min_data) * cached_data + min_degree
 
 
+def get_degrees(potentiometers: list) -> list[float]:
+    """
+    Get the degree of multiple potentiometers. Potentiometers on the same adc are read in one i2c transaction.
+
+    Args:
+    potentiometers: list[str | Potentiometer] = potentiometer identifiers or objects
+
+    Returns:
+    degrees: list[float] = degree of each potentiometer in the same order
+    """
+    pots = [get_device(ctx, pot) for pot in potentiometers]
+    # {id(adc): (adc, [(index of the potentiometer in pots, register), ...])}
+    by_adc = {}
+    for i, pot in enumerate(pots):
+        input_device = get_device(ADC_action.analog_input_device_ctx, pot.input_device)
+        adc = input_device.adc
+        by_adc.setdefault(id(adc), (adc, []))[1].append((i, input_device.address))
+    # read every adc first then convert all readings at once
+    order, raw = [], []
+    for adc, channels in by_adc.values():
+        raw.append(adc.read_raw([register for _, register in channels]))
+        order.extend(i for i, _ in channels)
+    values = bank.bytes_to_degrees(b"".join(raw), bank.slots([pots[i] for i in order]))
+    degrees = [0.0] * len(pots)
+    for i, degree in zip(order, values.tolist()):
+        degrees[i] = degree
+    return degrees
+
+
 def create_cached_data(pot: Potentiometer) -> float:
     """(MAX_DEGREE - MIN_DEGREE) / (MAX_DATA - MIN_DATA)"""
     return (pot.max_degree - pot.min_degree) / (pot.max_data - pot.min_data)
+
+
+sampler: PotentiometerSampler = None
+
+
+def start_sampling(
+    rate: float = 100, potentiometers: list = None
+) -> PotentiometerSampler:
+    """
+    Start reading the potentiometers in the background so get_degree(..., max_age=...) can skip the adc.
+
+    Args:
+    rate: float = samples per second
+    potentiometers: list[str | Potentiometer] = potentiometers to sample (default: every configured potentiometer)
+
+    Returns:
+    sampler: PotentiometerSampler = the running sampler
+    """
+    global sampler
+    stop_sampling()
+    if potentiometers is None:
+        pots = list({id(pot): pot for pot in ctx.store.all()}.values())
+    else:
+        pots = [get_device(ctx, pot) for pot in potentiometers]
+    sampler = PotentiometerSampler(pots, rate, get_degrees)
+    sampler.start()
+    logging.info("Sampling %s potentiometers at %s Hz", len(pots), rate)
+    return sampler
+
+
+@device_exit(ctx)
+def stop_sampling() -> None:
+    """Stop the background sampler if it is running."""
+    global sampler
+    if sampler is None:
+        return
+    sampler.stop()
+    logging.info("Stopped potentiometer sampler: %s", sampler.stats)
+    sampler = None
+
+
+def get_sampling_stats() -> dict:
+    """
+    Returns:
+    stats: dict = achieved sample rate and bus utilisation of the sampler (empty if it is not running)
+    """
+    return sampler.stats if sampler is not None else {}
@@ -0,0 +1,99 @@
+import logging
+import threading
+from array import array
+from math import nan
+from time import monotonic
+
+
+class PotentiometerSampler:
+    """
+    Reads a fixed set of potentiometers at a fixed rate on one thread.
+
+    The latest degree and the time it was read are kept in preallocated arrays indexed by the slot of the potentiometer.
+    The sampler thread writes the value before the timestamp, so a reader that checks the timestamp first
+    never gets a value older than the timestamp says. No lock is taken on either side.
+    """
+
+    def __init__(self, potentiometers: list, rate: float, read: callable):
+        """
+        potentiometers: list[Potentiometer] = potentiometers to sample
+        rate: float = samples per second
+        read: callable[[list[Potentiometer]], list[float]] = reads the degree of every potentiometer
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be greater than 0. Got " + str(rate))
+        self.potentiometers = potentiometers
+        self.period = 1 / rate
+        self.read = read
+        self.slots = {id(pot): slot for slot, pot in enumerate(potentiometers)}
+        self.values = array("d", [nan] * len(potentiometers))
+        self.timestamps = array("d", [-float("inf")] * len(potentiometers))
+        self.samples = 0
+        self.errors = 0
+        self.bus_time = 0.0
+        self.started_at = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="potentiometer_sampler", daemon=True
+        )
+
+    def start(self):
+        self.started_at = monotonic()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def get(self, potentiometer, max_age: float) -> float | None:
+        """
+        Get the latest reading of the potentiometer if it is not older than max_age seconds.
+
+        :return: float | None = degree of the potentiometer or None if there is no fresh reading
+        """
+        slot = self.slots.get(id(potentiometer))
+        if slot is None:
+            return None
+        if monotonic() - self.timestamps[slot] > max_age:
+            return None
+        return self.values[slot]
+
+    @property
+    def stats(self) -> dict:
+        """
+        Achieved sample rate (samples per second) and bus utilisation (fraction of the time spent reading).
+        """
+        elapsed = monotonic() - self.started_at if self.started_at else 0
+        return {
+            "samples": self.samples,
+            "errors": self.errors,
+            "rate": self.samples / elapsed if elapsed else 0.0,
+            "target_rate": 1 / self.period,
+            "bus_utilisation": self.bus_time / elapsed if elapsed else 0.0,
+        }
+
+    def _run(self):
+        deadline = monotonic()
+        values, timestamps = self.values, self.timestamps
+        while not self._stop.is_set():
+            start = monotonic()
+            try:
+                degrees = self.read(self.potentiometers)
+            except Exception:
+                self.errors += 1
+                logging.exception("Failed to sample potentiometers")
+            else:
+                now = monotonic()
+                self.bus_time += now - start
+                for slot, degree in enumerate(degrees):
+                    values[slot] = degree
+                    timestamps[slot] = now
+                self.samples += 1
+            deadline += self.period
+            remaining = deadline - monotonic()
+            if remaining < 0:
+                # could not keep up, start the next sample right away without trying to catch up
+                deadline = monotonic()
+                continue
+            self._stop.wait(remaining)
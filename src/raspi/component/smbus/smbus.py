@@ -1,13 +1,22 @@
+from __future__ import annotations
+
 import logging
 from time import sleep
-
-from state_management import create_generic_context, device_action, device_parser
+from typing import TYPE_CHECKING
+
+from state_management import (
+    allow_device_class,
+    create_generic_context,
+    device_action,
+    device_parser,
+)
 from state_management.utils import FakeSMBus, is_dev
 
-if is_dev():
+if TYPE_CHECKING:
     from smbus2 import SMBus
 
-ctx = create_generic_context("smbus2", (SMBus, FakeSMBus))
+# SMBus is allowed once a bus is opened
+ctx = create_generic_context("smbus2", FakeSMBus)
 
 
 @device_parser(ctx)
@@ -28,6 +37,9 @@ def parse_smbus2(config):
             "dev environment detected. Mocking smbus2 device for bus %s", config
         )
         return FakeSMBus(config)
+    from smbus2 import SMBus
+
+    allow_device_class(ctx, SMBus)
     bus = SMBus(config)
     return bus
 
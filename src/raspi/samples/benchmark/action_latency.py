@@ -0,0 +1,71 @@
+# Overhead of the action latency instrumentation: calls of a device action and of an @instrumented method
+# with instrumentation disabled (the default) and enabled, then the stats recorded for a short step loop.
+# run: cb sample benchmark/action_latency [calls, default 200000]
+
+import sys
+from timeit import timeit
+
+from component.motor import raw_motor_action, step_pin_action
+from state_management import (
+    configure_device,
+    disable_instrumentation,
+    enable_instrumentation,
+    format_action_stats,
+    instrumented,
+    reset_action_stats,
+)
+
+CALLS = 200_000
+STEPS = 1000
+
+
+class Plain:
+    def method(self):
+        pass
+
+
+class Instrumented:
+    @instrumented("benchmark")
+    def method(self):
+        pass
+
+
+def overhead(calls: int):
+    set_high = lambda: step_pin_action.set_high("motor_step_1")
+    plain = Plain().method
+    decorated = Instrumented().method
+    results = {}
+    for name, enable in (
+        ("disabled", disable_instrumentation),
+        ("enabled", enable_instrumentation),
+    ):
+        enable()
+        results[name] = (
+            timeit(set_high, number=calls) / calls * 1e9,
+            timeit(decorated, number=calls) / calls * 1e9,
+        )
+    disable_instrumentation()
+    base = timeit(plain, number=calls) / calls * 1e9
+    for name, (action, method) in results.items():
+        print(
+            f"instrumentation {name:<8}  set_high: {action:7.1f} ns/call  "
+            + f"@instrumented method: {method:7.1f} ns/call (undecorated {base:5.1f} ns)"
+        )
+    print(
+        f"overhead per action while enabled: {results['enabled'][0] - results['disabled'][0]:7.1f} ns"
+    )
+
+
+def step_loop():
+    enable_instrumentation()
+    reset_action_stats()
+    motor = raw_motor_action.ctx.store["motor_1"]
+    for _ in range(STEPS):
+        raw_motor_action.step_1(motor)
+    print(format_action_stats())
+    disable_instrumentation()
+
+
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+overhead(int(sys.argv[1]) if len(sys.argv) > 1 else CALLS)
+step_loop()
@@ -0,0 +1,94 @@
+# Benchmark of driving many simulated motors at the same time: one thread per motor calling step_n
+# vs one task per motor awaiting step_n_async on the shared event loop.
+# Reports the wall time of the whole batch, the cpu time spent and the number of threads used.
+# The wave engine (pigpio and its mock) plays one train at a time, so the motors use the software backend,
+# which is what steps motors at the same time (i.e. on latched pins).
+# run: cb sample benchmark/async_motors
+
+import asyncio
+import threading
+from time import perf_counter, process_time
+
+from component.motor import raw_motor_action
+from state_management import (
+    FakeDigitalOutputDevice,
+    output_device_ctx,
+    register_device,
+    run_async,
+    set_environment,
+)
+from state_management.utils import get_event_loop
+
+STEPS = 200
+MOTOR_CONFIG = {
+    "max_velocity": 1000,
+    "acceleration": 10000,
+    "pulse_backend": "software",
+}
+
+set_environment("dev")
+
+
+def create_motors(count: int) -> list[str]:
+    names = []
+    for i in range(count):
+        name = f"sim_motor_{count}_{i}"
+        for pin in ("step", "dir"):
+            register_device(
+                output_device_ctx, f"{name}_{pin}", FakeDigitalOutputDevice(100 + i)
+            )
+        motor = raw_motor_action.parse_raw_motor(
+            {
+                "step_pin": f"{name}_step",
+                "direction_pin": f"{name}_dir",
+                **MOTOR_CONFIG,
+            },
+            name,
+        )
+        register_device(raw_motor_action.ctx, name, motor)
+        names.append(name)
+    return names
+
+
+def threaded(names: list[str]) -> int:
+    threads = [
+        threading.Thread(target=raw_motor_action.step_n, args=(name, STEPS))
+        for name in names
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(threads)
+
+
+async def step_all(names: list[str]):
+    await asyncio.gather(
+        *(raw_motor_action.step_n_async(name, STEPS) for name in names)
+    )
+
+
+def concurrent(names: list[str]) -> int:
+    get_event_loop()
+    before = threading.active_count()
+    run_async(step_all(names))
+    # + the shared event loop thread
+    return threading.active_count() - before + 1
+
+
+ideal = None
+for count in (2, 8, 32):
+    names = create_motors(count)
+    if ideal is None:
+        start = perf_counter()
+        raw_motor_action.step_n(names[0], STEPS)
+        ideal = perf_counter() - start
+        print(f"one motor alone: {ideal * 1e3:.1f} ms for {STEPS} steps")
+    for mode, run in (("threads", threaded), ("asyncio", concurrent)):
+        start, cpu = perf_counter(), process_time()
+        threads = run(names)
+        wall, cpu = perf_counter() - start, process_time() - cpu
+        print(
+            f"{count:>3} motors {mode:<8} wall {wall * 1e3:8.1f} ms  "
+            + f"cpu {cpu * 1e3:8.1f} ms  threads {threads:>3}"
+        )
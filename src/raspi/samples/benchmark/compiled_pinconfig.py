@@ -0,0 +1,90 @@
+# Startup time of configure_device with the compiled pinconfig:
+# no cache (parse and build the graph every time), cold cache (compile and write the cache) and warm cache (load the cache).
+# Uses a copy of pinconfig.json in a temporary directory so the real cache is not touched.
+# Every run is a fresh process because devices can only be configured once per process.
+# run: cb sample benchmark/compiled_pinconfig [runs, default 20]
+
+import logging
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from timeit import timeit
+
+RUNS = 20
+
+
+def child(file_name: str, mode: str):
+    from component.compressor import compressor_actions
+    from component.latch import latch_actions
+    from component.motor import motor_action, raw_motor_action
+    from component.muscle import muscle_actions
+    from component.potentiometer import potentiometer_actions
+    from state_management import configure_device
+    from state_management._device import load_compiled_graph
+    from state_management._pinconfig_cache import cache_file
+
+    if mode == "cold" and os.path.exists(cache_file(file_name)):
+        os.remove(cache_file(file_name))
+    if mode == "graph":
+        logging.disable(logging.WARNING)
+        print(timeit(lambda: load_compiled_graph(file_name), number=100) / 100 * 1e3)
+        return
+    start = perf_counter()
+    configure_device(file_name, log_level="Warning", cache=mode != "none")
+    print((perf_counter() - start) * 1e3)
+
+
+def measure(file_name: str, mode: str, runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, __file__, file_name, mode],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "ENV": "dev"},
+            check=True,
+        ).stdout.splitlines()[-1]
+        times.append(float(out))
+    return times
+
+
+def parent(runs: int):
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "pinconfig.json")
+        shutil.copy("src/raspi/pinconfig.json", file_name)
+        for name, mode in (
+            ("no cache", "none"),
+            ("cold cache", "cold"),
+            ("warm cache", "warm"),
+        ):
+            times = measure(file_name, mode, runs)
+            print(
+                f"{name:<11} configure_device: mean {statistics.mean(times):7.3f} ms "
+                + f"min {min(times):7.3f} ms"
+            )
+        # the pinconfig to device graph step alone (no devices created), averaged over 100 calls per process
+        measure(file_name, "cold", 1)
+        warm = measure(file_name, "graph", runs)
+        os.remove(os.path.join(directory, ".cache", "pinconfig.json.compiled"))
+        os.chmod(
+            directory, 0o555
+        )  # keep the cache from being written so every run compiles
+        try:
+            cold = measure(file_name, "graph", runs)
+        finally:
+            os.chmod(directory, 0o755)
+        print(
+            f"pinconfig to device graph: compile {statistics.mean(cold):7.3f} ms  "
+            + f"cached {statistics.mean(warm):7.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        child(sys.argv[1], sys.argv[2])
+    else:
+        parent(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
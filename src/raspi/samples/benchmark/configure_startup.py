@@ -0,0 +1,66 @@
+# Startup time of configure_device on the stock pinconfig.json with the environment resolved once
+# vs read from the .env file on every is_dev() call (previous behavior).
+# Every run is a fresh process because devices can only be configured once per process.
+# run: cb sample benchmark/configure_startup [runs, default 20]
+
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+RUNS = 20
+
+
+def child(uncached: bool):
+    from state_management import configure_device
+    from state_management.utils import util
+
+    env_reads = 0
+    load_environment = util.load_environment
+
+    def counted_load_environment(*args, **kwargs):
+        nonlocal env_reads
+        env_reads += 1
+        return load_environment(*args, **kwargs)
+
+    util.load_environment = counted_load_environment
+    if uncached:
+        util.get_environment = counted_load_environment
+
+    from component.compressor import compressor_actions
+    from component.latch import latch_actions
+    from component.motor import motor_action, raw_motor_action
+    from component.muscle import muscle_actions
+    from component.potentiometer import potentiometer_actions
+
+    start = perf_counter()
+    configure_device("src/raspi/pinconfig.json", log_level="Warning")
+    elapsed = perf_counter() - start
+    print(f"{elapsed * 1e3} {env_reads}")
+
+
+def parent(runs: int):
+    for name, flag in (("re-read .env", "uncached"), ("cached", "cached")):
+        times, reads = [], 0
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, __file__, flag],
+                capture_output=True,
+                text=True,
+                env=os.environ,
+                check=True,
+            ).stdout.splitlines()[-1]
+            elapsed, reads = out.split()
+            times.append(float(elapsed))
+        print(
+            f"{name:<14} configure_device: mean {statistics.mean(times):7.2f} ms "
+            + f"min {min(times):7.2f} ms  ({reads} .env reads)"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("cached", "uncached"):
+        child(sys.argv[1] == "uncached")
+    else:
+        parent(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
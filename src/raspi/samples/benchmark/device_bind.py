@@ -0,0 +1,49 @@
+# Micro-benchmark of calling actions with a string identifier vs a handle returned by bind().
+# bind only saves the lookup of the identifier, so the gain is only visible on actions that return right away.
+# The step pin is also measured with an action hook set, bound calls are reported to the hooks as well.
+# Best of REPEAT runs, an action that reads the adc varies more from run to run than bind saves.
+# run: cb sample benchmark/device_bind
+
+from timeit import repeat
+
+from component.motor import step_pin_action
+from component.potentiometer import potentiometer_actions
+from state_management import add_action_hook, bind, configure_device, remove_action_hook
+
+N = 100_000
+REPEAT = 5
+
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+
+
+def report(name: str, identifier_call: callable, bound_call: callable):
+    by_identifier = min(repeat(identifier_call, number=N, repeat=REPEAT)) / N * 1e9
+    by_handle = min(repeat(bound_call, number=N, repeat=REPEAT)) / N * 1e9
+    print(
+        f"{name:<28} identifier: {by_identifier:8.1f} ns/call   "
+        + f"bound: {by_handle:8.1f} ns/call   ({by_identifier / by_handle:.2f}x)"
+    )
+
+
+step_pin = bind(step_pin_action.step_ctx, "motor_step_1")
+report(
+    "step_pin_action.set_high",
+    lambda: step_pin_action.set_high("motor_step_1"),
+    step_pin.set_high,
+)
+
+hook = lambda *args: None
+add_action_hook(hook)
+report(
+    "set_high with a hook",
+    lambda: step_pin_action.set_high("motor_step_1"),
+    step_pin.set_high,
+)
+remove_action_hook(hook)
+
+pot = bind(potentiometer_actions.ctx, "pot1")
+report(
+    "potentiometer.get_degree",
+    lambda: potentiometer_actions.get_degree("pot1"),
+    pot.get_degree,
+)
@@ -0,0 +1,79 @@
+# Overhead of recording device actions to the binary event log, and time to load and summarize 10M events.
+# The 10M events are written with the same record layout by numpy so the benchmark does not take minutes.
+# run: cb sample benchmark/event_log [events to load, default 10000000]
+
+import os
+import sys
+import tempfile
+from time import perf_counter
+from timeit import timeit
+
+import numpy as np
+from component.motor import step_pin_action
+from state_management import (
+    configure_device,
+    load_events,
+    start_recording,
+    stop_recording,
+)
+from state_management._telemetry import EVENT_FORMAT
+
+N = 200_000
+LOAD_EVENTS = 10_000_000
+
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+directory = tempfile.mkdtemp()
+
+
+def write_overhead():
+    call = lambda: step_pin_action.set_high("motor_step_1")
+    off = timeit(call, number=N) / N * 1e9
+    recorder = start_recording(os.path.join(directory, "overhead.events"))
+    on = timeit(call, number=N) / N * 1e9
+    stop_recording()
+    size = os.path.getsize(recorder.file_name)
+    print(
+        f"set_high  not recorded: {off:7.1f} ns/call  recorded: {on:7.1f} ns/call  "
+        + f"overhead {on - off:7.1f} ns/event  ({size / N:.0f} bytes/event)"
+    )
+
+
+def load(count: int):
+    file_name = os.path.join(directory, "load.events")
+    # an event log like EventRecorder writes: 64 devices, 32 actions
+    recorder = start_recording(file_name)
+    recorder.devices = {f"device_{i}": i for i in range(64)}
+    recorder.actions = {f"ctx.action_{i}": i for i in range(32)}
+    recorder._write_names()
+    stop_recording()
+    rng = np.random.default_rng(0)
+    events = np.empty(
+        count,
+        np.dtype(
+            [("time", "<f8"), ("device", "<u2"), ("action", "<u2"), ("value", "<f8")]
+        ),
+    )
+    events["time"] = np.cumsum(rng.random(count) * 1e-4)
+    events["device"] = rng.integers(0, 64, count)
+    events["action"] = rng.integers(0, 32, count)
+    events["value"] = rng.integers(0, 2, count)
+    events.tofile(file_name)
+    del events
+
+    start = perf_counter()
+    events, devices, actions = load_events(file_name)
+    loaded = perf_counter() - start
+    start = perf_counter()
+    per_device = np.bincount(events["device"], minlength=len(devices))
+    busiest = devices[int(per_device.argmax())]
+    summarized = perf_counter() - start
+    print(
+        f"{len(events):,} events ({os.path.getsize(file_name) / 1e6:.0f} MB, {EVENT_FORMAT})  "
+        + f"load_events: {loaded * 1e3:7.2f} ms  events per device: {summarized * 1e3:7.1f} ms  "
+        + f"(busiest {busiest} {per_device.max():,})"
+    )
+    os.remove(file_name)
+
+
+write_overhead()
+load(int(sys.argv[1]) if len(sys.argv) > 1 else LOAD_EVENTS)
@@ -0,0 +1,105 @@
+# Import time of the main entry point and of every sample script, measured with python -X importtime.
+# Only the module level imports of each script are run, so scripts that loop forever can be measured too.
+# The largest third party packages imported by each script are listed next to the total.
+# Every run is a fresh process since modules are only imported once per process.
+# run: cb sample benchmark/import_time [runs, default 5]
+
+import ast
+import os
+import statistics
+import subprocess
+import sys
+from glob import glob
+
+RUNS = 5
+RASPI = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# packages of this repo, everything else that is not in the standard library is a third party import
+LOCAL_PACKAGES = {"component", "state_management", "view", "samples"}
+SKIPPED_PACKAGES = LOCAL_PACKAGES | set(sys.stdlib_module_names)
+
+
+def scripts() -> list[str]:
+    samples = sorted(
+        path
+        for path in glob(os.path.join(RASPI, "samples", "**", "*.py"), recursive=True)
+        if os.sep + "benchmark" + os.sep not in path
+        and os.path.basename(path) != "__init__.py"
+    )
+    return [os.path.join(RASPI, "main.py"), *samples]
+
+
+def module_imports(path: str) -> str:
+    """the import statements at the top level of the script"""
+    with open(path) as file:
+        tree = ast.parse(file.read())
+    return "\n".join(
+        ast.unparse(node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_times(code: str) -> tuple[dict[str, tuple[int, int]], str]:
+    """
+    Import the code in a fresh process.
+
+    :return: ({module: (depth, cumulative microseconds)}, error) where depth 0 is imported by the code itself
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "ENV": "dev", "PYTHONPATH": RASPI},
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (depth, int(cumulative))
+    error = result.stderr.strip().splitlines()[-1] if result.returncode else None
+    return times, error
+
+
+def measure(code: str, baseline: set[str], runs: int):
+    totals, packages = [], {}
+    for _ in range(runs):
+        times, error = import_times(code)
+        if error is not None:
+            return None, {}, error
+        totals.append(
+            sum(
+                cumulative
+                for name, (depth, cumulative) in times.items()
+                if depth == 0 and name not in baseline
+            )
+        )
+        for name, (depth, cumulative) in times.items():
+            if "." not in name and name not in baseline | SKIPPED_PACKAGES:
+                packages.setdefault(name, []).append(cumulative)
+    packages = {name: statistics.median(t) for name, t in packages.items()}
+    return statistics.median(totals), packages, None
+
+
+def main(runs: int):
+    baseline, _ = import_times("")
+    for path in scripts():
+        code = module_imports(path)
+        total, packages, error = measure(code, set(baseline), runs)
+        name = os.path.relpath(path, RASPI)
+        if error is not None:
+            print(f"{name:<50} failed: {error}")
+            continue
+        largest = sorted(
+            (item for item in packages.items() if item[1] >= 1e3),
+            key=lambda item: -item[1],
+        )[:3]
+        print(
+            f"{name:<50} {total / 1e3:7.1f} ms  "
+            + "  ".join(f"{package} {t / 1e3:.1f} ms" for package, t in largest)
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
@@ -0,0 +1,124 @@
+# Threads and CPU time used to debounce 32 chattering mocked inputs: every press and release bounces BOUNCES times
+# EDGE_GAP apart before it settles. Compares the debounce of the pinconfig (DebouncedInput on the shared scheduler)
+# against restarting a threading.Timer on every edge, and checks that both report one event per press and release.
+# run: cb sample benchmark/input_debounce [cycles, default 20]
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from time import perf_counter, process_time, sleep
+
+from component.limit_switch import limit_switch_actions
+from state_management import configure_device, input_device_ctx
+from state_management.utils import FakeDigitalInputDevice
+from state_management.utils.dispatcher import dispatcher
+
+INPUTS = 32
+BOUNCES = 10
+EDGE_GAP = 0.0003
+DEBOUNCE = 0.005
+CYCLES = 20
+
+
+class TimerDebounce:
+    """debounce that starts a new threading.Timer on every edge"""
+
+    started = 0
+
+    def __init__(self, device, sec: float):
+        self.sec = sec
+        self.timer = None
+        self.device = device
+        self.active = False
+        self.when_activated = self.when_deactivated = None
+        device.when_activated = device.when_deactivated = self.edge
+
+    def edge(self):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(self.sec, self.settle)
+        self.timer.start()
+        TimerDebounce.started += 1
+
+    def settle(self):
+        active = bool(self.device.value)
+        if active != self.active:
+            self.active = active
+            callback = self.when_activated if active else self.when_deactivated
+            callback()
+
+
+def configure() -> list:
+    directory = tempfile.mkdtemp()
+    file_name = os.path.join(directory, "pinconfig.json")
+    with open(file_name, "w") as file:
+        json.dump(
+            {
+                "input_device": {
+                    f"switch_{n}": {"pin": n, "debounce": DEBOUNCE}
+                    for n in range(INPUTS)
+                }
+            },
+            file,
+        )
+    configure_device(file_name, log_level="Warning")
+    return [f"switch_{n}" for n in range(INPUTS)]
+
+
+def chatter(devices: list, cycles: int, threads: list):
+    for _ in range(cycles):
+        for _ in range(2):  # press, release
+            for _ in range(BOUNCES * 2 + 1):
+                for device in devices:
+                    device.toggle()
+                threads.append(threading.active_count())
+                sleep(EDGE_GAP)
+            sleep(DEBOUNCE * 3)
+            threads.append(threading.active_count())
+
+
+def run(name: str, devices: list, events: list, cycles: int, started: callable):
+    threads = []
+    cpu = process_time()
+    start = perf_counter()
+    chatter(devices, cycles, threads)
+    sleep(DEBOUNCE * 3)
+    dispatcher.join()
+    elapsed = perf_counter() - start
+    cpu = process_time() - cpu
+    print(
+        f"{name:<22}  threads: max {max(threads):3} alive, {started():6} started  "
+        + f"CPU {cpu * 1e3:7.1f} ms in {elapsed:.2f} s  events {len(events)}/{INPUTS * cycles * 2}"
+    )
+
+
+def main(cycles: int):
+    names = configure()
+    events = []
+    for name in names:
+        limit_switch_actions.on_limit_switch_activated(name, lambda: events.append(1))
+        limit_switch_actions.on_limit_switch_deactivated(name, lambda: events.append(0))
+    devices = [input_device_ctx.store[name] for name in names]
+    dispatcher.post(None, lambda: None)  # start the dispatcher threads before counting
+    # the debounced inputs only schedule timers on the scheduler thread, they start no thread
+    run("shared scheduler", devices, events, cycles, lambda: 0)
+
+    legacy_events = []
+    legacy = [FakeDigitalInputDevice(n) for n in range(INPUTS)]
+    for device in legacy:
+        debounced = TimerDebounce(device, DEBOUNCE)
+        debounced.when_activated = lambda: legacy_events.append(1)
+        debounced.when_deactivated = lambda: legacy_events.append(0)
+    run(
+        "threading.Timer/edge",
+        legacy,
+        legacy_events,
+        cycles,
+        lambda: TimerDebounce.started,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CYCLES)
@@ -0,0 +1,71 @@
+# Benchmark of set_interval running at 50 Hz: thread count, jitter and memory.
+# Compares the scheduler thread against the previous implementation that started a threading.Timer on every tick.
+# run: cb sample benchmark/interval_scheduler [seconds per run, default 600]
+
+import statistics
+import sys
+import threading
+import tracemalloc
+from time import monotonic, sleep
+
+from state_management.utils import interval
+
+PERIOD = 0.02  # 50 Hz
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 600
+
+
+def legacy_set_interval(func, sec, timers: list):
+    """set_interval before the scheduler: one new threading.Timer per tick"""
+
+    def func_wrapper():
+        legacy_set_interval(func, sec, timers)
+        func()
+
+    t = threading.Timer(sec, func_wrapper)
+    t.start()
+    timers.append(t)
+    return t
+
+
+def run(name: str, start: callable, stop: callable, threads_started: callable):
+    ticks = []
+    threads = []
+    tracemalloc.start()
+    begin = monotonic()
+    start(lambda: ticks.append(monotonic()))
+    while monotonic() - begin < DURATION:
+        threads.append(threading.active_count())
+        sleep(0.5)
+    stop()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sleep(PERIOD * 5)
+
+    periods = [b - a for a, b in zip(ticks, ticks[1:])]
+    # deviation of every tick from where it should be on an ideal 50 Hz grid
+    drift = [t - (ticks[0] + i * PERIOD) for i, t in enumerate(ticks)]
+    jitter = [abs(p - PERIOD) * 1e3 for p in periods]
+    print(f"{name}:")
+    print(f"  ticks:        {len(ticks)} (expected {int(DURATION / PERIOD)})")
+    print(f"  threads:      max {max(threads)} alive, {threads_started()} started")
+    print(
+        f"  jitter (ms):  mean {statistics.mean(jitter):.3f} "
+        + f"p99 {sorted(jitter)[int(len(jitter) * 0.99)]:.3f} max {max(jitter):.3f}"
+    )
+    print(f"  drift (ms):   {drift[-1] * 1e3:.3f} after {DURATION:.0f}s")
+    print(f"  peak memory:  {peak_memory / 1024:.1f} KiB")
+
+
+legacy_timers = []
+run(
+    "threading.Timer per tick",
+    lambda func: legacy_set_interval(func, PERIOD, legacy_timers),
+    lambda: [t.cancel() for t in legacy_timers],
+    lambda: len(legacy_timers),
+)
+run(
+    "scheduler",
+    lambda func: interval.set_interval(func, PERIOD),
+    interval.clear_intervals,
+    lambda: 1,
+)
@@ -0,0 +1,101 @@
+# Bus transactions and service time of the io expander interrupt handler on a mocked 16 channel MCP23017,
+# for the current handler (one block read of INTF/INTCAP/GPIO) and the previous one (INTF, then GPIO per pin, then INTCAP).
+# Every interrupt changes `changes` inputs before it is serviced, like a busy expander does.
+# run: cb sample benchmark/io_expander_interrupt [interrupts, default 2000]
+
+import json
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from component.io_expander import io_expander_actions
+from state_management import configure_device
+
+INTERRUPTS = 2000
+CHANNELS = 16
+
+
+def previous_on_interrupt(expander):
+    """the handler before the block read"""
+    for pin_flag in expander.mcp.int_flag:
+        if (
+            (device := expander.input_devices[pin_flag])
+            and device.value
+            and device.when_activated
+        ):
+            device.when_activated()
+        elif device and not device.value and device.when_deactivated:
+            device.when_deactivated()
+    expander.mcp.clear_ints()
+
+
+def configure():
+    directory = tempfile.mkdtemp()
+    file_name = os.path.join(directory, "pinconfig.json")
+    with open(file_name, "w") as file:
+        json.dump(
+            {
+                "input_device": {
+                    "expander_interrupt_pin": {"pin": 25, "pull_up": True}
+                },
+                "io_expander": {
+                    "io_expander_1": {
+                        "address": "0x20",
+                        "interrupt_pin": "expander_interrupt_pin",
+                        "total_channels": CHANNELS,
+                        "input_channels": {f"channel_{n}": n for n in range(CHANNELS)},
+                    }
+                },
+            },
+            file,
+        )
+    configure_device(file_name, log_level="Warning")
+    return io_expander_actions.ctx.store["io_expander_1"]
+
+
+def run(expander, handler, interrupts: int, changes: int):
+    mcp = expander.mcp
+    dispatched = [0]
+    count = lambda: dispatched.__setitem__(0, dispatched[0] + 1)
+    for device in expander.input_devices:
+        device.when_activated = device.when_deactivated = count
+    expected = elapsed = transactions = 0
+    for i in range(interrupts):
+        for n in range(changes):
+            pin = (i * changes + n) % CHANNELS
+            mcp.set_input(pin, not mcp.registers[mcp.GPIOA + pin // 8] & 1 << pin % 8)
+        expected += changes
+        before = mcp.transactions
+        start = perf_counter()
+        handler()
+        elapsed += perf_counter() - start
+        transactions += mcp.transactions - before
+    # the previous handler does not track the port, resync it for the next run
+    expander.port_state = mcp.gpio
+    return (
+        transactions / interrupts,
+        elapsed / interrupts * 1e6,
+        dispatched[0],
+        expected,
+    )
+
+
+def main(interrupts: int):
+    expander = configure()
+    for changes in (1, 4, 16):
+        for name, handler in (
+            ("previous", lambda: previous_on_interrupt(expander)),
+            ("block read", expander.on_interrupt),
+        ):
+            transactions, us, dispatched, expected = run(
+                expander, handler, interrupts, changes
+            )
+            print(
+                f"{changes:2} changes/interrupt  {name:<10}  {transactions:5.1f} transactions/interrupt  "
+                + f"{us:6.1f} us/interrupt  callbacks {dispatched}/{expected}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else INTERRUPTS)
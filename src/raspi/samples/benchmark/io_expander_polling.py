@@ -0,0 +1,111 @@
+# Bus load and detection latency of the io expander inputs on a mocked MCP23017, with the interrupt handler
+# (serviced as soon as the input changes) and with polling at an adaptive rate and at fixed fast / slow rates.
+# The inputs change in bursts (BURST edges EDGE_GAP apart, then IDLE seconds without a change) like switches do.
+# run: cb sample benchmark/io_expander_polling [seconds per mode, default 3]
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+from collections import deque
+from time import perf_counter, sleep
+
+from component.io_expander import io_expander_actions
+from component.io_expander.io_expander import POLL_FAST, POLL_SLOW
+from state_management import configure_device
+
+CHANNELS = 16
+BURST = 8
+EDGE_GAP = 0.005
+IDLE = 0.25
+DURATION = 3
+
+
+def configure():
+    directory = tempfile.mkdtemp()
+    file_name = os.path.join(directory, "pinconfig.json")
+    with open(file_name, "w") as file:
+        json.dump(
+            {
+                "io_expander": {
+                    "io_expander_1": {
+                        "address": "0x20",
+                        "total_channels": CHANNELS,
+                        "input_channels": {f"channel_{n}": n for n in range(CHANNELS)},
+                    }
+                },
+            },
+            file,
+        )
+    configure_device(file_name, log_level="Warning")
+    return io_expander_actions.ctx.store["io_expander_1"]
+
+
+def run(expander, mode: str, duration: float):
+    mcp = expander.mcp
+    # times the inputs changed, not detected yet
+    edges = [deque() for _ in range(CHANNELS)]
+    latencies = []
+
+    def detected(pin: int):
+        latencies.append(perf_counter() - edges[pin].popleft())
+
+    for device in expander.input_devices:
+        device.when_activated = device.when_deactivated = (
+            lambda pin=device.pin_num: detected(pin)
+        )
+
+    expander.stop_polling()
+    expander.port_state = mcp.gpio
+    if mode == "interrupt":
+        mcp.interrupt_enable = 0xFFFF
+    else:
+        mcp.interrupt_enable = 0x0000
+        expander.poll_fast, expander.poll_slow = {
+            "adaptive": (POLL_FAST, POLL_SLOW),
+            "fixed fast": (POLL_FAST, POLL_FAST),
+            "fixed slow": (POLL_SLOW, POLL_SLOW),
+        }[mode]
+        expander.start_polling()
+
+    before = mcp.transactions
+    start = perf_counter()
+    count = 0
+    while perf_counter() - start < duration:
+        for _ in range(BURST):
+            pin = count % CHANNELS
+            count += 1
+            edges[pin].append(perf_counter())
+            mcp.set_input(pin, not mcp.registers[mcp.GPIOA + pin // 8] & 1 << pin % 8)
+            if mode == "interrupt":
+                expander.on_interrupt()
+            sleep(EDGE_GAP)
+        sleep(IDLE)
+    sleep(POLL_SLOW * 2)  # let the last edges be detected
+    elapsed = perf_counter() - start
+    expander.stop_polling()
+    transactions = mcp.transactions - before
+    missed = sum(len(pending) for pending in edges)
+    latencies.sort()
+    return (
+        transactions / elapsed,
+        statistics.mean(latencies) * 1e3,
+        latencies[int(len(latencies) * 0.99)] * 1e3,
+        missed,
+        count,
+    )
+
+
+def main(duration: float):
+    expander = configure()
+    for mode in ("interrupt", "adaptive", "fixed fast", "fixed slow"):
+        rate, mean, p99, missed, edges = run(expander, mode, duration)
+        print(
+            f"{mode:<10}  {rate:7.1f} transactions/s  latency mean {mean:6.2f} ms  p99 {p99:6.2f} ms  "
+            + f"missed {missed}/{edges} edges"
+        )
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else DURATION)
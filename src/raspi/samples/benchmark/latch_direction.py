@@ -0,0 +1,59 @@
+# Benchmark of the latency of changing a motor direction that is wired through the latch.
+# "blocking" waits for every write like the latch used to, "non-blocking" only queues the write.
+# run: cb sample benchmark/latch_direction
+
+import statistics
+from time import perf_counter
+
+from component.latch import latch_actions
+from component.motor import raw_motor_action, step_pin_action
+from state_management import configure_device
+
+FLIPS = 10
+MOTOR = "motor_1"
+
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+latch = latch_actions.ctx.store["latch_1"]
+
+
+def flip(wait: bool) -> list[float]:
+    latencies = []
+    for i in range(FLIPS):
+        start = perf_counter()
+        raw_motor_action.set_dir(MOTOR, (i + 1) % 2)
+        if wait:
+            step_pin_action.wait_for_direction(
+                raw_motor_action.ctx.store[MOTOR].direction_pin
+            )
+        latencies.append((perf_counter() - start) * 1e3)
+    latch.flush()
+    return latencies
+
+
+for name, wait in (("blocking", True), ("non-blocking", False)):
+    latencies = flip(wait)
+    print(
+        f"{name:<13} set_dir latency: mean {statistics.mean(latencies):8.3f} ms "
+        + f"max {max(latencies):8.3f} ms"
+    )
+
+# last write wins: flipping the same direction pin while a write is pending only keeps the last value
+writes = 0
+set_one_device = latch._set_one_device
+
+
+def counted_set_one_device(addr, state):
+    global writes
+    writes += 1
+    set_one_device(addr, state)
+
+
+latch._set_one_device = counted_set_one_device
+start = perf_counter()
+for i in range(FLIPS):
+    raw_motor_action.set_dir(MOTOR, (i + 1) % 2)
+latch.flush()
+print(
+    f"{FLIPS} queued flips: {writes} latch writes in {(perf_counter() - start) * 1e3:.1f} ms "
+    + f"(blocking: {FLIPS} writes, {FLIPS * latch_actions.ENABLE_DURATION * 1e3:.0f} ms)"
+)
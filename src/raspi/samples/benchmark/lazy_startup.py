@@ -0,0 +1,69 @@
+# Startup time of a script that reads one potentiometer (like pot_test/read_singl_pot.py):
+# configure_device creating every device in the pinconfig vs lazy=True creating the potentiometer,
+# its adc and the smbus on first use. Measured with only the potentiometer imported and with every component imported.
+# Every run is a fresh process because devices can only be configured once per process.
+# run: cb sample benchmark/lazy_startup [runs, default 20]
+
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+RUNS = 20
+N = 5  # pot number to read
+
+
+def child(lazy: bool, all_components: bool):
+    from component.potentiometer import potentiometer_actions
+    from state_management import DEVICE_CONTEXT_COLLECTION, bind, configure_device
+
+    if all_components:
+        from component.compressor import compressor_actions
+        from component.latch import latch_actions
+        from component.motor import motor_action, raw_motor_action
+        from component.muscle import muscle_actions
+
+    start = perf_counter()
+    configure_device("src/raspi/pinconfig.json", log_level="Warning", lazy=lazy)
+    configured = perf_counter() - start
+    pot = bind(potentiometer_actions.ctx, f"pot{N}")
+    pot.get_degree()
+    first_read = perf_counter() - start
+    devices = len(
+        {
+            id(d)
+            for ctx in DEVICE_CONTEXT_COLLECTION.values()
+            for d in ctx.store.values()
+        }
+    )
+    print(f"{configured * 1e3} {first_read * 1e3} {devices}")
+
+
+def parent(runs: int):
+    for imports in ("potentiometer", "all"):
+        print(f"{imports} imported")
+        for mode in ("eager", "lazy"):
+            configured, first_read = [], []
+            for _ in range(runs):
+                out = subprocess.run(
+                    [sys.executable, __file__, mode, imports],
+                    capture_output=True,
+                    text=True,
+                    env={**os.environ, "ENV": "dev"},
+                    check=True,
+                ).stdout.splitlines()[-1]
+                c, f, devices = out.split()
+                configured.append(float(c))
+                first_read.append(float(f))
+            print(
+                f"  {mode:<6} configure_device: {statistics.mean(configured):7.2f} ms  "
+                + f"until first reading: {statistics.mean(first_read):7.2f} ms  ({devices} devices created)"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        child(sys.argv[1] == "lazy", sys.argv[2] == "all")
+    else:
+        parent(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
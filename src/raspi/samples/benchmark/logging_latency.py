@@ -0,0 +1,80 @@
+# Latency added to raw_motor_action.step_1 by logging at the Debug level (4 traced pin changes per step).
+# "file" writes every record to the log file on the calling thread like configure_logger used to,
+# "queue" is configure_logger, which only queues the records for the log writer thread.
+# The loop steps at about 1 kHz like a step loop does, the writer thread catches up between the steps.
+# Every mode runs in a fresh process because devices can only be configured once per process.
+# run: cb sample benchmark/logging_latency [steps, default 5000]
+
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter, sleep
+
+STEPS = 5000
+STEP_PERIOD = 0.001
+MOTOR = "motor_1"
+
+
+def child(mode: str, steps: int):
+    from component.motor import raw_motor_action
+    from state_management import configure_device, configure_logger, set_tracing
+
+    configure_device("src/raspi/pinconfig.json", log_level="Warning")
+    motor = raw_motor_action.ctx.store[MOTOR]
+    log_dir = tempfile.mkdtemp()
+    if mode == "file":
+        logging.basicConfig(
+            filename=os.path.join(log_dir, "file.log"),
+            format="%(filename)s: %(message)s",
+            level=logging.DEBUG,
+            force=True,
+        )
+        set_tracing(True)
+    elif mode == "queue":
+        cwd = os.getcwd()
+        os.chdir(log_dir)  # configure_logger writes to .log/ in the working directory
+        configure_logger("Debug")
+        os.chdir(cwd)
+
+    latencies = []
+    for _ in range(steps):
+        start = perf_counter()
+        raw_motor_action.step_1(motor)
+        latencies.append((perf_counter() - start) * 1e6)
+        sleep(STEP_PERIOD)
+    start = perf_counter()
+    logging.shutdown()
+    drained = (perf_counter() - start) * 1e3
+    latencies.sort()
+    print(
+        f"{statistics.mean(latencies)} {latencies[int(len(latencies) * 0.99)]} {drained}"
+    )
+
+
+def parent(steps: int):
+    results = {}
+    for mode in ("off", "file", "queue"):
+        out = subprocess.run(
+            [sys.executable, __file__, mode, str(steps)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "ENV": "dev"},
+            check=True,
+        ).stdout.splitlines()[-1]
+        results[mode] = [float(value) for value in out.split()]
+    for mode, (mean, p99, drained) in results.items():
+        added = mean - results["off"][0]
+        print(
+            f"{mode:<6} step_1: mean {mean:7.2f} us  p99 {p99:7.2f} us  "
+            + f"added by logging {added:7.2f} us  (log written {drained:6.1f} ms after the last step)"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        child(sys.argv[1], int(sys.argv[2]))
+    else:
+        parent(int(sys.argv[1]) if len(sys.argv) > 1 else STEPS)
@@ -0,0 +1,59 @@
+# Cost of the debug tracing of a mocked device: 1M toggles of a FakeDigitalOutputDevice with tracing off,
+# with tracing on and the logger at Debug (records are dropped by a NullHandler so only logging itself is measured),
+# and with the previous decorator that formatted two f-strings on every call.
+# run: cb sample benchmark/mock_tracing [toggles, default 1000000]
+
+import logging
+import sys
+from functools import wraps
+from time import perf_counter
+
+from state_management.utils import FakeDigitalOutputDevice, set_tracing
+
+TOGGLES = 1_000_000
+
+
+def f_string_value_change(func: callable) -> callable:
+    """the decorator before tracing could be disabled"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs) -> None:
+        logging.debug(f"{func.__qualname__} called: {args[0].pin} {args[0].value}")
+        func(*args, **kwargs)
+        logging.debug(f"{func.__qualname__} finished: {args[0].pin} {args[0].value}")
+
+    return wrapper
+
+
+class FStringDevice(FakeDigitalOutputDevice):
+    toggle = f_string_value_change(lambda self: setattr(self, "value", 1 - self.value))
+
+
+def run(device, toggles: int) -> float:
+    toggle = device.toggle
+    start = perf_counter()
+    for _ in range(toggles):
+        toggle()
+    return perf_counter() - start
+
+
+def main(toggles: int):
+    logging.basicConfig(handlers=[logging.NullHandler()], force=True)
+    for name, level, tracing, device in (
+        ("tracing off, level Warning", logging.WARNING, False, FakeDigitalOutputDevice),
+        ("tracing on,  level Warning", logging.WARNING, True, FakeDigitalOutputDevice),
+        ("tracing on,  level Debug", logging.DEBUG, True, FakeDigitalOutputDevice),
+        ("f-strings,   level Warning", logging.WARNING, None, FStringDevice),
+        ("f-strings,   level Debug", logging.DEBUG, None, FStringDevice),
+    ):
+        logging.root.setLevel(level)
+        if tracing is not None:
+            set_tracing(tracing)
+        elapsed = run(device(1), toggles)
+        print(
+            f"{name}: {elapsed * 1e3:8.1f} ms  {elapsed / toggles * 1e9:7.1f} ns/toggle"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else TOGGLES)
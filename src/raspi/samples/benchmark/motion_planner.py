@@ -0,0 +1,42 @@
+# Benchmark of the motion planner: planning time (first move vs cached) and move duration
+# compared to the constant-rate loop. The constant rate is the rate the motor can start at without stalling,
+# the profile starts at standstill and accelerates to a higher max velocity.
+# run: cb sample benchmark/motion_planner
+
+from time import perf_counter
+
+from component.motor.planner import plan_periods, plan_pulses
+from component.motor.pulse import step_pulses
+
+HIGH_DURATION = 0.00005
+START_RATE = 500  # steps per second the motor reliably starts at
+MAX_VELOCITY = 2000
+ACCELERATION = 8000
+
+for profile in ("trapezoid", "s_curve"):
+    print(profile)
+    for steps in (10, 200, 2000, 20000):
+        plan_periods.cache_clear()
+        plan_pulses.cache_clear()
+        step_pulses.cache_clear()
+        start = perf_counter()
+        plan_pulses(steps, HIGH_DURATION, MAX_VELOCITY, ACCELERATION, profile)
+        cold = perf_counter() - start
+        start = perf_counter()
+        plan_pulses(steps, HIGH_DURATION, MAX_VELOCITY, ACCELERATION, profile)
+        warm = perf_counter() - start
+
+        start = perf_counter()
+        constant = step_pulses(steps, HIGH_DURATION, 1 / START_RATE - HIGH_DURATION)
+        constant_plan = perf_counter() - start
+        planned = sum(
+            pulse.delay
+            for pulse in plan_pulses(
+                steps, HIGH_DURATION, MAX_VELOCITY, ACCELERATION, profile
+            )
+        )
+        print(
+            f"  {steps:>6} steps  plan: {cold * 1e3:7.3f} ms (cached {warm * 1e6:5.2f} us, "
+            + f"constant {constant_plan * 1e3:6.3f} ms)  move: {planned:7.3f} s "
+            + f"(constant {sum(pulse.delay for pulse in constant):7.3f} s)"
+        )
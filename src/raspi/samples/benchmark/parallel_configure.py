@@ -0,0 +1,76 @@
+# Benchmark of creating the devices of pinconfig.json one by one vs on a thread pool.
+# The mocked devices are created instantly, so every parser is slowed down by the time the real hardware
+# takes to initialize (opening the i2c bus, programming the adc, exporting gpio pins).
+# Every run is a fresh process because devices can only be configured once per process.
+# run: cb sample benchmark/parallel_configure [runs, default 5]
+
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter, sleep
+
+RUNS = 5
+# seconds the parser of each pinconfig section takes on the robot
+LATENCY = {
+    "smbus2": 0.005,
+    "adc": 0.02,
+    "latch": 0.01,
+    "input_device": 0.002,
+    "output_device": 0.002,
+    "pwm_output_device": 0.003,
+}
+DEFAULT_LATENCY = 0.0005
+
+
+def child(workers: int):
+    from component.compressor import compressor_actions
+    from component.latch import latch_actions
+    from component.motor import motor_action, raw_motor_action
+    from component.muscle import muscle_actions
+    from component.potentiometer import potentiometer_actions
+    from state_management import DEVICE_CONTEXT_COLLECTION, configure_device
+
+    def slow(parse, latency):
+        def slow_parse(*args, **kwargs):
+            sleep(latency)
+            return parse(*args, **kwargs)
+
+        return slow_parse
+
+    for name, ctx in DEVICE_CONTEXT_COLLECTION.items():
+        if ctx.parse_device is not None:
+            ctx.parse_device = slow(
+                ctx.parse_device, LATENCY.get(name, DEFAULT_LATENCY)
+            )
+
+    start = perf_counter()
+    configure_device(
+        "src/raspi/pinconfig.json", log_level="Warning", workers=workers, cache=False
+    )
+    print((perf_counter() - start) * 1e3)
+
+
+def parent(runs: int):
+    for workers in (1, 2, 4, 8):
+        times = []
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, __file__, "child", str(workers)],
+                capture_output=True,
+                text=True,
+                env={**os.environ, "ENV": "dev"},
+                check=True,
+            ).stdout.splitlines()[-1]
+            times.append(float(out))
+        print(
+            f"{workers} worker(s) configure_device: mean {statistics.mean(times):7.2f} ms "
+            + f"min {min(times):7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "child":
+        child(int(sys.argv[2]))
+    else:
+        parent(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
@@ -0,0 +1,55 @@
+# Benchmark of converting raw adc bytes to degrees one potentiometer at a time vs with the numpy potentiometer bank.
+# run: cb sample benchmark/pot_conversion
+
+import os
+from timeit import timeit
+from types import SimpleNamespace
+
+from component.potentiometer.bank import PotentiometerBank
+from component.potentiometer.potentiometer import create_cached_data
+
+NUMBER = 2000
+
+
+def make_pot(i: int) -> SimpleNamespace:
+    """stand-in for a parsed Potentiometer with slightly different constants per channel"""
+    pot = SimpleNamespace(
+        max_degree=285 - i % 7, min_degree=0, max_data=4095, min_data=i % 5
+    )
+    pot.cached_data = create_cached_data(pot)
+    return pot
+
+
+def scalar(pots: list, buffer: bytes) -> list[float]:
+    """conversion done in get_degree for each potentiometer"""
+    degrees = []
+    for i, pot in enumerate(pots):
+        fbyte, sbyte = buffer[2 * i], buffer[2 * i + 1]
+        data = fbyte << 8 | sbyte
+        degrees.append((data - pot.min_data) * pot.cached_data + pot.min_degree)
+    return degrees
+
+
+for channels in (8, 64, 512):
+    bank = PotentiometerBank()
+    pots = [make_pot(i) for i in range(channels)]
+    for pot in pots:
+        bank.add(pot)
+    slots = bank.slots(pots)
+    # 12 bit readings, high byte first
+    buffer = bytes(
+        b & 0x0F if i % 2 == 0 else b for i, b in enumerate(os.urandom(2 * channels))
+    )
+    assert all(
+        abs(a - b) < 1e-9
+        for a, b in zip(scalar(pots, buffer), bank.bytes_to_degrees(buffer, slots))
+    )
+
+    python_loop = timeit(lambda: scalar(pots, buffer), number=NUMBER) / NUMBER
+    vectorized = (
+        timeit(lambda: bank.bytes_to_degrees(buffer, slots), number=NUMBER) / NUMBER
+    )
+    print(
+        f"{channels:>4} channels  python: {python_loop * 1e6:8.2f} us  "
+        + f"numpy: {vectorized * 1e6:8.2f} us  ({python_loop / vectorized:.1f}x)"
+    )
@@ -0,0 +1,41 @@
+# Benchmark of step pulse timing: the old sleep() per step loop vs the precomputed pulse train played by the mock wave backend.
+# Reports the achieved steps/sec and the jitter of the time between two rising edges of the step pin.
+# run: cb sample benchmark/step_pulses
+
+import statistics
+from time import perf_counter
+
+from component.motor.pulse import MockWaveBackend, SoftwareBackend, step_pulses
+
+STEPS = 2000
+
+
+class RecordingPin:
+    """step pin that keeps the time of every rising edge"""
+
+    def __init__(self):
+        self.rising = []
+
+    def on(self):
+        self.rising.append(perf_counter())
+
+    def off(self):
+        pass
+
+
+for high, low in ((0.0001, 0.0009), (0.00005, 0.00015)):
+    nominal = high + low
+    pulses = step_pulses(STEPS, high, low)
+    print(f"target {1 / nominal:.0f} steps/s ({nominal * 1e6:.0f} us per step)")
+    for name, backend in (("sleep", SoftwareBackend()), ("wave", MockWaveBackend())):
+        pin = RecordingPin()
+        start = perf_counter()
+        backend.send([pin], pulses)
+        elapsed = perf_counter() - start
+        intervals = [(b - a) * 1e6 for a, b in zip(pin.rising, pin.rising[1:])]
+        errors = [abs(i - nominal * 1e6) for i in intervals]
+        print(
+            f"  {name:<6} {STEPS / elapsed:8.0f} steps/s  "
+            + f"jitter: stdev {statistics.pstdev(intervals):7.1f} us  "
+            + f"mean error {statistics.mean(errors):7.1f} us  max error {max(errors):7.1f} us"
+        )
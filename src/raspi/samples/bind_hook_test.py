@@ -0,0 +1,62 @@
+# Test that actions called through bind() are reported like actions called with an identifier:
+# the action hooks (event recorder) and the action timer (instrumentation) see the sync and the async actions.
+# run: cb sample bind_hook_test
+
+import sys
+
+import component.latch
+from component.motor import step_pin_action
+from state_management import (
+    add_action_hook,
+    bind,
+    configure_device,
+    disable_instrumentation,
+    enable_instrumentation,
+    get_action_stats,
+    remove_action_hook,
+    run_async,
+    set_environment,
+)
+
+set_environment("dev")
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+
+failures = []
+calls = []
+
+
+def hook(ctx, action, device, args, result):
+    calls.append((ctx.name, action, device, args))
+
+
+step_pin = bind(step_pin_action.step_ctx, "motor_step_1")
+direction_pin = bind(step_pin_action.direction_ctx, "latch_1.latch_1")
+
+add_action_hook(hook)
+step_pin.set_high()
+step_pin_action.set_high("motor_step_1")
+run_async(direction_pin.wait_for_direction_async())
+remove_action_hook(hook)
+step_pin.set_low()
+
+expected = [
+    ("stepPin", "set_high", step_pin.device, ()),
+    ("stepPin", "set_high", step_pin.device, ()),
+    ("directionPin", "wait_for_direction_async", direction_pin.device, ()),
+]
+if calls != expected:
+    failures.append(f"hook saw {calls}, expected {expected}")
+
+enable_instrumentation()
+for _ in range(3):
+    step_pin.set_high()
+stats = get_action_stats().get("stepPin.set_high")
+disable_instrumentation()
+if stats is None or stats["count"] != 3:
+    failures.append(f"timer saw {stats and stats['count']} bound calls of 3")
+
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
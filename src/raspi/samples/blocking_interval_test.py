@@ -0,0 +1,80 @@
+# Test of a blocking interval on the scheduler: a callback that takes SLOW seconds every PERIOD (like the held move
+# of the UI) must not delay a cheap interval, and must never run twice at the same time.
+# Also checks that clear_all is safe while timeouts fire and that cancelled handles are not kept.
+# run: cb sample blocking_interval_test
+
+import sys
+import threading
+from time import monotonic, sleep
+
+from state_management.utils.interval import (
+    clear_all,
+    clear_intervals,
+    intervals,
+    set_interval,
+    set_timeout,
+    timeouts,
+)
+
+SLOW = 0.2
+PERIOD = 0.02
+CHEAP_PERIOD = 0.01
+MAX_GAP = 0.05  # between two ticks of the cheap interval
+DURATION = 2
+
+
+def run(blocking: bool) -> tuple[float, int]:
+    """the longest gap between the ticks of the cheap interval and the most slow callbacks running at once"""
+    ticks = []
+    running = [0]
+    most_running = [0]
+    lock = threading.Lock()
+
+    def slow():
+        with lock:
+            running[0] += 1
+            most_running[0] = max(most_running[0], running[0])
+        sleep(SLOW)
+        with lock:
+            running[0] -= 1
+
+    set_interval(slow, PERIOD, blocking=blocking)
+    set_interval(lambda: ticks.append(monotonic()), CHEAP_PERIOD)
+    sleep(DURATION)
+    clear_intervals()
+    sleep(SLOW * 2)
+    return max(b - a for a, b in zip(ticks, ticks[1:])), most_running[0]
+
+
+failures = []
+for blocking in (False, True):
+    gap, most_running = run(blocking)
+    print(
+        f"blocking={blocking!s:<5}  longest gap of the cheap interval {gap * 1e3:6.1f} ms  "
+        + f"slow callbacks at once {most_running}"
+    )
+    if blocking and gap > MAX_GAP:
+        failures.append(f"the cheap interval waited {gap * 1e3:.1f} ms")
+    if most_running > 1:
+        failures.append(f"{most_running} slow callbacks ran at once")
+
+# timeouts firing on the scheduler and the workers while clear_all runs
+for _ in range(100):
+    for n in range(100):
+        set_timeout(lambda: None, 0, blocking=n % 2 == 0)
+    try:
+        clear_all()
+    except RuntimeError as e:
+        failures.append(f"clear_all while timeouts fire: {e}")
+        break
+
+set_interval(lambda: None, 1).cancel()
+set_timeout(lambda: None, 1).cancel()
+if intervals or timeouts:
+    failures.append(f"{len(intervals) + len(timeouts)} cancelled handles are kept")
+
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
@@ -0,0 +1,74 @@
+# Test of the callbacks posted to the input event dispatcher: like gpiozero, a callback with one parameter
+# is called with the device and a callback without parameters is called without it.
+# Checked on a gpiozero input with a mocked pin, on a mocked input and on a debounced input.
+# run: cb sample dispatch_callback_test
+
+import sys
+from time import sleep
+
+from gpiozero import Device, DigitalInputDevice
+from gpiozero.pins.mock import MockFactory
+
+from state_management.utils import FakeDigitalInputDevice
+from state_management.utils.dispatcher import dispatched, dispatcher
+from state_management.utils.input_filter import debounce_input, input_events
+
+DEBOUNCE = 0.01
+
+Device.pin_factory = MockFactory()
+gpio_device = DigitalInputDevice(17)
+fake_device = FakeDigitalInputDevice(18)
+debounced_device = FakeDigitalInputDevice(19)
+debounce_input(debounced_device, DEBOUNCE)
+
+
+def press(device):
+    if isinstance(device, DigitalInputDevice):
+        device.pin.drive_high()
+    else:
+        device.toggle()
+    sleep(DEBOUNCE * 3)
+    dispatcher.join()
+
+
+failures = []
+for name, device in (
+    ("gpiozero", gpio_device),
+    ("mocked", fake_device),
+    ("debounced", debounced_device),
+):
+    received = []
+    input_events(device).when_activated = dispatched(
+        device, lambda dev: received.append(dev)
+    )
+    failed = dispatcher.stats()["failed"]
+    press(device)
+    if received != [device]:
+        failures.append(f"{name}: one parameter callback received {received}")
+    if dispatcher.stats()["failed"] != failed:
+        failures.append(f"{name}: the callback failed in the dispatcher")
+
+    called = []
+    input_events(device).when_deactivated = dispatched(device, lambda: called.append(1))
+    if isinstance(device, DigitalInputDevice):
+        device.pin.drive_low()
+    else:
+        device.toggle()
+    sleep(DEBOUNCE * 3)
+    dispatcher.join()
+    if called != [1]:
+        failures.append(
+            f"{name}: callback without parameters called {len(called)} times"
+        )
+
+try:
+    dispatched(fake_device, lambda a, b: None)
+    failures.append("a callback with two parameters was accepted")
+except ValueError:
+    pass
+
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
@@ -0,0 +1,154 @@
+# Test of four io expanders sharing one interrupt pin in the mock environment.
+# Checks that an edge is dispatched to the expanders that flagged it and to no other, that a change during the
+# service of the line is not lost, and measures the service time and bus use per edge against servicing every expander.
+# run: cb sample io_expander/shared_interrupt_test [edges, default 2000]
+
+import json
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from component.io_expander import io_expander_actions
+from component.io_expander.io_expander import interrupt_lines
+from state_management import configure_device, set_environment
+
+EXPANDERS = 4
+CHANNELS = 16
+EDGES = 2000
+# i2c at 400 kHz: 9 bits per byte, a register read adds the address, the register and the address again
+I2C_BYTE = 9 / 400_000
+I2C_READ_OVERHEAD = 3
+
+set_environment("dev")
+directory = tempfile.mkdtemp()
+file_name = os.path.join(directory, "pinconfig.json")
+with open(file_name, "w") as file:
+    json.dump(
+        {
+            "input_device": {"expander_interrupt_pin": {"pin": 25, "pull_up": True}},
+            "io_expander": {
+                f"io_expander_{i}": {
+                    "address": hex(0x20 + i),
+                    "interrupt_pin": "expander_interrupt_pin",
+                    "total_channels": CHANNELS,
+                    "input_channels": {f"channel_{n}": n for n in range(CHANNELS)},
+                }
+                for i in range(EXPANDERS)
+            },
+        },
+        file,
+    )
+configure_device(file_name, log_level="Warning")
+expanders = [
+    io_expander_actions.ctx.store[f"io_expander_{i}"] for i in range(EXPANDERS)
+]
+line = interrupt_lines["expander_interrupt_pin"]
+
+
+class LinePin:
+    """the open drain line is active while any expander has an interrupt flag"""
+
+    @property
+    def is_active(self):
+        return any(expander.mcp.interrupt for expander in expanders)
+
+
+line.pin = LinePin()
+
+events = []  # (expander, pin, value)
+for i, expander in enumerate(expanders):
+    for device in expander.input_devices:
+        device.when_activated = lambda i=i, n=device.pin_num: events.append((i, n, 1))
+        device.when_deactivated = lambda i=i, n=device.pin_num: events.append((i, n, 0))
+
+
+def toggle(i: int, pin: int):
+    mcp = expanders[i].mcp
+    mcp.set_input(pin, not mcp.registers[mcp.GPIOA + pin // 8] & 1 << pin % 8)
+    return (i, pin, int(bool(mcp.registers[mcp.GPIOA + pin // 8] & 1 << pin % 8)))
+
+
+def bus_use() -> tuple[int, int]:
+    return sum(e.mcp.transactions for e in expanders), sum(
+        e.mcp.bytes_read for e in expanders
+    )
+
+
+failures = []
+
+if len(line.expanders) != EXPANDERS:
+    failures.append(f"{len(line.expanders)} expanders on the line")
+
+# one edge is only dispatched to the expander that flagged it
+for i in range(EXPANDERS):
+    events.clear()
+    expected = [toggle(i, 3 + i)]
+    line.service()
+    if events != expected:
+        failures.append(f"edge on io_expander_{i}: dispatched {events}")
+
+# edges on several expanders at once
+events.clear()
+expected = [toggle(0, 1), toggle(2, 5), toggle(3, 15)]
+line.service()
+if sorted(events) != sorted(expected):
+    failures.append(f"edges on 3 expanders: dispatched {events}, expected {expected}")
+
+# a change while the line is serviced keeps the line active without a new edge
+events.clear()
+device = expanders[0].input_devices[7]
+callback = device.when_activated, device.when_deactivated
+changed_during_service = []
+device.when_activated = device.when_deactivated = lambda: (
+    events.append((0, 7, -1)),
+    changed_during_service.append(toggle(1, 9)),
+)
+toggle(0, 7)
+line.service()
+device.when_activated, device.when_deactivated = callback
+if not changed_during_service or changed_during_service[0] not in events:
+    failures.append("a change during the service of the line was lost")
+
+
+def timed(handler, flagged: int, edges: int):
+    before = bus_use()
+    start = perf_counter()
+    for n in range(edges):
+        for i in range(flagged):
+            toggle(i, n % CHANNELS)
+        handler()
+    elapsed = perf_counter() - start
+    after = bus_use()
+    return (
+        elapsed / edges * 1e6,
+        (after[0] - before[0]) / edges,
+        (after[1] - before[1]) / edges,
+    )
+
+
+def read_all():
+    """service every expander on the line without reading the flags first"""
+    for expander in expanders:
+        expander.on_interrupt()
+
+
+edges = int(sys.argv[1]) if len(sys.argv) > 1 else EDGES
+for flagged in (1, EXPANDERS):
+    for name, handler in (("demultiplexed", line.service), ("read all", read_all)):
+        events.clear()
+        us, transactions, read = timed(handler, flagged, edges)
+        if len(events) != flagged * edges:
+            failures.append(f"{name}: {len(events)} of {flagged * edges} edges")
+        bus = (read + transactions * I2C_READ_OVERHEAD) * I2C_BYTE * 1e6
+        print(
+            f"{flagged} of {EXPANDERS} flagged  {name:<13}  {us:6.1f} us/edge  "
+            + f"{transactions:4.1f} transactions/edge  {read:5.1f} bytes read/edge  "
+            + f"~{bus:5.1f} us on the bus at 400 kHz"
+        )
+
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
@@ -0,0 +1,94 @@
+# Test of the input event dispatcher in the mock environment: a limit switch callback that takes SLOW seconds
+# must not delay the interrupt handler or the callbacks of the other channels of the io expander.
+# Also checks that the events of one channel run in order and that a full queue drops events instead of blocking.
+# run: cb sample io_expander/slow_callback_test
+
+import sys
+import threading
+from time import perf_counter, sleep
+
+from component.io_expander import interrupt_pin_action, io_expander_actions
+from component.limit_switch import limit_switch_actions
+from state_management import configure_device, get_device, set_environment
+from state_management.utils import EventDispatcher, get_dispatch_stats
+from state_management.utils.dispatcher import dispatcher
+
+SLOW = 0.2
+MAX_LATENCY = 0.05  # of the handler and the callbacks of the other channels
+TOGGLES = 20
+
+set_environment("dev")
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+expander = io_expander_actions.ctx.store["io_expander_1"]
+interrupt = get_device(interrupt_pin_action.ctx, expander.interrupt_pin).when_activated
+
+
+def edge(channel: int, value: int) -> float:
+    """change an input like the switch would and service the interrupt, returns the time the handler took"""
+    expander.mcp.set_input(channel - 1, value)
+    start = perf_counter()
+    interrupt()
+    return perf_counter() - start
+
+
+failures = []
+
+# a slow callback on channel 1, a fast one on channel 2
+called = {}
+limit_switch_actions.on_limit_switch_activated(
+    "io_expander_1.channel_1", lambda: sleep(SLOW)
+)
+limit_switch_actions.on_limit_switch_activated(
+    "io_expander_1.channel_2", lambda: called.setdefault(2, perf_counter())
+)
+slow_handler = edge(1, 1)
+posted = perf_counter()
+fast_handler = edge(2, 1)
+dispatcher.join()
+latency = called[2] - posted
+print(
+    f"handler with a slow callback: {slow_handler * 1e3:.2f} ms, next edge: {fast_handler * 1e3:.2f} ms, "
+    + f"channel_2 callback after {latency * 1e3:.2f} ms (slow callback {SLOW * 1e3:.0f} ms)"
+)
+if max(slow_handler, fast_handler) > MAX_LATENCY:
+    failures.append("the interrupt handler waited for the slow callback")
+if latency > MAX_LATENCY:
+    failures.append("the channel_2 callback waited for the slow callback")
+
+# the events of a channel run in order
+values = []
+limit_switch_actions.on_limit_switch_activated(
+    "io_expander_1.channel_3", lambda: values.append(1) or sleep(0.001)
+)
+limit_switch_actions.on_limit_switch_deactivated(
+    "io_expander_1.channel_3", lambda: values.append(0)
+)
+for i in range(TOGGLES):
+    edge(3, 1 - i % 2)
+dispatcher.join()
+expected = [1 - i % 2 for i in range(TOGGLES)]
+print(f"channel_3 events: {values}")
+if values != expected:
+    failures.append(f"channel_3 events out of order, expected {expected}")
+
+# a full queue drops events instead of blocking the interrupt thread
+small = EventDispatcher(workers=1, queue_size=4)
+release = threading.Event()
+start = perf_counter()
+results = [small.post("device", release.wait) for _ in range(10)]
+blocked = perf_counter() - start
+release.set()
+small.join()
+stats = small.stats()
+print(f"full queue: {stats} posting took {blocked * 1e3:.2f} ms")
+if stats["dropped"] == 0 or stats["posted"] + stats["dropped"] != 10:
+    failures.append("the full queue did not drop events")
+if blocked > MAX_LATENCY:
+    failures.append("posting to a full queue blocked")
+print(f"dispatcher: {get_dispatch_stats()}")
+
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
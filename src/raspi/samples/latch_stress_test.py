@@ -0,0 +1,102 @@
+# Stress test of the latch: many threads turn all 8 latch_1 outputs on/off/toggle at the same time.
+# Checks that only one write drives the address pins at a time and that every output ends up
+# written with the value its virtual device reports. Run it with ENV="dev" so the pins are mocked.
+# run: cb sample latch_stress_test
+
+import random
+import sys
+import threading
+
+from component.latch import latch_actions
+from state_management import configure_device, output_device_ctx
+
+THREADS = 16
+OPERATIONS = 500  # per thread
+
+latch_actions.ENABLE_DURATION = (
+    0.0001  # keep the run short, the mocked pins do not need to settle
+)
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+
+latch = latch_actions.ctx.store["latch_1"]
+outputs = [output_device_ctx.store[f"latch_1.latch_{n}"] for n in range(1, 9)]
+
+writing = 0
+max_writing = 0
+written = {}  # {addr: last state written to the latch}
+counter_lock = threading.Lock()
+set_one_device = latch._set_one_device
+
+
+def checked_set_one_device(addr, state):
+    global writing, max_writing
+    with counter_lock:
+        writing += 1
+        max_writing = max(max_writing, writing)
+    set_one_device(addr, state)
+    written[addr] = state
+    with counter_lock:
+        writing -= 1
+
+
+latch._set_one_device = checked_set_one_device
+# switch threads as often as possible to make races show up
+sys.setswitchinterval(1e-6)
+
+
+def hammer(seed: int):
+    rand = random.Random(seed)
+    for _ in range(OPERATIONS):
+        output = rand.choice(outputs)
+        rand.choice((output.on, output.off, output.toggle))()
+
+
+threads = [threading.Thread(target=hammer, args=(n,)) for n in range(THREADS)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+latch.flush()
+
+# every output is toggled an even number of times in total, so none of them can end up flipped
+# unless a toggle got lost between reading and writing the value
+before = [output.value for output in outputs]
+
+
+def toggle_all():
+    for _ in range(OPERATIONS // 10):
+        for output in outputs:
+            output.toggle()
+
+
+threads = [threading.Thread(target=toggle_all) for _ in range(THREADS)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+latch.flush()
+
+failures = []
+for output, value in zip(outputs, before):
+    if output.value != value:
+        failures.append(f"{output}: lost a toggle, expected {value}")
+if max_writing != 1:
+    failures.append(f"{max_writing} writes drove the latch pins at the same time")
+for output in outputs:
+    if written.get(output.addr, 0) != output.value:
+        failures.append(
+            f"{output}: latch has {written.get(output.addr, 0)} but device reports {output.value}"
+        )
+
+print(
+    f"{THREADS * OPERATIONS} random and {THREADS * OPERATIONS // 10 * 8} toggle operations "
+    + f"from {THREADS} threads"
+)
+print(
+    f"{sum(1 for _ in written)} addresses written, max concurrent writes {max_writing}"
+)
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
@@ -8,13 +8,13 @@ from time import sleep
 from component.potentiometer import potentiometer_actions
 from state_management import configure_device
 
+POTS = [f"pot{n+1}" for n in range(8)]
+
 configure_device("src/raspi/pinconfig.json")
 
 sleep(2)
 while True:
-    for n in range(8):
-        print(
-            "{0:.3f}".format(potentiometer_actions.get_degree(f"pot{n+1}")).zfill(8),
-            end=" ",
-        )
+    # all 8 potentiometers are on the same adc so this is a single i2c transaction
+    for degree in potentiometer_actions.get_degrees(POTS):
+        print("{0:.3f}".format(degree).zfill(8), end=" ")
     print("")
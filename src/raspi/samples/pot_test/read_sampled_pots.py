@@ -0,0 +1,25 @@
+# This script samples all potentiometers in the background and prints the cached degrees with the sampler stats.
+# The main loop never touches the i2c bus as long as the sampler keeps up.
+
+from time import sleep
+
+from component.potentiometer import potentiometer_actions
+from state_management import bind, configure_device
+
+RATE = 200  # unit: Hz
+MAX_AGE = 0.05  # unit: seconds
+
+configure_device("src/raspi/pinconfig.json")
+
+pots = [bind(potentiometer_actions.ctx, f"pot{n+1}") for n in range(8)]
+potentiometer_actions.start_sampling(RATE)
+
+while True:
+    sleep(0.5)
+    for pot in pots:
+        print("{0:.3f}".format(pot.get_degree(max_age=MAX_AGE)).zfill(8), end=" ")
+    stats = potentiometer_actions.get_sampling_stats()
+    print(
+        f"| {stats['rate']:.1f}/{stats['target_rate']:.0f} Hz "
+        + f"bus {stats['bus_utilisation'] * 100:.1f}%"
+    )
@@ -7,7 +7,7 @@
 from time import sleep
 
 from component.potentiometer import potentiometer_actions
-from state_management import configure_device
+from state_management import bind, configure_device
 
 # pot number to read
 n = 5
@@ -15,7 +15,13 @@ n = 5
 configure_device("src/raspi/pinconfig.json")
 sleep(2)
 
+# resolve the devices once since they are read in a tight loop
+analog_input = bind(
+    potentiometer_actions.ADC_action.analog_input_device_ctx, f"adc_1.pot{n}"
+)
+pot = bind(potentiometer_actions.ctx, f"pot{n}")
+
 while True:
-    raw = potentiometer_actions.ADC_action.get_data(f"adc_1.pot{n}")
-    data = "{0:.4f}".format(potentiometer_actions.get_degree(f"pot{n}")).zfill(8)
+    raw = analog_input.get_data()
+    data = "{0:.4f}".format(pot.get_degree()).zfill(8)
     print(f"{data}deg bytearray:{raw}")
@@ -0,0 +1,106 @@
+# Test of coordinated moves in the mock environment: motor_1 and motor_2 are moved together with motor_action.move.
+# Checks the number of steps and the direction of each motor and that the move takes as long as the longest
+# single move instead of the sum of both, and that a motor without steps keeps its direction.
+# run: cb sample rawmotor/coordinated_move_test
+
+import sys
+from time import perf_counter
+
+from component.latch import latch_actions
+from component.motor import motor_action, raw_motor_action, step_pin_action
+from state_management import (
+    configure_device,
+    get_device,
+    run_async,
+    set_environment,
+)
+
+MOVES = [
+    {"motor_1": 300, "motor_2": -120},
+    {"motor_1": -7, "motor_2": 64},
+    {"motor_1": 50, "motor_2": 50},
+    {"motor_1": 0, "motor_2": 25},
+]
+TOLERANCE = 0.15  # relative to the longest single move
+
+set_environment("dev")
+latch_actions.ENABLE_DURATION = 0.0001
+configure_device("src/raspi/pinconfig.json", log_level="Warning")
+
+steps = {}  # {motor: rising edges of the step pin}
+
+
+def count_steps(motor: str):
+    pin = get_device(
+        step_pin_action.step_ctx, raw_motor_action.ctx.store[motor].step_pin
+    )
+    on = pin.on
+
+    def counted_on():
+        steps[motor] += 1
+        on()
+
+    pin.on = counted_on
+
+
+for motor in ("motor_1", "motor_2"):
+    count_steps(motor)
+
+
+def direction_of(motor: str) -> int:
+    return get_device(
+        step_pin_action.direction_ctx, raw_motor_action.ctx.store[motor].direction_pin
+    ).value
+
+
+def timed(func) -> float:
+    start = perf_counter()
+    func()
+    return perf_counter() - start
+
+
+failures = []
+for targets in MOVES:
+    single = {}
+    for motor, n in targets.items():
+        steps[motor] = 0
+        single[motor] = timed(lambda: raw_motor_action.step_n(motor, n))
+    for use_async in (False, True):
+        steps.update({motor: 0 for motor in targets})
+        for motor, n in targets.items():
+            if not n:
+                # a motor without steps must keep a direction the move would not set
+                raw_motor_action.set_dir(motor, 1)
+                step_pin_action.wait_for_direction(
+                    raw_motor_action.ctx.store[motor].direction_pin
+                )
+        before = {motor: direction_of(motor) for motor in targets}
+        if use_async:
+            duration = timed(lambda: run_async(motor_action.move_async(targets)))
+        else:
+            duration = timed(lambda: motor_action.move(targets))
+        name = f"{'move_async' if use_async else 'move'}({targets})"
+        for motor, n in targets.items():
+            if steps[motor] != abs(n):
+                failures.append(f"{name}: {motor} stepped {steps[motor]} times")
+            direction = direction_of(motor)
+            if n and direction != int(n > 0):
+                failures.append(f"{name}: {motor} direction is {direction}")
+            if not n and direction != before[motor]:
+                failures.append(f"{name}: {motor} without steps changed direction")
+        longest = max(single.values())
+        if abs(duration - longest) > TOLERANCE * longest + 0.005:
+            failures.append(
+                f"{name}: took {duration * 1e3:.1f} ms, longest single move {longest * 1e3:.1f} ms"
+            )
+        print(
+            f"{name}: {duration * 1e3:7.1f} ms (single moves: "
+            + ", ".join(f"{m} {t * 1e3:.1f} ms" for m, t in single.items())
+            + f", sum {sum(single.values()) * 1e3:.1f} ms)"
+        )
+
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
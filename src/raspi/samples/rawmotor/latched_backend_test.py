@@ -0,0 +1,52 @@
+# Test of the pulse backend picked for the step pin of a raw motor in the mock environment:
+# a step pin on a gpio gets the wave engine, a step pin on the latch is stepped in software
+# (the pin attribute of a latched pin is its address on the latch, not a gpio).
+# run: cb sample rawmotor/latched_backend_test
+
+import json
+import os
+import sys
+import tempfile
+
+from gpiozero import Device, DigitalOutputDevice
+from gpiozero.pins.mock import MockFactory
+
+from component.latch import latch_actions
+from component.motor import raw_motor_action
+from component.motor.pulse import MockWaveBackend, SoftwareBackend, gpio_number
+from state_management import configure_device, output_device_ctx, set_environment
+
+set_environment("dev")
+with open("src/raspi/pinconfig.json") as file:
+    config = json.load(file)
+config["raw_motor"]["motor_latched"] = {
+    "step_pin": "latch_1.latch_3",
+    "direction_pin": "latch_1.latch_4",
+}
+directory = tempfile.mkdtemp()
+file_name = os.path.join(directory, "pinconfig.json")
+with open(file_name, "w") as file:
+    json.dump(config, file)
+configure_device(file_name, log_level="Warning")
+
+failures = []
+latched = output_device_ctx.store["latch_1.latch_3"]
+if gpio_number(latched) is not None:
+    failures.append(f"latched pin has gpio {gpio_number(latched)}")
+
+for name, backend in (("motor_1", MockWaveBackend), ("motor_latched", SoftwareBackend)):
+    motor = raw_motor_action.ctx.store[name]
+    if not isinstance(motor.backend, backend):
+        failures.append(
+            f"{name}: {type(motor.backend).__name__}, expected {backend.__name__}"
+        )
+
+Device.pin_factory = MockFactory()
+if gpio_number(DigitalOutputDevice(17)) != 17:
+    failures.append("gpiozero pin 17 has no gpio")
+
+if failures:
+    print("FAIL")
+    print("\n".join(failures))
+    sys.exit(1)
+print("PASS")
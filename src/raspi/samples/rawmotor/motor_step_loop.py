@@ -1,8 +1,7 @@
-import asyncio
 from time import sleep
 
 from component.motor import raw_motor_action
-from state_management import configure_device
+from state_management import configure_device, run_async
 from component.latch import latch_actions
 
 latch_actions.USE = True
@@ -15,8 +14,8 @@ configure_device("src/raspi/pinconfig.json")
 
 while True:
     print("Moving left")
-    asyncio.run(raw_motor_action.step_n("motor_1", LEFT_STEP))
+    run_async(raw_motor_action.step_n_async("motor_1", LEFT_STEP))
     sleep(0.5)
     print("Moving right")
-    asyncio.run(raw_motor_action.step_n("motor_1", RIGHT_STEP))
+    run_async(raw_motor_action.step_n_async("motor_1", RIGHT_STEP))
     sleep(0.5)
@@ -1,8 +1,7 @@
-import asyncio
 from time import sleep
 
 from component.motor import raw_motor_action
-from state_management import configure_device
+from state_management import configure_device, run_async
 
 RANGE = 30
 
@@ -10,5 +9,5 @@ configure_device("src/raspi/pinconfig.json")
 
 while True:
     for n in range(RANGE):
-        asyncio.run(raw_motor_action.step_n("motor_1", n))
+        run_async(raw_motor_action.step_n_async("motor_1", n))
         sleep(1)
@@ -1,3 +1,5 @@
 from ._device import *
+from ._instrumentation import *
+from ._telemetry import *
 from .generic_devices import *
 from .utils import *
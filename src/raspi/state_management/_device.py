@@ -1,11 +1,15 @@
 import inspect
 import json
 import logging
+import threading
 from collections import OrderedDict
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from functools import reduce, wraps
+from functools import wraps
+from time import perf_counter
 
+from ._graph import DeviceGraph, DeviceNode, DeviceStore
+from ._pinconfig_cache import compiler_hash, config_hash, read_cache, write_cache
 from .utils.logger import configure_logger
 
 
@@ -18,13 +22,24 @@ class Context:
     masked_device_contexts: list
     on_exit: callable
     masked_from: "Context" = None
+    actions: dict = field(default_factory=dict)
+    compile_config: callable = None
+    name: str = None
 
 
 DEVICE_CONTEXT_COLLECTION = {}
+# devices can be registered from several threads while configuring
+_register_lock = threading.Lock()
+# callables[[Context, str, device, tuple, any], None] called after every device action, see add_action_hook
+ACTION_HOOKS = []
+# callable[[Context, str, float], None] given the duration of every device action, see set_action_timer
+_action_timer = None
+# an action hook or timer is set, actions take the fast path while it is False
+_observed = False
 
 
 def check_only_class_instance(ctx: Context, x: any):
-    return reduce(lambda res, y: res or isinstance(x, y), ctx.allowed_classes, False)
+    return isinstance(x, ctx.allowed_classes)
 
 
 def register_device(ctx: Context, name: str, device):
@@ -33,10 +48,11 @@ def register_device(ctx: Context, name: str, device):
             f"{device} must be a identifier(string) or "
             + "/".join([x.__name__ for x in ctx.allowed_classes])
         )
-    if name in ctx.stored_keys:
-        raise ValueError(f"{name} already exists")
-    ctx.store[name] = device
-    ctx.stored_keys.add(name)
+    with _register_lock:
+        if name in ctx.stored_keys:
+            raise ValueError(f"{name} already exists")
+        ctx.store[name] = device
+        ctx.stored_keys.add(name)
 
 
 def create_generic_context(
@@ -52,10 +68,11 @@ def create_generic_context(
     ctx = Context(
         allowed_classes=device_classes,
         parse_device=parser_func,
-        store=dict(),
+        store=DeviceStore(),
         stored_keys=set(),
         masked_device_contexts=list(),
         on_exit=on_exit,
+        name=generic_device_name,
     )
     DEVICE_CONTEXT_COLLECTION[generic_device_name] = ctx
     return ctx
@@ -81,15 +98,33 @@ def create_masked_context(ctx: Context, device_name: str):
         masked_device_contexts=list(),
         on_exit=ctx.on_exit,
         masked_from=ctx,
+        compile_config=ctx.compile_config,
+        name=device_name,
     )
     ctx.masked_device_contexts.append(device_name)
     DEVICE_CONTEXT_COLLECTION[device_name] = new_ctx
     return new_ctx
 
 
+def allow_device_class(ctx: Context, device_class: type) -> None:
+    """
+    Allow instances of device_class in the context and every context masked from it.
+    Lets parsers register classes from libraries they only import once a device is parsed.
+    """
+    with _register_lock:
+        contexts = [ctx]
+        while contexts:
+            ctx = contexts.pop()
+            if device_class not in ctx.allowed_classes:
+                ctx.allowed_classes = (device_class, *ctx.allowed_classes)
+            contexts += [
+                DEVICE_CONTEXT_COLLECTION[c] for c in ctx.masked_device_contexts
+            ]
+
+
 def get_context(device_name: str) -> Context:
     """NOTE: This function will not throw if context is missing. Returns None instead."""
-    logging.debug(f"Getting context for {device_name}")
+    logging.debug("Getting context for %s", device_name)
     ctx = DEVICE_CONTEXT_COLLECTION.get(device_name, None)
     return ctx
 
@@ -118,29 +153,226 @@ def device_exit(ctx: Context):
     return decorator
 
 
+def device_compiler(ctx: Context):
+    """Decorator of a function that validates the pinconfig attributes of a device and precomputes
+    what the parser would compute on every startup. The result is stored in the compiled pinconfig
+    and passed to the parser instead of the attributes from the file, so the parser has to accept both.
+    """
+
+    def decorator(func: callable):
+        ctx.compile_config = func
+        for sub_context in ctx.masked_device_contexts:
+            DEVICE_CONTEXT_COLLECTION[sub_context].compile_config = func
+        return func
+
+    return decorator
+
+
+def resolve_action_target(ctx: Context, target):
+    """Device an action is called on from an identifier, a device or a BoundDevice."""
+    if isinstance(target, str):
+        value = ctx.store.get(target)
+        if value is None:
+            raise ValueError(f"{target} not found in {ctx}")
+        return value
+    if isinstance(target, ctx.allowed_classes):
+        return target
+    if isinstance(target, BoundDevice) and target.ctx is ctx:
+        return target.device
+    raise ValueError(
+        f"First argument({target}) must be a identifier(string) or "
+        + "/".join([x.__name__ for x in ctx.allowed_classes])
+    )
+
+
+def _update_observed():
+    global _observed
+    _observed = bool(ACTION_HOOKS) or _action_timer is not None
+
+
+def add_action_hook(hook: callable) -> None:
+    """
+    Call hook(ctx, action_name, device, args, result) after every device action returns, i.e. to record the actions.
+    args are the arguments after the device. Actions cost one extra check while no hook or timer is set.
+    """
+    ACTION_HOOKS.append(hook)
+    _update_observed()
+
+
+def remove_action_hook(hook: callable) -> None:
+    if hook in ACTION_HOOKS:
+        ACTION_HOOKS.remove(hook)
+    _update_observed()
+
+
+def set_action_timer(timer: callable = None) -> None:
+    """
+    Call timer(ctx, action_name, seconds) with the duration of every device action that returns.
+    None removes the timer. Used by enable_instrumentation.
+    """
+    global _action_timer
+    _action_timer = timer
+    _update_observed()
+
+
+def observe_action(ctx: Context, name: str, func: callable, device, args, kwargs):
+    """Run an action and report it to the timer and the hooks."""
+    start = perf_counter()
+    result = func(device, *args, **kwargs)
+    _report_action(ctx, name, device, args, result, perf_counter() - start)
+    return result
+
+
+async def observe_action_async(
+    ctx: Context, name: str, func: callable, device, args, kwargs
+):
+    start = perf_counter()
+    result = await func(device, *args, **kwargs)
+    _report_action(ctx, name, device, args, result, perf_counter() - start)
+    return result
+
+
+def _report_action(ctx: Context, name: str, device, args, result, duration: float):
+    # the action already ran, an error of the timer or a hook is logged instead of raised to the caller
+    timer = _action_timer
+    if timer is not None:
+        try:
+            timer(ctx, name, duration)
+        except Exception:
+            logging.exception("Error in action timer %s", timer)
+    for hook in ACTION_HOOKS:
+        try:
+            hook(ctx, name, device, args, result)
+        except Exception:
+            logging.exception("Error in action hook %s", hook)
+
+
 def device_action(ctx: Context):
+    """Decorator of the actions of a device. Coroutine functions stay coroutine functions,
+    await them or run them with run_async."""
+
     def decorator(func: callable):
+        name = func.__name__
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if len(args) < 1:
+                    raise ValueError("Missing argument")
+                device = resolve_action_target(ctx, args[0])
+                if not _observed:
+                    return await func(device, *args[1:], **kwargs)
+                return await observe_action_async(
+                    ctx, name, func, device, args[1:], kwargs
+                )
+
+            ctx.actions[name] = func
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             if len(args) < 1:
                 raise ValueError("Missing argument")
-            if not (
-                check_only_class_instance(ctx, args[0]) or isinstance(args[0], str)
-            ):
-                raise ValueError(
-                    f"First argument({args[0]}) must be a identifier(string) or "
-                    + "/".join([x.__name__ for x in ctx.allowed_classes])
-                )
-            value = ctx.store.get(args[0]) if isinstance(args[0], str) else args[0]
-            if value is None and isinstance(args[0], str):
-                raise ValueError(f"{args[0]} not found in {ctx}")
-            return func(value, *args[1:], **kwargs)
+            device = resolve_action_target(ctx, args[0])
+            if not _observed:
+                return func(device, *args[1:], **kwargs)
+            return observe_action(ctx, name, func, device, args[1:], kwargs)
 
+        ctx.actions[name] = func
         return wrapper
 
     return decorator
 
 
+def get_device(ctx: Context, name):
+    """Resolve an identifier to the device stored in the context.
+
+    Args:
+        ctx (Context): context the device is stored in
+        name (str | device): identifier of the device or the device itself
+
+    Returns:
+        the device object
+    """
+    if isinstance(name, str):
+        device = ctx.store.get(name)
+        if device is None:
+            raise ValueError(f"{name} not found in {ctx}")
+        return device
+    if not check_only_class_instance(ctx, name):
+        raise ValueError(
+            f"{name} must be a identifier(string) or "
+            + "/".join([x.__name__ for x in ctx.allowed_classes])
+        )
+    return name
+
+
+def bind_action(ctx: Context, name: str, func: callable, device) -> callable:
+    """The action with the device already resolved. Reported to the timer and the hooks like device_action."""
+    if inspect.iscoroutinefunction(func):
+
+        async def bound_async(*args, **kwargs):
+            if not _observed:
+                return await func(device, *args, **kwargs)
+            return await observe_action_async(ctx, name, func, device, args, kwargs)
+
+        return bound_async
+
+    def bound(*args, **kwargs):
+        if not _observed:
+            return func(device, *args, **kwargs)
+        return observe_action(ctx, name, func, device, args, kwargs)
+
+    return bound
+
+
+class BoundDevice:
+    """Device handle returned by `bind`.
+
+    Every action registered on the context is exposed as a method with the device already
+    resolved, so calling it skips the identifier lookup and type check done by `device_action`.
+    The calls are still reported to the action timer and hooks (instrumentation, event recorder).
+    ```py
+    motor = bind(raw_motor_action.ctx, "motor_1")
+    motor.step_n(10)  # same as raw_motor_action.step_n("motor_1", 10)
+    ```
+    """
+
+    def __init__(self, ctx: Context, name: str, device):
+        self.ctx = ctx
+        self.name = name
+        self.device = device
+        for action_name, action in ctx.actions.items():
+            self.__dict__[action_name] = bind_action(ctx, action_name, action, device)
+
+    def __getattr__(self, name: str):
+        # only reached for actions registered after the handle was created
+        action = self.ctx.actions.get(name)
+        if action is None:
+            raise AttributeError(f"{self.name} has no action named {name}")
+        bound_action = bind_action(self.ctx, name, action, self.device)
+        self.__dict__[name] = bound_action
+        return bound_action
+
+    def __repr__(self) -> str:
+        return f"BoundDevice(name={self.name}, device={self.device})"
+
+
+def bind(ctx: Context, name) -> BoundDevice:
+    """Resolve a device once and return a handle whose methods are the context's actions.
+    Use this in loops that call actions on the same device many times.
+
+    Args:
+        ctx (Context): context of the device (the same one the actions are declared with)
+        name (str | device): identifier of the device or the device itself
+
+    Returns:
+        BoundDevice: pre-resolved handle of the device
+    """
+    device = get_device(ctx, name)
+    return BoundDevice(ctx, name if isinstance(name, str) else repr(device), device)
+
+
 @dataclass(slots=True, frozen=True)
 class Identifier:
     ctx: Context
@@ -233,24 +465,164 @@ def log_states():
     )
 
 
+def build_device_graph(file_name: str, file_kv_generator: callable) -> DeviceGraph:
+    """Read the pinconfig into a graph of the devices and the devices they reference."""
+    graph = DeviceGraph(create_device_node)
+    for section, config in file_kv_generator(file_name):
+        ctx = get_context(section)
+        if ctx is None:
+            # kept in the graph so a compiled pinconfig also covers components imported by other scripts
+            logging.warning(f"Context for {section} not found. Skipping...")
+        if (ctx is None or ctx.masked_from) and (
+            casted_devices := config.get("__cast", None)
+        ):
+            for masked_key, masked_device_identifier in casted_devices.items():
+                if not isinstance(masked_device_identifier, str):
+                    raise ValueError(
+                        f"Masked device {masked_device_identifier} is not a valid identifier in {ctx}"
+                    )
+                graph.add(
+                    DeviceNode(
+                        ctx, masked_key, cast=masked_device_identifier, section=section
+                    )
+                )
+            config = {k: v for k, v in config.items() if k != "__cast"}
+        for key, device_attr in config.items():
+            graph.add(DeviceNode(ctx, key, device_attr, section=section))
+    graph.link()
+    return graph
+
+
+def compile_graph(graph: DeviceGraph, validate: bool = True) -> bool:
+    """
+    Validate the graph and run the compiler of every device that has one.
+
+    Returns:
+        bool: True if a device was compiled
+    """
+    if validate:
+        graph.order()  # raises on reference cycles
+    compiled = False
+    for node in graph.nodes:
+        if node.compiled or node.ctx is None or node.cast is not None:
+            continue
+        if node.ctx.compile_config is not None:
+            node.config = node.ctx.compile_config(node.config)
+            node.compiled = compiled = True
+    return compiled
+
+
+def graph_rows(graph: DeviceGraph) -> list[tuple]:
+    """The graph as plain values for the compiled pinconfig, in creation order."""
+    nodes = graph.order()
+    index = {id(node): i for i, node in enumerate(nodes)}
+    return [
+        (
+            node.section,
+            node.name,
+            node.config,
+            node.cast,
+            compiler_hash(node.ctx.compile_config) if node.compiled else None,
+            [index[id(dependency)] for dependency in node.dependencies],
+        )
+        for node in nodes
+    ]
+
+
+def graph_from_rows(rows: list[tuple]) -> DeviceGraph:
+    graph = DeviceGraph(create_device_node)
+    contexts = {}
+    for section, name, config, cast, compiler, _ in rows:
+        if section not in contexts:
+            contexts[section] = get_context(section)
+            if contexts[section] is None:
+                logging.warning(f"Context for {section} not found. Skipping...")
+        graph.add(
+            DeviceNode(
+                contexts[section], name, config, cast, section, compiler is not None
+            )
+        )
+    for node, row in zip(graph.nodes, rows):
+        node.dependencies = [graph.nodes[i] for i in row[5]]
+    return graph
+
+
+def compilers_changed(rows: list[tuple]) -> bool:
+    """True if a config in the rows was compiled by a compiler that changed since"""
+    for section, _, _, _, compiler, _ in rows:
+        if compiler is None or (ctx := get_context(section)) is None:
+            continue
+        if ctx.compile_config is None or compiler_hash(ctx.compile_config) != compiler:
+            return True
+    return False
+
+
+def load_compiled_graph(file_name: str) -> DeviceGraph:
+    """
+    Graph of the compiled pinconfig. The pinconfig is compiled and the result is cached when the
+    file or the compiler of one of its devices changed since it was last compiled.
+    """
+    with open(file_name, "rb") as file:
+        data = file.read()
+    digest = config_hash(data)
+    rows = read_cache(file_name, digest)
+    if rows is None or compilers_changed(rows):
+        logging.info("Compiling %s", file_name)
+        graph = build_device_graph(file_name, lambda _: json.loads(data).items())
+        compile_graph(graph)
+    else:
+        graph = graph_from_rows(rows)
+        # validated when it was compiled
+        if not compile_graph(graph, validate=False):
+            return graph
+        # a component imported now was not imported when the pinconfig was compiled
+    write_cache(file_name, digest, graph_rows(graph))
+    return graph
+
+
+def create_device_node(node: DeviceNode):
+    """Parse and register the device of a pinconfig entry."""
+    ctx = node.ctx
+    if ctx is None:
+        return
+    if node.cast is not None:
+        casting_device = ctx.masked_from.store.get(node.cast)
+        if casting_device is None:
+            raise ValueError(
+                f"Masked device {node.cast} not found in {ctx.masked_from}"
+            )
+        register_device(ctx, node.name, casting_device)
+        return
+    device = ctx.parse_device(node.config, _identifier=node.name)
+    register_device(ctx, node.name, device)
+
+
 @contextmanager
 def configure_device(
     file_name: str = "pinconfig.json",
     file_kv_generator: callable = open_json,
     log_level: str = "Debug",
+    lazy: bool = False,
+    cache: bool = False,
+    workers: int = 4,
 ):
     """configure the devices from the pinconfig file. This will parse the devices and store them in the global store.
 
     Args:
         file_name (str, optional): file of the pinconfiguration. Defaults to "pinconfig.json".
         file_kv_generator (callable[[file_name: str], Generator[tuple[str, Any], Any, None]], optional): function for opening the pinconfig. Defaults to open_json.
+        lazy (bool, optional): only create a device (and the devices it references) the first time it is looked up. Defaults to False.
+        cache (bool, optional): load the compiled pinconfig from .cache next to the file if the file did not change since it was compiled, and write it there otherwise. Only used with open_json. Compiling the current pinconfig takes about a tenth of a millisecond, so this only pays off for a pinconfig that is slow to compile. Defaults to False.
+        workers (int, optional): threads creating the devices, devices that do not reference each other are created at the same time. 1 creates them one by one. Defaults to 4.
 
     Details:
         file_kv_generator is a function that takes in a file name and returns a generator that yields a tuple of the key and the value. This is used to open the pinconfig file and parse the devices.
         The expected behavior is that the file_kv_generator will parse the config and return a generator for the first layer of key and value pairs.
         The key should be the identifier of the device parser and the value should be the object with device identifier and attributes.
-        The expected behavior is that the file_kv_generator will parse the config and return a generator for the first layer of key and value pairs.
-        The key should be the identifier of the device parser and the value should be the object with device identifier and attributes.
+        Devices are created after the devices they reference with an identifier, so the sections of the pinconfig can be in any order.
+        With lazy=True a script that uses one potentiometer only creates that potentiometer, its adc and the smbus.
+        Devices are looked up by device actions, bind and get_device; iterating a store only yields the devices created so far,
+        ctx.store.all() creates the rest of the devices of the context first.
 
     WARNING:
         This method will skip any parser that was not registered in the device parser list.
@@ -258,27 +630,24 @@ def configure_device(
     """
     configure_logger(log_level)
     logging.info("Configuring devices...")
-    for key, config in file_kv_generator(file_name):
-        ctx = get_context(key)
-        if ctx is None:
-            logging.warning(f"Context for {key} not found. Skipping...")
-            continue
-        if ctx.masked_from and (casted_devices := config.get("__cast", None)):
-            for masked_key, masked_device_identifier in casted_devices.items():
-                if not isinstance(masked_device_identifier, str):
-                    raise ValueError(
-                        f"Masked device {masked_device_identifier} is not a valid identifier in {ctx}"
-                    )
-                casting_device = ctx.masked_from.store.get(masked_device_identifier)
-                if casting_device is None:
-                    raise ValueError(
-                        f"Masked device {masked_device_identifier} not found in {ctx.masked_from}"
-                    )
-                register_device(ctx, masked_key, casting_device)
-            del config["__cast"]
-        for key, device_attr in config.items():
-            device = ctx.parse_device(device_attr, _identifier=key)
-            register_device(ctx, key, device)
+    if cache and file_kv_generator is open_json:
+        graph = load_compiled_graph(file_name)
+    else:
+        graph = build_device_graph(file_name, file_kv_generator)
+    if lazy:
+        graph.order()  # fail on reference cycles now instead of on first use
+        for ctx in DEVICE_CONTEXT_COLLECTION.values():
+            ctx.store.loader = graph.load
+            ctx.store.load_all = graph.load_all
+        logging.info("%s devices will be created on first use", len(graph.nodes))
+    else:
+        start = perf_counter()
+        graph.create_all(workers)
+        logging.info(
+            "Created %s devices in %.2f ms",
+            sum(node.created for node in graph.nodes),
+            (perf_counter() - start) * 1e3,
+        )
 
     log_states()
     logging.info("Device configuration complete")
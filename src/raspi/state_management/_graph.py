@@ -0,0 +1,233 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from time import perf_counter
+
+
+class DeviceStore(dict):
+    """
+    Store of the devices of a context.
+    When the devices are configured lazily, looking up a device that is not created yet asks the loader
+    to create it (and everything it depends on) first. Iterating the store only yields created devices,
+    use `all` to act on every device of the context.
+    """
+
+    loader: callable = None
+    # creates every device of a store, set with the loader
+    load_all: callable = None
+
+    def all(self) -> list:
+        """every device of the store, the devices that are not created yet are created first"""
+        if self.load_all is not None:
+            self.load_all(self)
+        return list(self.values())
+
+    def __missing__(self, name):
+        if self.loader is not None and self.loader(self, name):
+            return dict.__getitem__(self, name)
+        raise KeyError(name)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
+@dataclass(eq=False)
+class DeviceNode:
+    """
+    A device listed in the pinconfig.
+
+    ctx: Context = context the device is registered in, None if the component is not imported
+    name: str = identifier of the device
+    config: any = attributes of the device from the pinconfig
+    cast: str = identifier of the device in ctx.masked_from registered under name (__cast entries)
+    section: str = key of the context in the pinconfig
+    compiled: bool = config was already passed through the compiler of the context
+    """
+
+    ctx: object
+    name: str
+    config: any = None
+    cast: str = None
+    section: str = None
+    compiled: bool = False
+    dependencies: list["DeviceNode"] = field(default_factory=list, repr=False)
+    created: bool = field(default=False, repr=False)
+
+
+def referenced_identifiers(config) -> list[str]:
+    """every string value in the config, identifiers of other devices are among them"""
+    if isinstance(config, str):
+        return [config]
+    if isinstance(config, dict):
+        config = config.values()
+    elif not isinstance(config, list):
+        return []
+    return [value for item in config for value in referenced_identifiers(item)]
+
+
+class DeviceGraph:
+    """
+    Devices of a pinconfig linked to the devices they reference.
+
+    A string in the config of a device is a reference when it is the identifier of another device, or when
+    the part before the first "." is (devices created by another device's parser, i.e. "latch_1.latch_1").
+    Devices are created after everything they reference, so the order of the sections in the pinconfig
+    does not matter.
+    """
+
+    def __init__(self, create_node: callable):
+        """
+        :param create_node: callable[[DeviceNode], None] = parses and registers the device of a node
+        """
+        self.nodes: list[DeviceNode] = []
+        self.by_name: dict[str, list[DeviceNode]] = {}
+        self._create_node = create_node
+        self._creating = set()
+        self.lock = threading.RLock()
+        # {id(store): lock} devices of the same store are never created at the same time
+        # since their parser may share state (i.e. the potentiometer bank)
+        self._store_locks = {}
+
+    def add(self, node: DeviceNode) -> DeviceNode:
+        self.nodes.append(node)
+        self.by_name.setdefault(node.name, []).append(node)
+        return node
+
+    def link(self) -> None:
+        """Find the dependencies of every node. Call after every node is added."""
+        for node in self.nodes:
+            references = (
+                [node.cast]
+                if node.cast is not None
+                else referenced_identifiers(node.config)
+            )
+            dependencies = {}
+            for reference in references:
+                for dependency in self.providers(reference):
+                    if dependency is not node:
+                        dependencies[id(dependency)] = dependency
+            node.dependencies = list(dependencies.values())
+
+    def providers(self, identifier: str) -> list[DeviceNode]:
+        """nodes that create the device with the identifier"""
+        nodes = self.by_name.get(identifier)
+        if nodes is None and "." in identifier:
+            nodes = self.by_name.get(identifier.split(".", 1)[0])
+        return nodes or []
+
+    def order(self) -> list[DeviceNode]:
+        """
+        Every node after its dependencies, otherwise in pinconfig order.
+
+        :raises ValueError: if the devices reference each other in a cycle
+        """
+        ordered, visited, visiting = [], set(), []
+
+        def visit(node: DeviceNode):
+            if id(node) in visited:
+                return
+            if node in visiting:
+                cycle = visiting[visiting.index(node) :] + [node]
+                raise ValueError(
+                    "Devices reference each other: "
+                    + " -> ".join(n.name for n in cycle)
+                )
+            visiting.append(node)
+            for dependency in node.dependencies:
+                visit(dependency)
+            visiting.pop()
+            visited.add(id(node))
+            ordered.append(node)
+
+        for node in self.nodes:
+            visit(node)
+        return ordered
+
+    def create(self, node: DeviceNode) -> None:
+        """Create the device of the node after the devices it depends on."""
+        with self.lock:
+            if node.created:
+                return
+            if id(node) in self._creating:
+                raise ValueError(f"{node.name} depends on itself")
+            self._creating.add(id(node))
+            try:
+                for dependency in node.dependencies:
+                    self.create(dependency)
+                self._create_timed(node)
+            finally:
+                self._creating.discard(id(node))
+
+    def _create_timed(self, node: DeviceNode) -> None:
+        key = id(node.ctx.store) if node.ctx is not None else None
+        with self.lock:
+            store_lock = self._store_locks.setdefault(key, threading.Lock())
+        with store_lock:
+            start = perf_counter()
+            self._create_node(node)
+            node.created = True
+        logging.info("Created %s in %.2f ms", node.name, (perf_counter() - start) * 1e3)
+
+    def create_all(self, workers: int = 1) -> None:
+        """
+        Create every device.
+
+        :param workers: int = number of threads creating devices. A device is created as soon as the devices
+        it references are, so independent devices (i.e. two i2c peripherals) initialize at the same time.
+        """
+        ordered = self.order()
+        if workers <= 1:
+            for node in ordered:
+                self.create(node)
+            return
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        remaining = {id(node): len(node.dependencies) for node in ordered}
+        dependents = {id(node): [] for node in ordered}
+        for node in ordered:
+            for dependency in node.dependencies:
+                dependents[id(dependency)].append(node)
+        with ThreadPoolExecutor(workers, thread_name_prefix="configure") as pool:
+            running = {
+                pool.submit(self._create_timed, node): node
+                for node in ordered
+                if remaining[id(node)] == 0
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    future.result()  # stop at the first device that fails
+                    for dependent in dependents[id(node)]:
+                        remaining[id(dependent)] -= 1
+                        if remaining[id(dependent)] == 0:
+                            running[pool.submit(self._create_timed, dependent)] = (
+                                dependent
+                            )
+
+    def load(self, store: DeviceStore, identifier: str) -> bool:
+        """
+        Create the device looked up in the store. Used as the loader of the stores when configured lazily.
+
+        :return: bool = True if a device was created
+        """
+        nodes = [
+            node
+            for node in self.by_name.get(identifier, [])
+            if node.ctx is not None and node.ctx.store is store
+        ]
+        if not nodes and "." in identifier:
+            nodes = self.by_name.get(identifier.split(".", 1)[0], [])
+        pending = [node for node in nodes if not node.created]
+        for node in pending:
+            self.create(node)
+        return bool(pending)
+
+    def load_all(self, store: DeviceStore) -> None:
+        """Create every device of the store that is not created yet."""
+        for node in self.nodes:
+            if not node.created and node.ctx is not None and node.ctx.store is store:
+                self.create(node)
@@ -0,0 +1,219 @@
+import logging
+import threading
+from array import array
+from functools import wraps
+from time import perf_counter
+
+from ._device import Context, set_action_timer
+from .utils.interval import scheduler
+
+__all__ = [
+    "LatencyHistogram",
+    "enable_instrumentation",
+    "disable_instrumentation",
+    "is_instrumented",
+    "instrumented",
+    "get_action_stats",
+    "reset_action_stats",
+    "format_action_stats",
+    "dump_action_stats",
+]
+
+# every power of 2 is split in 2^SUB_BUCKET_BITS buckets, so a latency is known within 1/32 (3%)
+SUB_BUCKET_BITS = 5
+# latencies are recorded in ns up to 2^MAX_BITS ns (68 s), longer ones are counted in the last bucket
+MAX_BITS = 36
+
+_stats: dict = None  # {(context name, action name): LatencyHistogram} while enabled
+_lock = threading.Lock()
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies in the style of HdrHistogram: fixed memory (one array of counts) and
+    constant time to record, with a relative error of at most 1 / 2^SUB_BUCKET_BITS.
+    Values below 2^(SUB_BUCKET_BITS + 1) ns have a bucket each, every power of 2 above that has 2^SUB_BUCKET_BITS.
+    """
+
+    sub_buckets = 1 << SUB_BUCKET_BITS
+    max_value = (1 << MAX_BITS) - 1
+
+    def __init__(self):
+        self.counts = array("q", bytes(8 * self.index(self.max_value) + 8))
+        self.count = 0
+        self.total = 0
+        self.min = self.max_value
+        self.max = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def index(cls, value: int) -> int:
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        if shift <= 0:
+            return value
+        return shift * cls.sub_buckets + (value >> shift)
+
+    @classmethod
+    def lower_bound(cls, index: int) -> int:
+        shift = index // cls.sub_buckets - 1
+        if shift <= 0:
+            return index
+        return (index - shift * cls.sub_buckets) << shift
+
+    def record(self, value: int) -> None:
+        """
+        :param value: int = latency in ns
+        """
+        # same as index(), inlined because it runs on every action
+        if value > self.max_value:
+            value = self.max_value
+        elif value < 0:
+            value = 0
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        index = value if shift <= 0 else (shift << SUB_BUCKET_BITS) + (value >> shift)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, percent: float) -> int:
+        """latency in ns that percent % of the recorded latencies are at or below (lower bound of its bucket)"""
+        if self.count == 0:
+            return 0
+        target = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return max(self.lower_bound(index), self.min)
+        return self.max
+
+    def summary(self) -> dict:
+        """count and mean, p50, p90, p99, max latency in ns"""
+        with self.lock:
+            return {
+                "count": self.count,
+                "mean": self.total / self.count if self.count else 0,
+                "p50": self.percentile(50),
+                "p90": self.percentile(90),
+                "p99": self.percentile(99),
+                "max": self.max,
+            }
+
+
+def record_latency(context_name: str, action: str, seconds: float) -> None:
+    stats = _stats
+    if stats is None:
+        return
+    histogram = stats.get((context_name, action))
+    if histogram is None:
+        with _lock:
+            histogram = stats.setdefault((context_name, action), LatencyHistogram())
+    histogram.record(int(seconds * 1e9))
+
+
+def _time_action(ctx: Context, action: str, seconds: float) -> None:
+    record_latency(ctx.name, action, seconds)
+
+
+def enable_instrumentation() -> None:
+    """
+    Count the calls and record the latency of every device action and every function decorated with instrumented.
+    Disabled by default, while disabled an action costs one extra check.
+    """
+    global _stats
+    with _lock:
+        if _stats is None:
+            _stats = {}
+    set_action_timer(_time_action)
+
+
+def disable_instrumentation() -> None:
+    """Stop recording latencies. The recorded stats are dropped."""
+    global _stats
+    set_action_timer(None)
+    _stats = None
+
+
+def is_instrumented() -> bool:
+    return _stats is not None
+
+
+def instrumented(context_name: str):
+    """
+    Decorator to record the latency of a function that is not a device action (i.e. a method of a device)
+    while instrumentation is enabled. The function is listed as (context_name, function name).
+    """
+
+    def decorator(func: callable):
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _stats is None:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            record_latency(context_name, name, perf_counter() - start)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def get_action_stats() -> dict[str, dict]:
+    """
+    Stats of every action called since instrumentation was enabled.
+
+    :return: dict[str, dict] = {"{context}.{action}": {count, mean, p50, p90, p99, max}} latencies in ns
+    """
+    stats = _stats or {}
+    return {
+        f"{context}.{action}": histogram.summary()
+        for (context, action), histogram in sorted(list(stats.items()))
+    }
+
+
+def reset_action_stats() -> None:
+    global _stats
+    with _lock:
+        if _stats is not None:
+            _stats = {}
+
+
+def format_action_stats() -> str:
+    """get_action_stats as a table, latencies in us"""
+    rows = [
+        f"{'action':<40} {'count':>10} {'mean':>10} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}"
+    ]
+    for name, stats in get_action_stats().items():
+        rows.append(
+            f"{name:<40} {stats['count']:>10} "
+            + " ".join(
+                f"{stats[key] / 1e3:>10.1f}"
+                for key in ("mean", "p50", "p90", "p99", "max")
+            )
+        )
+    return "\n".join(rows)
+
+
+def dump_action_stats(sec: float):
+    """
+    Log the action stats every sec seconds at the info level.
+
+    Scheduled directly on the scheduler, so clear_intervals (i.e. of the UI) does not stop it.
+
+    :return: TimerHandle = cancel it to stop dumping
+    """
+    if sec <= 0:
+        raise ValueError("Interval must be greater than 0. Got " + str(sec))
+    return scheduler.schedule(
+        lambda: logging.info("Action latency (us):\n%s", format_action_stats()),
+        sec,
+        period=sec,
+    )
@@ -0,0 +1,75 @@
+import hashlib
+import logging
+import marshal
+import os
+import sys
+
+# bump when the layout of the rows changes
+FORMAT_VERSION = 2
+CACHE_DIR = ".cache"
+
+_compiler_hashes = {}
+
+
+def config_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def compiler_hash(func: callable) -> str:
+    """
+    Hash of the module a compiler is defined in, so a compiled config is not reused once the compiler or
+    the helpers next to it change. The bytecode of the compiler is hashed if the module file can't be read.
+    """
+    digest = _compiler_hashes.get(func)
+    if digest is None:
+        try:
+            with open(func.__code__.co_filename, "rb") as file:
+                digest = config_hash(file.read())
+        except OSError:
+            digest = config_hash(marshal.dumps(func.__code__))
+        _compiler_hashes[func] = digest
+    return digest
+
+
+def cache_file(file_name: str) -> str:
+    """compiled pinconfig is kept next to the pinconfig i.e. src/raspi/.cache/pinconfig.json.compiled"""
+    directory, name = os.path.split(os.path.abspath(file_name))
+    return os.path.join(directory, CACHE_DIR, name + ".compiled")
+
+
+def read_cache(file_name: str, digest: str) -> list | None:
+    """
+    Rows of the compiled pinconfig if it was compiled from a file with the same hash.
+
+    :param file_name: str = pinconfig file
+    :param digest: str = config_hash of the pinconfig file
+    :return: list[tuple] | None = [(section, name, config, cast, compiler, dependencies), ...]
+        compiler is the compiler_hash of the compiler the config was passed through, None if it was not compiled
+    """
+    try:
+        with open(cache_file(file_name), "rb") as file:
+            # loads of the whole file is a lot faster than load on the file object
+            version, python, cached_digest, rows = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (version, python, cached_digest) != (
+        FORMAT_VERSION,
+        sys.version_info[:2],
+        digest,
+    ):
+        return None
+    return rows
+
+
+def write_cache(file_name: str, digest: str, rows: list) -> None:
+    path = cache_file(file_name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as file:
+            file.write(
+                marshal.dumps((FORMAT_VERSION, sys.version_info[:2], digest, rows))
+            )
+        os.replace(temp, path)
+    except (OSError, ValueError) as e:
+        logging.warning("Could not write the compiled pinconfig %s: %s", path, e)
@@ -0,0 +1,174 @@
+import atexit
+import json
+import logging
+import os
+import struct
+import threading
+from datetime import datetime as d
+from math import nan
+from time import time
+
+import __main__
+
+from ._device import Context, add_action_hook, remove_action_hook
+
+__all__ = [
+    "EventRecorder",
+    "start_recording",
+    "stop_recording",
+    "load_events",
+]
+
+# time (unix seconds), device id, action id, value
+EVENT_FORMAT = "<dHHd"
+_pack = struct.Struct(EVENT_FORMAT).pack
+# bytes buffered before they are written to the file
+BUFFER_SIZE = 64 * 1024
+
+_recorder: "EventRecorder" = None
+
+
+class EventRecorder:
+    """
+    Binary log of device actions. Every event is a fixed size record (EVENT_FORMAT) so a run can be loaded
+    with `load_events` without parsing. Devices and actions are stored as ids, their names are in a json file
+    next to the event file (events.bin -> events.bin.json).
+
+    time: unix time the action returned at, so actions called by another action are recorded before it
+    device: identifier of the device the action was called on
+    action: "{context name}.{action name}" i.e. "stepPin.set_high"
+    value: first argument after the device if it is a number (i.e. the state or the number of steps),
+    otherwise the result if it is a number, otherwise nan
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.file = open(file_name, "wb")
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+        # actions still running when the recorder is closed are not recorded
+        self.closed = False
+        self.devices = {}  # {name: id}
+        self.actions = {}  # {name: id}
+        self._names = {}  # {id(ctx.store): {id(device): name}}
+        self._ids = {}  # {(id(device), id(ctx), action): (device id, action id)}
+
+    def device_id(self, ctx: Context, device) -> int:
+        names = self._names.setdefault(id(ctx.store), {})
+        name = names.get(id(device))
+        if name is None:
+            # devices created after the last lookup (i.e. configured lazily) are added to the names
+            names.update({id(dev): key for key, dev in list(ctx.store.items())})
+            name = names.setdefault(id(device), repr(device))
+        return self._id(self.devices, name)
+
+    def _id(self, table: dict, name: str) -> int:
+        index = table.get(name)
+        if index is None:
+            index = table[name] = len(table)
+            self._write_names()
+        return index
+
+    def _write_names(self):
+        with open(self.file_name + ".json", "w") as file:
+            json.dump(
+                {
+                    "format": EVENT_FORMAT,
+                    "devices": list(self.devices),
+                    "actions": list(self.actions),
+                },
+                file,
+            )
+
+    def record(self, ctx: Context, action: str, device, args: tuple, result) -> None:
+        """action hook, see add_action_hook"""
+        value = args[0] if args else result
+        if not isinstance(value, (int, float)):
+            value = result if isinstance(result, (int, float)) else nan
+        with self.lock:
+            if self.closed:
+                return
+            ids = self._ids.get((id(device), id(ctx), action))
+            if ids is None:
+                ids = self._ids[id(device), id(ctx), action] = (
+                    self.device_id(ctx, device),
+                    self._id(self.actions, f"{ctx.name}.{action}"),
+                )
+            self.buffer += _pack(time(), ids[0], ids[1], value)
+            if len(self.buffer) >= BUFFER_SIZE:
+                self.flush()
+
+    def flush(self) -> None:
+        if self.closed:
+            return
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self) -> None:
+        with self.lock:
+            if self.closed:
+                return
+            self.flush()
+            self.file.close()
+            self.closed = True
+
+
+def start_recording(file_name: str = None) -> EventRecorder:
+    """
+    Record every device action to a binary event log until stop_recording is called or the process exits.
+
+    :param file_name: str = event file (default: .log/{start time}.{script}.events)
+    :return: EventRecorder = the recorder
+    """
+    global _recorder
+    stop_recording()
+    if file_name is None:
+        start_time = d.now().strftime("%Y-%m-%d.%H:%M:%S")
+        script = getattr(__main__, "__file__", "interactive")
+        script = os.path.basename(script).split(".")[0]
+        os.makedirs(".log", exist_ok=True)
+        file_name = f".log/{start_time}.{script}.events"
+    _recorder = EventRecorder(file_name)
+    add_action_hook(_recorder.record)
+    logging.info("Recording device actions to %s", file_name)
+    return _recorder
+
+
+def stop_recording() -> None:
+    """Stop recording device actions and write the remaining events."""
+    global _recorder
+    if _recorder is None:
+        return
+    remove_action_hook(_recorder.record)
+    _recorder.close()
+    _recorder = None
+
+
+atexit.register(stop_recording)
+
+
+def load_events(file_name: str):
+    """
+    Load an event log written by the EventRecorder. The events are memory mapped, so large logs load instantly
+    and only the parts that are used are read from the disk.
+
+    :param file_name: str = event file
+    :return: (np.memmap, list[str], list[str]) = events with the fields time, device, action and value,
+    names of the device ids and names of the action ids
+    """
+    import numpy as np
+
+    with open(file_name + ".json") as file:
+        names = json.load(file)
+    dtype = np.dtype(
+        [("time", "<f8"), ("device", "<u2"), ("action", "<u2"), ("value", "<f8")]
+    )
+    if dtype.itemsize != struct.calcsize(names["format"]):
+        raise ValueError(f"Unknown event format {names['format']}")
+    # a record cut off by a crash is ignored
+    count = os.path.getsize(file_name) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype), names["devices"], names["actions"]
+    events = np.memmap(file_name, dtype=dtype, mode="r", shape=(count,))
+    return events, names["devices"], names["actions"]
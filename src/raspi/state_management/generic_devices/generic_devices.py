@@ -1,11 +1,12 @@
 import logging
+import threading
 
-from gpiozero import DigitalInputDevice, DigitalOutputDevice, PWMOutputDevice
-from state_management import create_generic_context, device_parser
+from state_management import allow_device_class, create_generic_context, device_parser
 from state_management.utils import (
     FakeDigitalInputDevice,
     FakeDigitalOutputDevice,
     FakePWMOutputDevice,
+    debounce_input,
     is_dev,
 )
 
@@ -17,13 +18,17 @@ __all__ = [
     "pwm_output_device_ctx",
 ]
 
-input_device_ctx = create_generic_context(
-    "input_device",
-    (DigitalInputDevice, FakeDigitalInputDevice),
-)
+# gpiozero picks its pin factory when the first device is created. The generic devices can be
+# configured from several threads, so gpiozero devices are created one at a time.
+gpio_lock = threading.Lock()
+
+# gpiozero is imported by the parsers the first time a real pin is created, importing it takes longer
+# than configuring every mocked device. Its classes are allowed in the contexts at that point.
+
+input_device_ctx = create_generic_context("input_device", FakeDigitalInputDevice)
 """
 Create a new input device component.
-allowed device classes: DigitalInputDevice, FakeInputDevice
+allowed device classes: DigitalInputDevice (once a pin is created), FakeInputDevice
 returns: (device_action, register_device, get_device, get_registered_devices, get_registered_device_names, gloabal_store)
 """
 
@@ -35,6 +40,8 @@ def parse_input_device(config):
 
     Args:
         pin_num (int): the pin number of the device
+        or config (dict): arguments of DigitalInputDevice (pin, pull_up, ...) and optionally
+            debounce (float): seconds the input has to be stable for before its callbacks are called
 
     Returns:
         (DigitalInputDevice) the new input device
@@ -46,24 +53,33 @@ def parse_input_device(config):
                 config,
             )
             return FakeDigitalInputDevice(config)
-        else:
+        from gpiozero import DigitalInputDevice
+
+        allow_device_class(input_device_ctx, DigitalInputDevice)
+        with gpio_lock:
             return DigitalInputDevice(config)
     config.pop("_identifier")
+    debounce = config.pop("debounce", None)
     if is_dev():
         logging.info(
             "dev environment detected. Mocking digital input device for pin %s", config
         )
-        return FakeDigitalInputDevice(**config)
+        device = FakeDigitalInputDevice(**config)
     else:
-        return DigitalInputDevice(**config)
+        from gpiozero import DigitalInputDevice
 
+        allow_device_class(input_device_ctx, DigitalInputDevice)
+        with gpio_lock:
+            device = DigitalInputDevice(**config)
+    if debounce:
+        debounce_input(device, debounce, bool(device.is_active))
+    return device
 
-output_device_ctx = create_generic_context(
-    "output_device", (DigitalOutputDevice, FakeDigitalOutputDevice)
-)
+
+output_device_ctx = create_generic_context("output_device", FakeDigitalOutputDevice)
 """
 Create a new output device component.
-allowed device classes: DigitalOutputDevice, FakeOutputDevice
+allowed device classes: DigitalOutputDevice (once a pin is created), FakeOutputDevice
 returns: (device_action, register_device, get_device, get_registered_devices, get_registered_device_names, gloabal_store)
 """
 
@@ -86,13 +102,14 @@ def parse_output_device(config):
             "dev environment detected. Mocking digital output device for pin %s", config
         )
         return FakeDigitalOutputDevice(config)
-    else:
+    from gpiozero import DigitalOutputDevice
+
+    allow_device_class(output_device_ctx, DigitalOutputDevice)
+    with gpio_lock:
         return DigitalOutputDevice(config)
 
 
-pwm_output_device_ctx = create_generic_context(
-    "pwm_output_device", (PWMOutputDevice, FakePWMOutputDevice)
-)
+pwm_output_device_ctx = create_generic_context("pwm_output_device", FakePWMOutputDevice)
 
 
 @device_parser(pwm_output_device_ctx)
@@ -113,5 +130,8 @@ def parse_pwm_output_device(config):
             "dev environment detected. Mocking PWM output device for pin %s", config
         )
         return FakePWMOutputDevice(**input)
-    else:
+    from gpiozero import PWMOutputDevice
+
+    allow_device_class(pwm_output_device_ctx, PWMOutputDevice)
+    with gpio_lock:
         return PWMOutputDevice(**input)
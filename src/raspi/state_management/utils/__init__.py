@@ -1,5 +1,9 @@
 from .cpu import setup_cpu
 from .deviceMock import *
+from .dispatcher import EventDispatcher, dispatched, get_dispatch_stats
+from .event_loop import get_event_loop, run_async, run_blocking, submit_async
+from .input_filter import DebouncedInput, debounce_input, input_events
 from .interval import clear_intervals, set_interval
 from .logger import configure_logger, map_level
+from .tracing import is_tracing, set_tracing
 from .util import *
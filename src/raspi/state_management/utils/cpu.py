@@ -1,11 +1,11 @@
 import logging
 
-from gpiozero import CPUTemperature
-
 from .util import is_dev, set_interval
 
 
-def make_cpu() -> CPUTemperature:
+def make_cpu() -> "CPUTemperature":
+    from gpiozero import CPUTemperature
+
     return CPUTemperature()
 
 
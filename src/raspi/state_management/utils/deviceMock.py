@@ -1,11 +1,14 @@
 import logging
 from functools import wraps
 
+from .tracing import TracedMethod
 
-def value_change(func: callable) -> callable:
+
+def value_change(func: callable) -> TracedMethod:
     """
     Decorator for value changed functions.
-    Prints the value before and after the function is called for debugging purposes.
+    Logs the value before and after the function is called for debugging purposes.
+    The logging is only done while tracing is enabled (see `set_tracing`), otherwise the method is the plain function.
 
     :param func: the function to decorate
     :return: the decorated function
@@ -16,15 +19,18 @@ def value_change(func: callable) -> callable:
     """
 
     @wraps(func)
-    def wrapper(*args, **kwargs) -> None:
+    def wrapper(*args, **kwargs):
         """
         Decorated function.
         """
-        logging.debug(f"{func.__qualname__} called: {args[0].pin} {args[0].value}")
-        func(*args, **kwargs)
-        logging.debug(f"{func.__qualname__} finished: {args[0].pin} {args[0].value}")
+        logging.debug("%s called: %s %s", func.__qualname__, args[0].pin, args[0].value)
+        result = func(*args, **kwargs)
+        logging.debug(
+            "%s finished: %s %s", func.__qualname__, args[0].pin, args[0].value
+        )
+        return result
 
-    return wrapper
+    return TracedMethod(func, wrapper)
 
 
 class FakeDigitalOutputDevice:
@@ -358,3 +364,138 @@ class FakeSMBus:
         :rtype: None
         """
         pass
+
+
+class FakeMCP23017:
+    """
+    Register model of an MCP23017 with the parts of the adafruit_mcp230xx API the io expander uses.
+    Every register access is one i2c transaction and is counted in `transactions`, the bytes read in `bytes_read`.
+    `set_input(pin, value)` changes an input like the outside world would and latches the interrupt.
+    """
+
+    GPINTENA = 0x04
+    INTCONA = 0x08
+    IOCON = 0x0A
+    INTFA = 0x0E
+    INTCAPA = 0x10
+    GPIOA = 0x12
+    REGISTERS = 0x16
+
+    def __init__(self, address: int = 0x20):
+        self.address = address
+        self.registers = bytearray(self.REGISTERS)
+        self.transactions = 0
+        self.bytes_read = 0
+        # the blocking i2c device of the real driver, used as `with mcp._device as i2c`
+        self._device = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def _read(self, register: int, length: int) -> bytes:
+        self.transactions += 1
+        self.bytes_read += length
+        data = bytes(self.registers[register : register + length])
+        # reading INTCAP or GPIO of a port clears its interrupt
+        for port in (0, 1):
+            for base in (self.INTCAPA, self.GPIOA):
+                if register <= base + port < register + length:
+                    self.registers[self.INTFA + port] = 0
+        return data
+
+    def _read_u16(self, register: int) -> int:
+        return int.from_bytes(self._read(register, 2), "little")
+
+    def _write_u16(self, register: int, value: int) -> None:
+        self.transactions += 1
+        self.registers[register : register + 2] = value.to_bytes(2, "little")
+
+    def write_then_readinto(
+        self,
+        out_buffer,
+        in_buffer,
+        *,
+        out_start=0,
+        out_end=None,
+        in_start=0,
+        in_end=None,
+    ) -> None:
+        """sequential read starting at the register in out_buffer (IOCON.SEQOP = 0)"""
+        in_end = len(in_buffer) if in_end is None else in_end
+        in_buffer[in_start:in_end] = self._read(
+            out_buffer[out_start], in_end - in_start
+        )
+
+    @property
+    def interrupt_enable(self) -> int:
+        return self._read_u16(self.GPINTENA)
+
+    @interrupt_enable.setter
+    def interrupt_enable(self, value: int) -> None:
+        self._write_u16(self.GPINTENA, value)
+
+    @property
+    def interrupt_configuration(self) -> int:
+        return self._read_u16(self.INTCONA)
+
+    @interrupt_configuration.setter
+    def interrupt_configuration(self, value: int) -> None:
+        self._write_u16(self.INTCONA, value)
+
+    @property
+    def io_control(self) -> int:
+        return self._read(self.IOCON, 1)[0]
+
+    @io_control.setter
+    def io_control(self, value: int) -> None:
+        self.transactions += 1
+        self.registers[self.IOCON] = value
+
+    @property
+    def gpio(self) -> int:
+        return self._read_u16(self.GPIOA)
+
+    @property
+    def int_flag(self) -> list[int]:
+        flags = self._read_u16(self.INTFA)
+        return [pin for pin in range(16) if flags & (1 << pin)]
+
+    def clear_ints(self) -> None:
+        self._read_u16(self.INTCAPA)
+
+    def get_pin(self, pin: int) -> "FakeMCPPin":
+        return FakeMCPPin(self, pin)
+
+    def set_input(self, pin: int, value: int) -> None:
+        """Change the level of an input pin. An enabled pin that changes latches the interrupt of its port."""
+        port, bit = divmod(pin, 8)
+        gpio = self.registers[self.GPIOA + port]
+        new = gpio | (1 << bit) if value else gpio & ~(1 << bit)
+        self.registers[self.GPIOA + port] = new
+        enabled = self.registers[self.GPINTENA + port] & (1 << bit)
+        # the port keeps the first capture until it is cleared
+        if new != gpio and enabled and not self.registers[self.INTFA + port]:
+            self.registers[self.INTFA + port] = 1 << bit
+            self.registers[self.INTCAPA + port] = new
+
+    @property
+    def interrupt(self) -> bool:
+        """state of the mirrored interrupt output"""
+        return bool(self.registers[self.INTFA] or self.registers[self.INTFA + 1])
+
+
+class FakeMCPPin:
+    """digitalio.DigitalInOut of a FakeMCP23017, reading the value reads the whole GPIO register"""
+
+    def __init__(self, mcp: FakeMCP23017, pin: int):
+        self.mcp = mcp
+        self.pin = pin
+        self.direction = None
+        self.pull = None
+
+    @property
+    def value(self) -> bool:
+        return bool(self.mcp.gpio & (1 << self.pin))
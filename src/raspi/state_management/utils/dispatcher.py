@@ -0,0 +1,160 @@
+import inspect
+import itertools
+import logging
+import queue
+import threading
+from functools import partial
+
+# worker threads running the input device callbacks
+DISPATCH_WORKERS = 4
+# events waiting per worker, an event posted to a full queue is dropped
+DISPATCH_QUEUE_SIZE = 64
+
+
+class EventDispatcher:
+    """
+    Runs the callbacks of input device events (when_activated / when_deactivated) on a small pool of worker threads,
+    so a slow callback does not delay the interrupt or gpiozero thread that detects the next edge.
+
+    Every key (i.e. a device) is assigned to one worker, so the events of a device run one at a time in the order
+    they were posted. Each worker has a bounded queue: posting never blocks, an event posted to a full queue is
+    dropped and counted.
+    """
+
+    def __init__(
+        self, workers: int = DISPATCH_WORKERS, queue_size: int = DISPATCH_QUEUE_SIZE
+    ):
+        self.queues = [queue.Queue(queue_size) for _ in range(workers)]
+        self._assigned = {}  # {key: worker index}
+        self._next_worker = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = None
+        self.posted = 0
+        self.dropped = 0
+        self.max_queued = 0
+        # written by one worker each
+        self._dispatched = [0] * workers
+        self._failed = [0] * workers
+
+    def _start(self):
+        with self._lock:
+            if self._threads is None:
+                self._threads = [
+                    threading.Thread(
+                        target=self._run, args=(i,), name=f"dispatch_{i}", daemon=True
+                    )
+                    for i in range(len(self.queues))
+                ]
+                for thread in self._threads:
+                    thread.start()
+
+    def post(self, key, func: callable, *args) -> bool:
+        """
+        Queue func(*args) on the worker of key (hashable, i.e. the id of the device).
+
+        :return: bool = False if the queue of the worker is full and the event was dropped
+        """
+        if self._threads is None:
+            self._start()
+        index = self._assigned.get(key)
+        if index is None:
+            with self._lock:
+                index = self._assigned.setdefault(
+                    key, next(self._next_worker) % len(self.queues)
+                )
+        events = self.queues[index]
+        try:
+            events.put_nowait((func, args))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logging.warning("Dispatcher queue %s is full, dropped %s", index, func)
+            return False
+        queued = events.qsize()
+        with self._lock:
+            self.posted += 1
+            if queued > self.max_queued:
+                self.max_queued = queued
+        return True
+
+    def _run(self, index: int):
+        events = self.queues[index]
+        while True:
+            func, args = events.get()
+            try:
+                func(*args)
+            except Exception:
+                self._failed[index] += 1
+                logging.exception("Error in dispatched callback %s", func)
+            self._dispatched[index] += 1
+            events.task_done()
+
+    def join(self) -> None:
+        """Block until every posted event has run."""
+        for events in self.queues:
+            events.join()
+
+    def stats(self) -> dict[str, int]:
+        """posted, dispatched, dropped and failed events, events waiting and the most that waited in one queue"""
+        return {
+            "posted": self.posted,
+            "dispatched": sum(self._dispatched),
+            "dropped": self.dropped,
+            "failed": sum(self._failed),
+            "queued": sum(events.qsize() for events in self.queues),
+            "max_queued": self.max_queued,
+        }
+
+
+dispatcher = EventDispatcher()
+
+
+def takes_device(func: callable) -> bool:
+    """
+    Whether a callback takes the device as its only argument, checked the way gpiozero binds its callbacks:
+    a callback that can be called without arguments is called without, otherwise it is called with the device.
+    """
+    args = ()
+    wrapped = func
+    while isinstance(wrapped, partial):
+        args = wrapped.args + args
+        wrapped = wrapped.func
+    if inspect.isbuiltin(wrapped):
+        return False
+    try:
+        inspect.getcallargs(wrapped, *args)
+        return False
+    except TypeError:
+        pass
+    try:
+        inspect.getcallargs(wrapped, *args, None)
+        return True
+    except TypeError:
+        raise ValueError(
+            f"Callback {func} must take no arguments or the device"
+        ) from None
+
+
+def dispatched(device, func: callable) -> callable:
+    """
+    Wrap a callback of a device so that calling it posts it to the dispatcher instead of running it.
+    Used by the actions that set when_activated / when_deactivated. Like gpiozero, a callback with one
+    parameter is called with the device.
+
+    :return: callable = None if func is None, so a callback can still be removed
+    """
+    if func is None:
+        return None
+
+    key = id(device)
+    args = (device,) if takes_device(func) else ()
+
+    def post(*_):
+        dispatcher.post(key, func, *args)
+
+    post.__wrapped__ = func
+    return post
+
+
+def get_dispatch_stats() -> dict[str, int]:
+    return dispatcher.stats()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+# blocking calls made from coroutines (i2c transactions etc.) share these threads
+BLOCKING_WORKERS = 4
+
+_loop: asyncio.AbstractEventLoop = None
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    The event loop every async action runs on. Started on a daemon thread the first time it is used.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="event_loop", daemon=True
+            ).start()
+        return _loop
+
+
+def submit_async(coro) -> Future:
+    """
+    Schedule a coroutine on the shared event loop without waiting for it.
+
+    Args:
+        coro (Coroutine): e.g. `raw_motor_action.step_n_async("motor_1", 10)`
+
+    Returns:
+        Future: resolves with the result of the coroutine
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_async(coro, timeout: float = None):
+    """
+    Run a coroutine on the shared event loop and block until it is done.
+    Use this instead of asyncio.run so every coroutine shares one loop.
+
+    Args:
+        coro (Coroutine): the coroutine to run
+        timeout (float): max seconds to wait
+
+    Returns:
+        the result of the coroutine
+    """
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_async would block the event loop, await it instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+async def run_blocking(func: callable, *args):
+    """
+    Await a blocking function. It runs on a small shared thread pool so the event loop keeps running.
+
+    Args:
+        func (callable): the blocking function
+        *args: arguments of the function
+
+    Returns:
+        the result of the function
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _executor = ThreadPoolExecutor(
+                BLOCKING_WORKERS, thread_name_prefix="blocking"
+            )
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
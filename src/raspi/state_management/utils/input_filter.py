@@ -0,0 +1,79 @@
+import threading
+from time import monotonic
+
+from .interval import scheduler
+
+# {id(device): DebouncedInput} of the inputs with a debounce time in the pinconfig
+_debounced = {}
+
+
+class DebouncedInput:
+    """
+    Glitch filter between the raw edges of an input device and its when_activated / when_deactivated callbacks.
+    The level is only reported once it was stable for `sec` seconds, so a chattering switch gives one event
+    and a glitch shorter than `sec` gives none.
+
+    Every input has at most one timer on the shared scheduler: an edge only records its time and level,
+    when the timer fires before the input settled it is scheduled again for the remaining time.
+    """
+
+    def __init__(self, device, sec: float, active: bool = False):
+        self.device = device
+        self.sec = sec
+        self.when_activated = None
+        self.when_deactivated = None
+        self.active = active  # last reported level
+        self._level = active  # level of the last edge
+        self._last_edge = 0.0
+        self._timer = None
+        self._lock = threading.Lock()
+        device.when_activated = self._activated
+        device.when_deactivated = self._deactivated
+
+    def _activated(self, *args):
+        self._edge(True)
+
+    def _deactivated(self, *args):
+        self._edge(False)
+
+    def _edge(self, level: bool):
+        with self._lock:
+            self._level = level
+            self._last_edge = monotonic()
+            if self._timer is None:
+                self._timer = scheduler.schedule(self._settle, self.sec)
+
+    def _settle(self):
+        with self._lock:
+            remaining = self._last_edge + self.sec - monotonic()
+            if remaining > 0:
+                self._timer = scheduler.schedule(self._settle, remaining)
+                return
+            self._timer = None
+            if self._level == self.active:
+                return
+            self.active = self._level
+            callback = self.when_activated if self.active else self.when_deactivated
+        if callback is not None:
+            callback()
+
+    def __repr__(self) -> str:
+        return f"DebouncedInput(device={self.device}, sec={self.sec}, active={self.active})"
+
+
+def debounce_input(device, sec: float, active: bool = False) -> DebouncedInput:
+    """
+    Filter the edges of an input device, used by the parsers of devices with a debounce time.
+
+    :param device: input device with when_activated / when_deactivated
+    :param sec: float = time the input has to be stable for
+    :param active: bool = level of the input when it is created
+    :return: DebouncedInput = the object the callbacks of the device are set on
+    """
+    debounced = _debounced[id(device)] = DebouncedInput(device, sec, active)
+    return debounced
+
+
+def input_events(device):
+    """The object to set the when_activated / when_deactivated callbacks of an input device on."""
+    return _debounced.get(id(device), device)
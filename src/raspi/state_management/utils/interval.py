@@ -1,49 +1,219 @@
+import heapq
+import itertools
 import logging
+import queue
 import threading
+from time import monotonic
+
+from .event_loop import submit_async
+
+# threads running the blocking callbacks of the scheduler
+SCHEDULER_WORKERS = 2
+
+
+class TimerHandle:
+    """Handle of a callback scheduled on the scheduler. Call `cancel` to stop it."""
+
+    __slots__ = (
+        "func",
+        "deadline",
+        "period",
+        "cancelled",
+        "blocking",
+        "running",
+        "group",
+    )
+
+    def __init__(
+        self,
+        func: callable,
+        deadline: float,
+        period: float = None,
+        blocking: bool = False,
+    ):
+        self.func = func
+        self.deadline = deadline
+        self.period = period
+        self.cancelled = False
+        self.blocking = blocking
+        # a blocking callback is still running on a worker
+        self.running = False
+        # intervals or timeouts if the handle is tracked there
+        self.group = None
+
+    def cancel(self):
+        self.cancelled = True
+        _untrack(self)
+
+    def __repr__(self) -> str:
+        return f"TimerHandle(func={self.func}, period={self.period}, cancelled={self.cancelled})"
+
+
+class Scheduler:
+    """
+    Runs every interval and timeout on one thread.
 
-intervals = []
-timeouts = []
-
-
-def set_interval(func, sec):
-    def func_wrapper():
-        set_interval(func, sec)
-        func()
+    Timers are kept in a heap ordered by their deadline on the monotonic clock.
+    Intervals are rescheduled from their previous deadline instead of the time the callback
+    finished so the period does not drift. Cancelled timers are dropped when they reach the top of the heap.
 
-    t = threading.Timer(sec, func_wrapper)
-    t.start()
-    intervals.append(t)
-    return t
+    Callbacks run on the scheduler thread one at a time, so they must be short. Blocking callbacks
+    (i.e. moving a motor) are scheduled with blocking=True and run on a worker thread instead. A tick of a blocking
+    interval that is due while its previous tick is still running is skipped.
+    """
 
+    def __init__(self, workers: int = SCHEDULER_WORKERS):
+        self._heap = []
+        # tie breaker for timers with the same deadline
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._workers = workers
+        self._blocking = queue.SimpleQueue()
+        self._worker_threads = None
+
+    def schedule(
+        self, func: callable, delay: float, period: float = None, blocking: bool = False
+    ) -> TimerHandle:
+        return self.add(TimerHandle(func, monotonic() + delay, period, blocking))
+
+    def add(self, handle: TimerHandle) -> TimerHandle:
+        with self._condition:
+            self._push(handle)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="scheduler", daemon=True
+                )
+                self._thread.start()
+            if handle.blocking and self._worker_threads is None:
+                self._worker_threads = [
+                    threading.Thread(
+                        target=self._run_blocking,
+                        name=f"scheduler_worker_{i}",
+                        daemon=True,
+                    )
+                    for i in range(self._workers)
+                ]
+                for thread in self._worker_threads:
+                    thread.start()
+            self._condition.notify()
+        return handle
+
+    def _push(self, handle: TimerHandle):
+        heapq.heappush(self._heap, (handle.deadline, next(self._counter), handle))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    deadline, _, handle = self._heap[0]
+                    if handle.cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        heapq.heappop(self._heap)
+                        break
+                    self._condition.wait(remaining)
+                if handle.period is not None:
+                    handle.deadline += handle.period
+                    now = monotonic()
+                    if handle.deadline < now:
+                        # fell behind by more than a period, skip the missed ticks
+                        missed = (now - handle.deadline) // handle.period + 1
+                        handle.deadline += missed * handle.period
+                    self._push(handle)
+            if handle.blocking:
+                if not handle.running:
+                    handle.running = True
+                    self._blocking.put(handle)
+                continue
+            try:
+                handle.func()
+            except Exception:
+                logging.exception("Error in scheduled function %s", handle.func)
+
+    def _run_blocking(self):
+        while True:
+            handle = self._blocking.get()
+            try:
+                if not handle.cancelled:
+                    handle.func()
+            except Exception:
+                logging.exception("Error in scheduled function %s", handle.func)
+            finally:
+                handle.running = False
+
+
+scheduler = Scheduler()
+
+intervals: set[TimerHandle] = set()
+timeouts: set[TimerHandle] = set()
+# the handles are added and removed on the scheduler and the caller threads
+_groups_lock = threading.Lock()
+
+
+def _track(handle: TimerHandle, group: set) -> None:
+    with _groups_lock:
+        group.add(handle)
+        handle.group = group
+
+
+def _untrack(handle: TimerHandle) -> None:
+    group = handle.group
+    if group is None:
+        return
+    with _groups_lock:
+        group.discard(handle)
+        handle.group = None
+
+
+def _cancel_group(group: set) -> None:
+    with _groups_lock:
+        handles = list(group)
+        group.clear()
+        for handle in handles:
+            handle.group = None
+    for handle in handles:
+        handle.cancel()
+
+
+def set_interval(func, sec, blocking: bool = False) -> TimerHandle:
+    """
+    Call func every sec seconds until the interval is cancelled.
+    Set blocking for a func that does not return right away (i.e. moves a motor), see Scheduler.
+    """
+    if sec <= 0:
+        raise ValueError("Interval must be greater than 0. Got " + str(sec))
+    t = TimerHandle(func, monotonic() + sec, sec, blocking)
+    _track(t, intervals)
+    return scheduler.add(t)
 
-def set_async_interval(func, sec):
-    async def func_wrapper():
-        set_interval(func, sec)
-        await func()
 
-    t = threading.Timer(sec, func_wrapper)
-    t.start()
-    intervals.append(t)
-    return t
+def set_async_interval(func, sec) -> TimerHandle:
+    # the coroutine runs on the shared event loop, the scheduler thread only starts it
+    return set_interval(lambda: submit_async(func()), sec)
 
 
 def clear_intervals():
-    for interval in intervals:
-        interval.cancel()
-    intervals.clear()
+    _cancel_group(intervals)
+
 
+def set_timeout(func, sec, blocking: bool = False) -> TimerHandle:
+    def func_wrapper():
+        _untrack(t)
+        func()
 
-def set_timeout(func, sec):
-    t = threading.Timer(sec, func)
-    t.start()
-    timeouts.append(t)
-    return len(timeouts) - 1
+    t = TimerHandle(func_wrapper, monotonic() + sec, blocking=blocking)
+    _track(t, timeouts)
+    return scheduler.add(t)
 
 
 def clear_timeouts():
-    for timeout in timeouts:
-        timeout.cancel()
-    timeouts.clear()
+    _cancel_group(timeouts)
 
 
 def clear_all():
@@ -75,7 +245,6 @@ def debounce(func, sec):
     def func_wrapper():
         if hasattr(func_wrapper, "timer"):
             func_wrapper.timer.cancel()
-        func_wrapper.timer = threading.Timer(sec, func)
-        func_wrapper.timer.start()
+        func_wrapper.timer = scheduler.schedule(func, sec)
 
     return func_wrapper
@@ -1,8 +1,24 @@
 import logging
+import os
+import threading
 from datetime import datetime as d
+from logging.handlers import QueueHandler
+from queue import Empty, SimpleQueue
+from time import monotonic
 
 import __main__
 
+from .tracing import set_tracing
+
+LOG_DIR = ".log"
+LOG_FORMAT = "%(filename)s: %(message)s"
+# the log file is rotated when it is bigger than MAX_BYTES or older than MAX_AGE seconds
+MAX_BYTES = 5 * 1024 * 1024
+MAX_AGE = 60 * 60
+BACKUP_COUNT = 5
+# records written before the file is flushed
+BATCH_SIZE = 256
+
 LOG_LEVEL = {
     "Debug": logging.DEBUG,
     "Info": logging.INFO,
@@ -32,9 +48,112 @@ def set_log_event_function(callback: callable):
     logging.root.addFilter(callback)
 
 
+class RotatingLogFile(logging.FileHandler):
+    """
+    Log file written by the LogWriter thread. Records are written to the file buffer and only flushed once per
+    batch. The file is rotated (file.log -> file.log.1 -> ... file.log.{backup_count}) when it grows past
+    max_bytes characters or is older than max_age seconds.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = MAX_BYTES,
+        max_age: float = MAX_AGE,
+        backup_count: int = BACKUP_COUNT,
+    ):
+        super().__init__(filename, encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.size = 0
+        self.opened = monotonic()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.size + len(msg) > self.max_bytes or (
+                monotonic() - self.opened > self.max_age and self.size > 0
+            ):
+                self.rotate()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self.size += len(msg)
+        except Exception:
+            self.handleError(record)
+
+    def rotate(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.baseFilename}.{i}"):
+                os.replace(f"{self.baseFilename}.{i}", f"{self.baseFilename}.{i + 1}")
+        if self.backup_count > 0 and os.path.exists(self.baseFilename):
+            os.replace(self.baseFilename, f"{self.baseFilename}.1")
+        self.size = 0
+        self.opened = monotonic()
+
+
+class LogWriter(QueueHandler):
+    """
+    Handler of the root logger that only puts the records on a queue. A background thread writes them to the
+    target handler in batches, so logging from the control threads never waits for the file.
+    Closing the handler (done by logging.shutdown at exit) writes the remaining records first.
+    """
+
+    def __init__(self, target: logging.Handler, batch_size: int = BATCH_SIZE):
+        super().__init__(SimpleQueue())
+        self.target = target
+        self.batch_size = batch_size
+        self.thread = threading.Thread(target=self._run, name="log_writer", daemon=True)
+        self.thread.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the arguments and the traceback may change once the caller moves on, so the message and the exception
+        # are rendered on the calling thread, the rest of the format is left to the writer thread
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                formatter = self.target.formatter or logging.Formatter()
+                record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def _run(self):
+        written = 0
+        while True:
+            try:
+                record = self.queue.get_nowait()
+            except Empty:
+                # flushed whenever the queue is drained so the file is never far behind
+                self.target.flush()
+                written = 0
+                record = self.queue.get()
+            if record is None:
+                self.target.flush()
+                return
+            self.target.handle(record)
+            written += 1
+            if written == self.batch_size:
+                self.target.flush()
+                written = 0
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.target.close()
+        super().close()
+
+
 def configure_logger(level: str = "Debug"):
     """
-    Configure the logger.
+    Configure the logger. Records are written to .log/ by a background thread (see LogWriter).
+    Debug tracing of the mocked devices and the hot actions is enabled at the Debug level.
 
     :param level: the level to log at
     """
@@ -42,9 +161,12 @@ def configure_logger(level: str = "Debug"):
     print(f"Configuring logger {level}...")
     start_time = d.now().strftime("%Y-%m-%d.%H:%M:%S")
     filename = __main__.__file__.split("/")[-1].split(".")[0]
+    os.makedirs(LOG_DIR, exist_ok=True)
+    file = RotatingLogFile(f"{LOG_DIR}/{start_time}.{filename}.{level}.log")
+    file.setFormatter(logging.Formatter(LOG_FORMAT))
     logging.basicConfig(
-        filename=f".log/{start_time}.{filename}.{level}.log",
-        format="%(filename)s: %(message)s",
+        handlers=[LogWriter(file)],
         level=lvl,  # TODO: hook it to env or config file
         force=True,
     )
+    set_tracing(lvl <= logging.DEBUG)
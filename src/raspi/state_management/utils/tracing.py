@@ -0,0 +1,47 @@
+import logging
+
+# (class, attribute, function, traced function) of every traced method
+_traced_methods = []
+_enabled = logging.root.isEnabledFor(logging.DEBUG)
+
+
+class TracedMethod:
+    """
+    Method with a traced version that logs every call.
+    When the class is created the attribute is replaced by the plain function or the traced one depending on
+    whether tracing is enabled, so a disabled trace costs nothing per call. `set_tracing` swaps them later on.
+    """
+
+    def __init__(self, func: callable, traced: callable):
+        self.func = func
+        self.traced = traced
+
+    def __set_name__(self, owner: type, name: str):
+        _traced_methods.append((owner, name, self.func, self.traced))
+        setattr(owner, name, self.traced if _enabled else self.func)
+
+    def __call__(self, *args, **kwargs):
+        # only reached when it is not defined in a class body
+        return (self.traced if _enabled else self.func)(*args, **kwargs)
+
+
+def is_tracing() -> bool:
+    """
+    Check if debug tracing is enabled. Check this before logging in code that runs on every step or bit,
+    i.e. `if is_tracing(): logging.debug("Writing %s", value)`.
+
+    :return: True if the traced methods log their calls
+    """
+    return _enabled
+
+
+def set_tracing(enabled: bool) -> None:
+    """
+    Enable or disable debug tracing at runtime. `configure_logger` enables it when the level is Debug.
+
+    :param enabled: True to log the calls of the traced methods
+    """
+    global _enabled
+    _enabled = enabled
+    for owner, name, func, traced in _traced_methods:
+        setattr(owner, name, traced if enabled else func)
@@ -1,9 +1,7 @@
 import json
 import logging
 import os
-
-from dotenv import dotenv_values
-from gpiozero import DigitalInputDevice, DigitalOutputDevice, PWMOutputDevice
+from dataclasses import dataclass
 
 from .deviceMock import (
     FakeDigitalInputDevice,
@@ -12,6 +10,62 @@ from .deviceMock import (
 )
 from .interval import set_interval
 
+ENV_FILE = "src/raspi/.env"
+
+
+@dataclass(frozen=True)
+class Environment:
+    """Environment of the process. Resolved once from the .env file."""
+
+    env: str = None
+
+    @property
+    def is_dev(self) -> bool:
+        return self.env == "dev"
+
+
+_environment: Environment = None
+
+
+def load_environment(file_name: str = ENV_FILE) -> Environment:
+    """
+    Read the environment from the .env file.
+
+    :param file_name: path to the .env file
+    :return: the environment
+    """
+    from dotenv import dotenv_values
+
+    config_data = dotenv_values(file_name)
+    if config_data is None:
+        raise ValueError("No config file found. Create a .env file in src/raspi")
+    return Environment(env=config_data.get("ENV"))
+
+
+def get_environment() -> Environment:
+    """
+    Get the environment of the process. The .env file is only read the first time this is called.
+
+    :return: the environment
+    """
+    global _environment
+    if _environment is None:
+        _environment = load_environment()
+    return _environment
+
+
+def set_environment(environment: Environment | str = None) -> None:
+    """
+    Override the environment of the process i.e. `set_environment("dev")` to mock the devices in a test.
+    Passing None will read the .env file again on the next call to `get_environment`.
+
+    :param environment: the environment or the name of the environment
+    """
+    global _environment
+    if isinstance(environment, str):
+        environment = Environment(env=environment)
+    _environment = environment
+
 
 def is_dev() -> bool:
     """
@@ -19,10 +73,7 @@ def is_dev() -> bool:
 
     :return: True if the environment is set to development, False otherwise
     """
-    config_data = dotenv_values("src/raspi/.env")
-    if config_data is None:
-        raise ValueError("No config file found. Create a .env file in src/raspi")
-    return config_data.get("ENV") == "dev"
+    return get_environment().is_dev
 
 
 def create_input_device(pin: int, onDev: callable = None):
@@ -37,6 +88,8 @@ def create_input_device(pin: int, onDev: callable = None):
         logging.info("mocking input device for pin %s", pin)
         obj = FakeDigitalInputDevice(pin)
     else:
+        from gpiozero import DigitalInputDevice
+
         obj = DigitalInputDevice(pin)
     return obj
 
@@ -55,6 +108,8 @@ def create_output_device(pin: int, onDev: callable = None):
         if onDev is not None:
             onDev(obj)
     else:
+        from gpiozero import DigitalOutputDevice
+
         obj = DigitalOutputDevice(pin)
     return obj
 
@@ -80,6 +135,8 @@ def create_pwm_device(pin: int, onDev: callable = None):
         if onDev is not None:
             onDev(obj)
     else:
+        from gpiozero import PWMOutputDevice
+
         obj = PWMOutputDevice(pin)
     return obj
 
@@ -96,6 +153,8 @@ def get_pinconfig(filepath: str = "src/raspi/pinconfig.json") -> dict:
 
 
 def on_test_pressure_reading(id):
+    from gpiozero import DigitalInputDevice
+
     if isinstance(id, DigitalInputDevice) or isinstance(id, FakeDigitalInputDevice):
 
         def func():
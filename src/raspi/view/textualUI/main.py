@@ -1,13 +1,13 @@
 import logging
-import threading
 from asyncio import sleep
 from logging import LogRecord
 
 from component.latch import latch_actions
-from component.motor import raw_motor_action
+from component.motor import motor_action, raw_motor_action
 from component.muscle import muscle_actions
 from state_management import configure_device
 from state_management.utils.interval import (
+    TimerHandle,
     clear_all,
     clear_intervals,
     clear_timeouts,
@@ -41,45 +41,50 @@ MULTIPLIER = 8
 
 
 class DirectionController:
+    @staticmethod
+    def move(lateral: int, medial: int):
+        """Move both motors together so diagonal moves are not done one motor after the other."""
+        motor_action.move({LATERAL_MOTOR: lateral, MEDIAL_MOTOR: medial})
+
     @staticmethod
     def left():
         logging.info("Left")
-        raw_motor_action.step_n(LATERAL_MOTOR, LEFT_DISTANCE)
+        DirectionController.move(LEFT_DISTANCE, 0)
 
     @staticmethod
     def bigLeft():
         logging.info("Left")
-        raw_motor_action.step_n(LATERAL_MOTOR, LEFT_DISTANCE * MULTIPLIER)
+        DirectionController.move(LEFT_DISTANCE * MULTIPLIER, 0)
 
     @staticmethod
     def right():
         logging.info("Right")
-        raw_motor_action.step_n(LATERAL_MOTOR, RIGHT_DISTANCE)
+        DirectionController.move(RIGHT_DISTANCE, 0)
 
     @staticmethod
     def bigRight():
         logging.info("Right")
-        raw_motor_action.step_n(LATERAL_MOTOR, RIGHT_DISTANCE * MULTIPLIER)
+        DirectionController.move(RIGHT_DISTANCE * MULTIPLIER, 0)
 
     @staticmethod
     def up():
         logging.info("Up")
-        raw_motor_action.step_n(MEDIAL_MOTOR, LEFT_DISTANCE)
+        DirectionController.move(0, LEFT_DISTANCE)
 
     @staticmethod
     def bigUp():
         logging.info("Up")
-        raw_motor_action.step_n(MEDIAL_MOTOR, LEFT_DISTANCE * MULTIPLIER)
+        DirectionController.move(0, LEFT_DISTANCE * MULTIPLIER)
 
     @staticmethod
     def down():
         logging.info("Down")
-        raw_motor_action.step_n(MEDIAL_MOTOR, RIGHT_DISTANCE)
+        DirectionController.move(0, RIGHT_DISTANCE)
 
     @staticmethod
     def bigDown():
         logging.info("Down")
-        raw_motor_action.step_n(MEDIAL_MOTOR, RIGHT_DISTANCE * MULTIPLIER)
+        DirectionController.move(0, RIGHT_DISTANCE * MULTIPLIER)
 
     @staticmethod
     def space():
@@ -101,10 +106,9 @@ class Main_UI(App):
 
     last_key = None
 
-    leftInterval: threading.Timer = None
-    rightInterval: threading.Timer = None
-    upInterval: threading.Timer = None
-    downInterval: threading.Timer = None
+    # (lateral, medial) steps of every held button, moved together on one interval
+    held: dict[str, tuple[int, int]] = {}
+    moveInterval: TimerHandle = None
 
     debouncedMiddle: callable = None
 
@@ -168,17 +172,32 @@ class Main_UI(App):
         self.query_one("#mdrc").styles.display = "none"
         self.query_one("#controller").styles.display = "block"
 
+    def hold(self, button: str, lateral: int, medial: int):
+        DirectionController.move(lateral, medial)
+        self.held[button] = (lateral, medial)
+        if self.moveInterval is None:
+            # the move blocks until the steps are done, so it runs off the scheduler thread
+            self.moveInterval = set_interval(self.move_held, 0.02, blocking=True)
+
+    def release(self, button: str):
+        self.held.pop(button, None)
+        if not self.held:
+            clear_intervals()
+            self.moveInterval = None
+
+    def move_held(self):
+        held = list(self.held.values())
+        DirectionController.move(sum(l for l, _ in held), sum(m for _, m in held))
+
     @on(ReactiveButton.Active, "#up")
-    async def action_up(self):
+    def action_up(self):
         logging.debug("Button up")
-        DirectionController.up()
-        self.upInterval = set_interval(DirectionController.up, 0.02)
+        self.hold("up", 0, LEFT_DISTANCE)
 
     @on(ReactiveButton.Active, "#left")
     def action_left(self):
         logging.debug("Button left")
-        DirectionController.left()
-        self.leftInterval = set_interval(DirectionController.left, 0.02)
+        self.hold("left", LEFT_DISTANCE, 0)
 
     @on(ReactiveButton.Active, "#middle")
     def action_middle(self):
@@ -188,24 +207,22 @@ class Main_UI(App):
     @on(ReactiveButton.Active, "#right")
     def action_right(self):
         logging.debug("Button right")
-        DirectionController.right()
-        self.rightInterval = set_interval(DirectionController.right, 0.02)
+        self.hold("right", RIGHT_DISTANCE, 0)
 
     @on(ReactiveButton.Active, "#down")
     def action_down(self):
         logging.debug("Button down")
-        DirectionController.down()
-        self.downInterval = set_interval(DirectionController.down, 0.02)
+        self.hold("down", 0, RIGHT_DISTANCE)
 
     @on(ReactiveButton.Released, "#up")
     def action_up_end(self):
         logging.debug("Button up released")
-        clear_intervals()
+        self.release("up")
 
     @on(ReactiveButton.Released, "#left")
     def action_left_end(self):
         logging.debug("Button left released")
-        clear_intervals()
+        self.release("left")
 
     @on(ReactiveButton.Released, "#middle")
     def action_middle_end(self):
@@ -215,12 +232,12 @@ class Main_UI(App):
     @on(ReactiveButton.Released, "#right")
     def action_right_end(self):
         logging.debug("Button right released")
-        clear_intervals()
+        self.release("right")
 
     @on(ReactiveButton.Released, "#down")
     def action_down_end(self):
         logging.debug("Button down released")
-        clear_intervals()
+        self.release("down")
 
     def on_key(self, event: events.Key) -> None:
         if self.last_key != event.key: